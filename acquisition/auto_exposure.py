@@ -0,0 +1,113 @@
+# acquisition/auto_exposure.py
+import dataclasses
+import math
+from collections import deque
+from typing import Deque, Optional, Sequence
+
+from .spm002.config import SpectrometerConfig
+
+FULL_SCALE_COUNTS = 65535       # 16-bit ADC
+SATURATION_LEVEL = 0.98         # fraction of full scale counted as saturated
+
+
+class AutoExposure:
+    """
+    Closed-loop exposure control, running in the acquisition thread.
+
+    - observe(counts): called with every acquired (raw, ROI) spectrum
+    - update(): once `window` frames have been observed, returns an
+      adjusted SpectrometerConfig or None if nothing has to change
+
+    The controller looks at the highest peak and the largest saturated
+    pixel fraction of the last `window` frames:
+
+    - saturated pixels above `max_saturated` -> halve the exposure
+    - peak fill outside target_fill * (1 +- hysteresis) -> scale the
+      exposure by target_fill / fill
+    - inside the band nothing changes, so the exposure does not hunt
+
+    The exposure is kept within [exposure_min_ms, exposure_max_ms]. The
+    device average (PHO_SetAverage) lowers the noise but not the peak
+    fill, and multiplies the frame time: it stays at 1 while the
+    exposure alone reaches the target fill, for the highest frame rate.
+    Only while the exposure is clamped at exposure_max_ms is it raised
+    (up to `max_average`) by the missing integration time, to keep the
+    signal-to-noise ratio; it drops back to 1 once the signal is strong
+    enough again.
+
+    Create a new AutoExposure when the configuration changes; the
+    acquisition thread keeps the adjusted exposure across changes of
+    other fields (see json_stream_server.device_loop).
+    """
+
+    def __init__(
+        self,
+        config: SpectrometerConfig,
+        window: int = 5,
+        hysteresis: float = 0.15,
+        max_saturated: float = 0.001,
+        max_average: int = 16,
+        full_scale: int = FULL_SCALE_COUNTS,
+    ) -> None:
+        self.config = config
+        self.hysteresis = hysteresis
+        self.max_saturated = max_saturated
+        self.max_average = max(1, max_average)
+
+        self._full_scale = full_scale
+        self._threshold = int(full_scale * SATURATION_LEVEL)
+
+        self._peaks: Deque[int] = deque(maxlen=window)
+        self._saturated: Deque[float] = deque(maxlen=window)
+
+        # number of adjustments made so far
+        self.adjustments: int = 0
+
+    def observe(self, counts: Sequence[int]) -> None:
+        if not len(counts):
+            return
+
+        peak = max(counts)
+        saturated = 0.0
+        if peak >= self._threshold:
+            saturated = sum(map(self._threshold.__le__, counts)) / len(counts)
+
+        self._peaks.append(peak)
+        self._saturated.append(saturated)
+
+    def update(self) -> Optional[SpectrometerConfig]:
+        if len(self._peaks) < self._peaks.maxlen:
+            return None
+
+        cfg = self.config
+        target = cfg.target_fill
+        fill = max(self._peaks) / self._full_scale
+
+        if max(self._saturated) > self.max_saturated:
+            scale = 0.5
+        elif abs(fill - target) > self.hysteresis * target:
+            scale = target / max(fill, 1e-3)
+        else:
+            scale = 1.0  # fill in band, only the average may change
+
+        # integration time the target fill needs, split into exposure x average
+        desired_ms = cfg.exposure_ms * scale
+        exposure_ms = round(min(max(desired_ms, cfg.exposure_min_ms), cfg.exposure_max_ms), 2)
+        average = 1
+        if desired_ms > cfg.exposure_max_ms:
+            needed = math.ceil(desired_ms / cfg.exposure_max_ms)
+            average = min(max(cfg.average, needed), self.max_average)
+
+        if exposure_ms == cfg.exposure_ms and average == cfg.average:
+            if scale != 1.0:
+                # already at a limit: judge the next window afresh
+                self._peaks.clear()
+                self._saturated.clear()
+            return None
+
+        self._peaks.clear()
+        self._saturated.clear()
+
+        self.config = dataclasses.replace(cfg, exposure_ms=exposure_ms, average=average)
+        self.adjustments += 1
+        return self.config
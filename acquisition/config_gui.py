@@ -1,10 +1,12 @@
 # acquisition/config_gui.py
+import sys
 import tkinter as tk
 from tkinter import ttk
 from typing import Optional
 
 from .spm002.config import SpectrometerConfig
 from .runtime_config import ConfigManager
+from .preprocessing import AVERAGE_BOXCAR, AVERAGE_EXPONENTIAL
 
 
 class ConfigWindow:
@@ -28,6 +30,13 @@ class ConfigWindow:
         self._dark_var = tk.IntVar(value=0)               # 0/1
         self._mode_var = tk.StringVar(value="0")
         self._scan_delay_var = tk.StringVar(value="0")
+        self._host_average_var = tk.StringVar(value="1")
+        self._host_mode_var = tk.StringVar(value=AVERAGE_BOXCAR)
+        self._binning_var = tk.StringVar(value="1")
+        self._roi_min_var = tk.StringVar(value="0")        # nm, 0/0 = full
+        self._roi_max_var = tk.StringVar(value="0")
+        self._auto_exposure_var = tk.IntVar(value=0)      # 0/1
+        self._target_fill_var = tk.StringVar(value="0.7")
 
         self._build_ui()
 
@@ -77,9 +86,52 @@ class ConfigWindow:
             row=4, column=1, sticky="w", **pad
         )
 
+        # Host-side preprocessing
+        ttk.Label(frame, text="Host average [frames]:").grid(row=5, column=0, sticky="w", **pad)
+        ttk.Entry(frame, textvariable=self._host_average_var, width=12).grid(
+            row=5, column=1, sticky="w", **pad
+        )
+
+        ttk.Label(frame, text="Host average mode:").grid(row=6, column=0, sticky="w", **pad)
+        ttk.Combobox(
+            frame,
+            textvariable=self._host_mode_var,
+            values=(AVERAGE_BOXCAR, AVERAGE_EXPONENTIAL),
+            state="readonly",
+            width=12,
+        ).grid(row=6, column=1, sticky="w", **pad)
+
+        ttk.Label(frame, text="Pixel binning:").grid(row=7, column=0, sticky="w", **pad)
+        ttk.Entry(frame, textvariable=self._binning_var, width=12).grid(
+            row=7, column=1, sticky="w", **pad
+        )
+
+        # Region of interest
+        ttk.Label(frame, text="ROI min [nm]:").grid(row=8, column=0, sticky="w", **pad)
+        ttk.Entry(frame, textvariable=self._roi_min_var, width=12).grid(
+            row=8, column=1, sticky="w", **pad
+        )
+
+        ttk.Label(frame, text="ROI max [nm]:").grid(row=9, column=0, sticky="w", **pad)
+        ttk.Entry(frame, textvariable=self._roi_max_var, width=12).grid(
+            row=9, column=1, sticky="w", **pad
+        )
+
+        # Auto exposure
+        ttk.Checkbutton(
+            frame,
+            text="Auto exposure",
+            variable=self._auto_exposure_var,
+        ).grid(row=10, column=0, columnspan=2, sticky="w", **pad)
+
+        ttk.Label(frame, text="Target fill [0-1]:").grid(row=11, column=0, sticky="w", **pad)
+        ttk.Entry(frame, textvariable=self._target_fill_var, width=12).grid(
+            row=11, column=1, sticky="w", **pad
+        )
+
         # Buttons
         button_frame = ttk.Frame(frame)
-        button_frame.grid(row=5, column=0, columnspan=2, sticky="ew", **pad)
+        button_frame.grid(row=12, column=0, columnspan=2, sticky="ew", **pad)
         button_frame.columnconfigure(0, weight=1)
         button_frame.columnconfigure(1, weight=1)
 
@@ -121,6 +173,12 @@ class ConfigWindow:
         dark_sub = 1 if self._dark_var.get() else 0
         mode = self._parse_int(self._mode_var.get(), 0)
         scan_delay = self._parse_int(self._scan_delay_var.get(), 0)
+        host_average = max(1, self._parse_int(self._host_average_var.get(), 1))
+        binning = max(1, self._parse_int(self._binning_var.get(), 1))
+        roi_min_nm = self._parse_float(self._roi_min_var.get(), 0.0)
+        roi_max_nm = self._parse_float(self._roi_max_var.get(), 0.0)
+        auto_exposure = 1 if self._auto_exposure_var.get() else 0
+        target_fill = min(max(self._parse_float(self._target_fill_var.get(), 0.7), 0.05), 0.95)
 
         cfg = SpectrometerConfig(
             device_index=0,
@@ -129,9 +187,20 @@ class ConfigWindow:
             dark_subtraction=dark_sub,
             mode=mode,
             scan_delay=scan_delay,
+            host_average=host_average,
+            host_average_mode=self._host_mode_var.get(),
+            binning=binning,
+            roi_min_nm=roi_min_nm,
+            roi_max_nm=roi_max_nm,
+            auto_exposure=auto_exposure,
+            target_fill=target_fill,
         )
 
-        self._manager.set_config(cfg)
+        try:
+            self._manager.set_config(cfg)
+        except ValueError as exc:
+            # stdout carries the JSON stream
+            print(f"Configuration rejected: {exc}", file=sys.stderr, flush=True)
 
     def _on_close(self) -> None:
         """
@@ -0,0 +1,181 @@
+# acquisition/control.py
+import json
+import queue
+import sys
+import threading
+from typing import Callable, Dict, List, Optional, TextIO, Tuple
+
+from .runtime_config import ConfigManager
+
+CAPTURE_KINDS = ("dark", "reference")
+
+
+class AcquisitionControl:
+    """
+    Run-time control state shared by the command, acquisition and
+    sender threads.
+
+    - pause()/resume(): suspend acquisition without closing the device
+    - request_capture(kind, count, device_index): ask the acquisition
+      thread of that device for an averaged 'dark' or 'reference' frame
+      of `count` acquisitions
+    - post(message): queue an extra message (e.g. a dark frame) for the
+      sender thread, which owns stdout
+    """
+
+    def __init__(self) -> None:
+        self._running = threading.Event()
+        self._running.set()
+        self._captures: Dict[int, "queue.Queue[Tuple[str, int]]"] = {}
+        self._captures_lock = threading.Lock()
+        self._messages: "queue.Queue[Dict]" = queue.Queue()
+
+    # ------------------------------------------------------------------ #
+    # Pause / resume
+    # ------------------------------------------------------------------ #
+
+    @property
+    def is_paused(self) -> bool:
+        return not self._running.is_set()
+
+    def pause(self) -> None:
+        self._running.clear()
+
+    def resume(self) -> None:
+        self._running.set()
+
+    def wait_until_resumed(self, timeout: float) -> bool:
+        return self._running.wait(timeout)
+
+    # ------------------------------------------------------------------ #
+    # Averaged captures (dark / reference frames)
+    # ------------------------------------------------------------------ #
+
+    def request_capture(self, kind: str, count: int = 1, device_index: int = 0) -> None:
+        if kind not in CAPTURE_KINDS:
+            raise ValueError(f"Unknown capture kind: {kind!r}")
+        self._capture_queue(device_index).put((kind, max(1, int(count))))
+
+    def next_capture_request(self, device_index: int = 0) -> Optional[Tuple[str, int]]:
+        try:
+            return self._capture_queue(device_index).get_nowait()
+        except queue.Empty:
+            return None
+
+    def _capture_queue(self, device_index: int) -> "queue.Queue[Tuple[str, int]]":
+        with self._captures_lock:
+            return self._captures.setdefault(int(device_index), queue.Queue())
+
+    # ------------------------------------------------------------------ #
+    # Extra messages for the sender
+    # ------------------------------------------------------------------ #
+
+    def post(self, message: Dict) -> None:
+        self._messages.put(message)
+
+    def pending_messages(self) -> List[Dict]:
+        messages = []
+        while True:
+            try:
+                messages.append(self._messages.get_nowait())
+            except queue.Empty:
+                return messages
+
+
+# ---------------------------------------------------------------------------
+# Command channel (JSON lines on stdin)
+# ---------------------------------------------------------------------------
+
+def handle_command(
+    command: Dict,
+    manager: ConfigManager,
+    control: AcquisitionControl,
+    stop_event: threading.Event,
+) -> None:
+    """
+    Apply one command from the 64-bit side:
+
+    - {"cmd": "set_config", "config": {field: value, ...}}
+    - {"cmd": "set_roi", "min_nm": float, "max_nm": float}
+    - {"cmd": "pause"} / {"cmd": "resume"}
+    - {"cmd": "dark", "count": int, "device_index": int}
+      / {"cmd": "reference", ...} (device_index defaults to 0)
+    - {"cmd": "shutdown"}
+
+    Configuration changes are validated by the ConfigManager; invalid
+    values raise ValueError and leave the configuration unchanged.
+    """
+    name = command.get("cmd")
+
+    if name == "set_config":
+        manager.update_config(**command.get("config", {}))
+    elif name == "set_roi":
+        manager.update_config(
+            roi_min_nm=float(command.get("min_nm", 0.0)),
+            roi_max_nm=float(command.get("max_nm", 0.0)),
+        )
+    elif name == "pause":
+        control.pause()
+    elif name == "resume":
+        control.resume()
+    elif name in CAPTURE_KINDS:
+        control.request_capture(
+            name,
+            command.get("count", 1),
+            command.get("device_index", 0),
+        )
+    elif name == "shutdown":
+        stop_event.set()
+        control.resume()
+    else:
+        raise ValueError(f"Unknown command: {name!r}")
+
+
+def command_loop(
+    stream: TextIO,
+    manager: ConfigManager,
+    control: AcquisitionControl,
+    stop_event: threading.Event,
+    stop_on_eof: bool = True,
+    reply: Optional[Callable[[Dict], None]] = None,
+) -> None:
+    """
+    Background thread reading JSON commands line by line from `stream`
+    (normally stdin). Malformed or rejected commands are reported on
+    stderr and skipped. If `stop_on_eof` is set, the end of the stream
+    (the parent process went away) stops the acquisition.
+
+    A command with an "id" is answered through `reply` (normally a write
+    to the stdout stream) with {"type": "ack", "id": ...}, or with
+    {"type": "error", "id": ..., "cmd": ..., "message": ...} if it was
+    rejected, so the 64-bit side learns the outcome.
+    """
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        command: Dict = {}
+        try:
+            command = json.loads(line)
+            if not isinstance(command, dict):
+                raise ValueError("not a JSON object")
+            handle_command(command, manager, control, stop_event)
+        except (ValueError, TypeError) as exc:
+            print(f"Ignoring command {line!r}: {exc}", file=sys.stderr, flush=True)
+            if reply is not None and "id" in command:
+                reply({
+                    "type": "error",
+                    "id": command["id"],
+                    "cmd": command.get("cmd"),
+                    "message": str(exc),
+                })
+        else:
+            if reply is not None and "id" in command:
+                reply({"type": "ack", "id": command["id"], "cmd": command.get("cmd")})
+
+        if stop_event.is_set():
+            return
+
+    if stop_on_eof:
+        stop_event.set()
+        control.resume()
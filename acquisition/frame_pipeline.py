@@ -0,0 +1,139 @@
+# acquisition/frame_pipeline.py
+import ctypes as ct
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+from .spm002 import Spectrometer, SpectrometerConfig
+
+
+@dataclass
+class RawFrame:
+    """
+    One acquired spectrum that still lives in its pipeline buffer.
+
+    - buffer: ctypes count buffer (owned by the pipeline)
+    - t_start_ns / t_end_ns: time.perf_counter_ns() around PHO_Acquire
+    - config: configuration that was active for this acquisition
+    - roi_start / wavelengths: detector pixel and wavelength axis of the
+      buffer (the ROI), wavelengths None if no LUT is available
+    - apply_ms / apply_calls: cost of switching the device to `config`
+    """
+    buffer: ct.Array
+    config: SpectrometerConfig
+    t_start_ns: int = 0
+    t_end_ns: int = 0
+    roi_start: int = 0
+    wavelengths: Optional[List[float]] = None
+    apply_ms: float = 0.0
+    apply_calls: Tuple[str, ...] = ()
+
+
+class FramePipeline:
+    """
+    Double-buffered hand-off between an acquisition and a sender thread.
+
+    - acquire(): called by the acquisition thread; reads the next
+      spectrum into a free buffer and hands it to the sender
+    - get(): called by the sender thread; returns the oldest ready frame
+    - release(frame): sender gives the buffer back after writing it
+
+    The pool has a fixed number of buffers (default 2: one being filled,
+    one being sent). If the sender falls behind, the acquisition thread
+    reclaims the oldest unsent frame instead of waiting, so the
+    spectrometer keeps acquiring back to back; every such drop is
+    counted in `overruns`.
+    """
+
+    def __init__(self, spectrometer: Spectrometer, num_buffers: int = 2) -> None:
+        if num_buffers < 2:
+            raise ValueError("FramePipeline needs at least two buffers.")
+
+        self._spectrometer = spectrometer
+
+        self._free: "queue.Queue[RawFrame]" = queue.Queue()
+        self._ready: "queue.Queue[RawFrame]" = queue.Queue()
+        for _ in range(num_buffers):
+            self._free.put(
+                RawFrame(
+                    buffer=spectrometer.new_buffer(),
+                    config=spectrometer.config,
+                )
+            )
+
+        self._lock = threading.Lock()
+        self.acquired: int = 0
+        self.sent: int = 0
+        self.overruns: int = 0
+
+    # ------------------------------------------------------------------ #
+    # Acquisition thread
+    # ------------------------------------------------------------------ #
+
+    def acquire(self, inspect: Optional[Callable[[ct.Array], None]] = None) -> None:
+        """
+        Acquire one spectrum and hand it to the sender.
+
+        `inspect` is called with the filled buffer before the hand-off,
+        still in the acquisition thread (e.g. AutoExposure.observe).
+        """
+        frame = self._take_buffer()
+
+        spectrometer = self._spectrometer
+        if len(frame.buffer) != spectrometer.roi_pixels:
+            # ROI changed with a new configuration -> reallocate
+            frame.buffer = spectrometer.new_buffer()
+
+        try:
+            frame.t_start_ns, frame.t_end_ns = spectrometer.acquire_into(frame.buffer)
+        except Exception:
+            self._free.put(frame)
+            raise
+
+        if inspect is not None:
+            inspect(frame.buffer)
+
+        frame.config = spectrometer.config
+        frame.roi_start = spectrometer.roi_start
+        frame.wavelengths = spectrometer.roi_wavelengths
+        frame.apply_ms = spectrometer.last_apply_ms
+        frame.apply_calls = spectrometer.last_apply_calls
+
+        with self._lock:
+            self.acquired += 1
+        self._ready.put(frame)
+
+    def _take_buffer(self) -> RawFrame:
+        try:
+            return self._free.get_nowait()
+        except queue.Empty:
+            pass
+
+        # Sender is behind: drop the oldest unsent frame and reuse it
+        try:
+            frame = self._ready.get_nowait()
+        except queue.Empty:
+            # the sender just took the last ready frame; its previous
+            # buffer is about to come back
+            return self._free.get()
+
+        with self._lock:
+            self.overruns += 1
+        return frame
+
+    # ------------------------------------------------------------------ #
+    # Sender thread
+    # ------------------------------------------------------------------ #
+
+    def get(self, timeout: Optional[float] = None) -> Optional[RawFrame]:
+        """Oldest ready frame, or None if none arrived within `timeout`."""
+        try:
+            return self._ready.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def release(self, frame: RawFrame) -> None:
+        with self._lock:
+            self.sent += 1
+        self._free.put(frame)
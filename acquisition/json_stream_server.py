@@ -1,12 +1,20 @@
 # acquisition/json_stream_server.py
+import argparse
+import contextlib
+import dataclasses
 import json
+import sys
 import threading
-from datetime import datetime
-from typing import Dict
+import time
+from operator import add
+from typing import Dict, List, Optional, Sequence
 
-from .spm002 import Spectrometer, SpectrometerConfig, SpectrumData
+from .spm002 import Spectrometer, SpectrometerConfig, SpectrometerError, SpectrumData
 from .runtime_config import ConfigManager
-from .config_gui import ConfigWindow
+from .control import AcquisitionControl, command_loop
+from .frame_pipeline import FramePipeline, RawFrame
+from .preprocessing import Preprocessor, bin_counts
+from .auto_exposure import AutoExposure
 
 
 # ---------------------------------------------------------------------------
@@ -16,125 +24,481 @@ from .config_gui import ConfigWindow
 def spectrum_to_frame(spectrum: SpectrumData) -> Dict:
     return {
         "type": "frame",
-        "timestamp": spectrum.timestamp.isoformat(),
+        "t_start_ns": spectrum.t_start_ns,
+        "t_end_ns": spectrum.t_end_ns,
         "device_index": spectrum.device_index,
         "counts": spectrum.counts,
         # wavelengths are static and sent once in the 'meta' message
     }
 
 
-def config_to_message(config: SpectrometerConfig) -> Dict:
+def raw_frame_to_message(
+    frame: RawFrame,
+    overruns: int,
+    preprocessor: Preprocessor,
+) -> Dict:
+    """
+    Same layout as spectrum_to_frame(), built directly from a pipeline
+    buffer (after binning/averaging), plus the number of frames dropped
+    so far because the sender could not keep up.
+    """
+    counts = frame.buffer[:]
+    if not preprocessor.is_identity:
+        counts = preprocessor.process(counts)
+
+    return {
+        "type": "frame",
+        "t_start_ns": frame.t_start_ns,
+        "t_end_ns": frame.t_end_ns,
+        "device_index": frame.config.device_index,
+        "counts": counts,
+        "overruns": overruns,
+    }
+
+
+def config_to_message(
+    config: SpectrometerConfig,
+    wavelengths: Optional[List[float]] = None,
+    roi_start: int = 0,
+    apply_ms: float = 0.0,
+    apply_calls: Sequence[str] = (),
+) -> Dict:
     """
     Convert the current SpectrometerConfig to a JSON-serializable dict.
 
     This is sent whenever a new configuration is applied to the device.
+    `wavelengths` is the axis of the frames that follow (it changes with
+    ROI and binning), or None if no LUT is available; `roi_start` is the
+    first detector pixel of those frames. `apply_ms` / `apply_calls` report
+    how long the device reconfiguration took and which PHO_Set* calls it
+    needed.
     """
     return {
         "type": "config",
-        "timestamp": datetime.now().isoformat(),
+        "t_ns": time.perf_counter_ns(),
         "device_index": config.device_index,
         "exposure_ms": config.exposure_ms,
         "average": config.average,
         "dark_subtraction": config.dark_subtraction,
         "mode": config.mode,
         "scan_delay": config.scan_delay,
+        "host_average": config.host_average,
+        "host_average_mode": config.host_average_mode,
+        "binning": config.binning,
+        "roi_min_nm": config.roi_min_nm,
+        "roi_max_nm": config.roi_max_nm,
+        "auto_exposure": config.auto_exposure,
+        "target_fill": config.target_fill,
+        "roi_start": roi_start,
+        "apply_ms": round(apply_ms, 3),
+        "apply_calls": list(apply_calls),
+        "wavelengths": wavelengths,
     }
 
 
-def meta_from_first_spectrum(spectrum: SpectrumData) -> Dict:
+def meta_from_first_spectrum(
+    spectrum: SpectrumData,
+    detector_wavelengths: Optional[List[float]] = None,
+) -> Dict:
     """
     Build the static 'meta' message from the first acquired spectrum.
 
-    Only contains properties that do not change during the run.
+    The wavelength axis is that of the shipped (ROI, possibly binned)
+    frames and is updated by later 'config' messages; the full detector
+    axis is sent once as 'detector_wavelengths'.
+
+    All stream timestamps are integer time.perf_counter_ns() values;
+    'clock_perf_ns' / 'clock_wall_ns' are one reading of perf_counter_ns()
+    and time.time_ns() taken together, to convert them to wall-clock time.
     """
+    preprocessor = Preprocessor(spectrum.config)
+    counts = preprocessor.process(spectrum.counts)
+    clock_perf_ns = time.perf_counter_ns()
+    clock_wall_ns = time.time_ns()
     return {
         "type": "meta",
         "device_index": spectrum.device_index,
-        "num_pixels": len(spectrum),
-        "wavelengths": spectrum.wavelengths,  # may be None
+        "num_pixels": len(counts),
+        "wavelengths": preprocessor.axis(spectrum.wavelengths),  # may be None
+        "binning": preprocessor.binning,
+        "exposure_ms": spectrum.config.exposure_ms,
+        "average": spectrum.config.average,
+        "host_average": spectrum.config.host_average,
+        "roi_start": spectrum.pixels[0] if spectrum.pixels else 0,
+        "detector_wavelengths": detector_wavelengths,
+        "clock_perf_ns": clock_perf_ns,
+        "clock_wall_ns": clock_wall_ns,
+    }
+
+
+def capture_average(spectrometer: Spectrometer, kind: str, count: int) -> Dict:
+    """
+    Acquire `count` spectra with the current configuration, average them
+    and build a 'dark' or 'reference' message (`kind`). The counts are
+    binned like the frames, so the result matches the shipped pixel axis.
+    """
+    config = spectrometer.config
+    total: List[float] = []
+    t_start_ns = t_end_ns = 0
+    for i in range(count):
+        spectrum = spectrometer.acquire_spectrum()
+        if i == 0:
+            t_start_ns = spectrum.t_start_ns
+        t_end_ns = spectrum.t_end_ns
+        counts = bin_counts(spectrum.counts, config.binning)
+        total = counts if not total else list(map(add, total, counts))
+
+    return {
+        "type": kind,
+        "t_start_ns": t_start_ns,
+        "t_end_ns": t_end_ns,
+        "device_index": config.device_index,
+        "count": count,
+        "exposure_ms": config.exposure_ms,
+        "average": config.average,
+        "binning": config.binning,
+        "roi_start": spectrometer.roi_start,
+        "counts": [round(c / count, 1) for c in total],
     }
 
 
 # ---------------------------------------------------------------------------
-# Acquisition loop (runs in background thread)
+# Output: all threads write whole JSON lines through one lock
 # ---------------------------------------------------------------------------
 
-def acquisition_loop(manager: ConfigManager, stop_event: threading.Event) -> None:
+_write_lock = threading.Lock()
+
+
+def write_message(message: Dict) -> None:
+    line = json.dumps(message)
+    with _write_lock:
+        print(line, flush=True)
+
+
+# ---------------------------------------------------------------------------
+# Sender loop (one thread per device)
+# ---------------------------------------------------------------------------
+
+def sender_loop(
+    pipeline: FramePipeline,
+    control: AcquisitionControl,
+    stop_event: threading.Event,
+) -> None:
     """
-    Background thread that:
-    - waits for an initial configuration from the GUI
-    - opens the spectrometer with that config
-    - sends one 'meta' message
-    - sends a 'config' message whenever the config changes
-    - continuously acquires spectra and sends 'frame' messages
+    Preprocesses, encodes and writes frames handed over by the
+    acquisition thread, plus any extra messages posted to `control`.
+
+    A 'config' message is written before the first frame that was
+    acquired with a new configuration, so messages stay in order with
+    the frames they describe. The preprocessing state (rolling average)
+    starts fresh with every new configuration.
     """
-    # 1) Wait for the first configuration from the GUI
-    current_config = manager.wait_for_initial_config()
+    last_config = None
+    preprocessor: Optional[Preprocessor] = None
+
+    while not stop_event.is_set():
+        for extra in control.pending_messages():
+            write_message(extra)
+
+        frame = pipeline.get(timeout=0.1)
+        if frame is None:
+            continue
 
-    with Spectrometer(config=current_config) as spectrometer:
-        # 2) Acquire one spectrum to build static META info
-        first = spectrometer.acquire_spectrum()
+        try:
+            if frame.config is not last_config or preprocessor is None:
+                preprocessor = Preprocessor(frame.config)
+                config_msg = config_to_message(
+                    frame.config,
+                    preprocessor.axis(frame.wavelengths),
+                    frame.roi_start,
+                    frame.apply_ms,
+                    frame.apply_calls,
+                )
+                write_message(config_msg)
+                last_config = frame.config
 
-        meta = meta_from_first_spectrum(first)
-        print(json.dumps(meta), flush=True)
+            message = raw_frame_to_message(frame, pipeline.overruns, preprocessor)
+        finally:
+            pipeline.release(frame)
 
-        # 3) Send initial CONFIG message
-        print(json.dumps(config_to_message(current_config)), flush=True)
+        write_message(message)
 
-        # 4) Main acquisition loop
+
+# ---------------------------------------------------------------------------
+# Device loop (one thread per device)
+# ---------------------------------------------------------------------------
+
+def apply_config(
+    spectrometer: Spectrometer,
+    config: SpectrometerConfig,
+    previous: SpectrometerConfig,
+    control: Optional[AcquisitionControl] = None,
+) -> bool:
+    """
+    Apply `config` to the device. If the device rejects it, report it on
+    stderr and as an 'error' message through `control` (written by the
+    sender), restore `previous` (all settings rewritten, as some may have
+    been applied already) and return False; the acquisition continues.
+    """
+    try:
+        spectrometer.configure(config)
+        return True
+    except SpectrometerError as exc:
+        message = f"configuration rejected, keeping the previous one: {exc}"
+        print(
+            f"Device {spectrometer.device_index}: {message}",
+            file=sys.stderr,
+            flush=True,
+        )
+        if control is not None:
+            control.post({
+                "type": "error",
+                "device_index": spectrometer.device_index,
+                "message": message,
+            })
+    spectrometer.invalidate_state()
+    spectrometer.configure(previous)
+    return False
+
+
+def device_loop(
+    spectrometer: Spectrometer,
+    manager: ConfigManager,
+    config_version: int,
+    control: AcquisitionControl,
+    stop_event: threading.Event,
+) -> None:
+    """
+    Acquisition thread of one (already opened) spectrometer:
+
+    - starts a sender thread, which writes 'config' and 'frame' messages
+    - acquires spectra back to back into the FramePipeline and applies
+      config changes, pause/resume and dark/reference captures between
+      frames
+    - in auto-exposure mode, adjusts exposure and average from the
+      acquired frames; the sender announces each change with a 'config'
+      message. A later config update keeps the adjusted values unless it
+      sets a new exposure_ms / average itself (or turns auto exposure off).
+
+    The configuration is shared by all devices; each thread applies it
+    with its own device_index.
+    """
+    device_index = spectrometer.device_index
+    current_config = spectrometer.config
+    # last configuration received from the manager (before auto exposure)
+    requested = current_config
+
+    # Sender thread: encoding and pipe writes overlap the next exposure
+    pipeline = FramePipeline(spectrometer)
+    sender = threading.Thread(
+        target=sender_loop,
+        args=(pipeline, control, stop_event),
+        name=f"SPM002_SenderThread_{device_index}",
+        daemon=True,
+    )
+    sender.start()
+
+    auto = AutoExposure(current_config) if current_config.auto_exposure else None
+
+    try:
         while not stop_event.is_set():
             # Check for updated configuration
-            updated_config = manager.get_config_if_updated()
-            if updated_config is not None:
-                # Apply new configuration to the device
-                spectrometer.configure(updated_config)
-                current_config = updated_config
+            update = manager.get_config_if_newer(config_version)
+            if update is not None:
+                config_version, updated_config = update
+                # Apply new configuration to the device; the sender
+                # announces it with the first frame acquired with it
+                new_config = dataclasses.replace(updated_config, device_index=device_index)
+                if auto is not None and new_config.auto_exposure:
+                    # other fields changed: keep the auto-exposure result
+                    # (within the possibly new limits)
+                    if new_config.exposure_ms == requested.exposure_ms:
+                        exposure_ms = min(
+                            max(current_config.exposure_ms, new_config.exposure_min_ms),
+                            new_config.exposure_max_ms,
+                        )
+                        new_config = dataclasses.replace(new_config, exposure_ms=exposure_ms)
+                    if new_config.average == requested.average:
+                        new_config = dataclasses.replace(
+                            new_config, average=current_config.average
+                        )
+                requested = updated_config
+                if apply_config(spectrometer, new_config, current_config, control):
+                    current_config = new_config
+                    auto = AutoExposure(current_config) if current_config.auto_exposure else None
+
+            capture = control.next_capture_request(device_index)
+            if capture is not None:
+                kind, count = capture
+                control.post(capture_average(spectrometer, kind, count))
 
-                # Inform the client about the new config
-                print(json.dumps(config_to_message(current_config)), flush=True)
+            if control.is_paused:
+                control.wait_until_resumed(timeout=0.1)
+                continue
 
             # Acquire next spectrum
-            spectrum = spectrometer.acquire_spectrum()
-            frame = spectrum_to_frame(spectrum)
-            print(json.dumps(frame), flush=True)
+            pipeline.acquire(inspect=auto.observe if auto is not None else None)
+
+            if auto is not None:
+                adjusted = auto.update()
+                if adjusted is not None and apply_config(
+                    spectrometer, adjusted, current_config, control
+                ):
+                    current_config = adjusted
+    finally:
+        stop_event.set()
+        sender.join(timeout=1.0)
+
+
+# ---------------------------------------------------------------------------
+# Acquisition loop (runs in background thread)
+# ---------------------------------------------------------------------------
+
+def acquisition_loop(
+    manager: ConfigManager,
+    stop_event: threading.Event,
+    control: Optional[AcquisitionControl] = None,
+    device_indices: Optional[Sequence[int]] = None,
+) -> None:
+    """
+    Background thread that:
+    - waits for an initial configuration (GUI or command channel)
+    - opens the spectrometers (`device_indices`, None = the config's
+      device_index, empty = all enumerated devices)
+    - sends one 'devices' message and one 'meta' message per device
+    - runs a device_loop thread per device until stop_event is set
+    """
+    if control is None:
+        control = AcquisitionControl()
+
+    # 1) Wait for the first configuration
+    manager.wait_for_initial_config()
+    config_version, config = manager.snapshot()
+    assert config is not None
+
+    if device_indices is None:
+        indices = [config.device_index]
+    elif not device_indices:
+        indices = list(range(Spectrometer.enumerate_devices()))
+    else:
+        indices = list(device_indices)
+
+    with contextlib.ExitStack() as stack:
+        spectrometers = [
+            stack.enter_context(
+                Spectrometer(config=dataclasses.replace(config, device_index=index))
+            )
+            for index in indices
+        ]
+
+        # 2) Acquire one spectrum per device to build static META info;
+        # all meta messages go out before the first frame
+        write_message({"type": "devices", "device_indices": indices})
+        for spectrometer in spectrometers:
+            manager.set_detector_axis(spectrometer.device_index, spectrometer.wavelengths)
+            first = spectrometer.acquire_spectrum()
+            write_message(meta_from_first_spectrum(first, spectrometer.wavelengths))
+
+        # 3) One acquisition thread per device
+        workers = [
+            threading.Thread(
+                target=device_loop,
+                args=(spectrometer, manager, config_version, control, stop_event),
+                name=f"SPM002_DeviceThread_{spectrometer.device_index}",
+                daemon=True,
+            )
+            for spectrometer in spectrometers
+        ]
+        for worker in workers:
+            worker.start()
+
+        try:
+            stop_event.wait()
+        finally:
+            stop_event.set()
+            for worker in workers:
+                worker.join(timeout=2.0)
 
 
 # ---------------------------------------------------------------------------
-# Entry point: start acquisition thread + GUI
+# Entry point: start acquisition + command threads, GUI or headless
 # ---------------------------------------------------------------------------
 
-def main() -> None:
+def main(argv: Optional[List[str]] = None) -> None:
     """
     Entry point for the 32-bit acquisition process.
 
-    - Creates a ConfigManager and a stop_event
-    - Starts the acquisition_loop in a background thread
-    - Opens the Tk configuration window in the main thread
-    - When the window is closed, the stop_event is set and the
-      acquisition thread is joined for a short time.
+    - Creates a ConfigManager, AcquisitionControl and a stop_event
+    - Starts the acquisition_loop in a background thread (one device, or
+      several with --devices)
+    - Starts the command channel on stdin in a background thread; its
+      acknowledgements and errors go to stdout with the frames
+    - GUI mode: opens the Tk configuration window in the main thread;
+      closing it stops the acquisition
+    - Headless mode (--headless): no Tk at all; the initial configuration
+      comes from the command channel, which also stops the process
+      ('shutdown' command or end of stdin)
     """
+    parser = argparse.ArgumentParser(description="SPM-002 JSON stream server")
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="run without the Tk configuration window",
+    )
+    parser.add_argument(
+        "--devices",
+        nargs="+",
+        metavar="INDEX",
+        help="device indices to acquire concurrently, or 'all'",
+    )
+    args = parser.parse_args(argv)
+
+    device_indices: Optional[List[int]] = None
+    if args.devices:
+        device_indices = [] if args.devices == ["all"] else [int(d) for d in args.devices]
+
     manager = ConfigManager()
+    control = AcquisitionControl()
     stop_event = threading.Event()
 
     worker = threading.Thread(
         target=acquisition_loop,
-        args=(manager, stop_event),
+        args=(manager, stop_event, control, device_indices),
         name="SPM002_AcquisitionThread",
         daemon=True,
     )
     worker.start()
 
-    # Run the configuration UI in the main thread
-    window = ConfigWindow(manager)
-    window.run()  # blocks until the window is closed
+    commands = threading.Thread(
+        target=command_loop,
+        args=(sys.stdin, manager, control, stop_event, args.headless, write_message),
+        name="SPM002_CommandThread",
+        daemon=True,
+    )
+    commands.start()
+
+    if args.headless:
+        try:
+            while not stop_event.wait(0.5):
+                pass
+        except KeyboardInterrupt:
+            pass
+    else:
+        # Tk is only imported when the window is actually used
+        from .config_gui import ConfigWindow
+
+        # Run the configuration UI in the main thread
+        window = ConfigWindow(manager)
+        window.run()  # blocks until the window is closed
 
-    # When the window is closed, stop the acquisition loop
+    # Stop the acquisition loop
     stop_event.set()
+    control.resume()
     worker.join(timeout=2.0)
 
 
 if __name__ == "__main__":
     # IMPORTANT: this module is started as:
-    #   python -m acquisition.json_stream_server
+    #   python -m acquisition.json_stream_server [--headless] [--devices ...]
     # from the 64-bit side.
     main()
@@ -0,0 +1,113 @@
+# acquisition/preprocessing.py
+from collections import deque
+from itertools import repeat
+from operator import add, mul, sub
+from typing import Deque, List, Optional, Sequence, Union
+
+from .spm002.config import SpectrometerConfig
+
+AVERAGE_BOXCAR = "boxcar"
+AVERAGE_EXPONENTIAL = "exponential"
+
+Counts = Union[List[int], List[float]]
+
+
+def bin_counts(counts: Sequence[int], binning: int) -> List[int]:
+    """
+    Sum groups of `binning` neighbouring pixels. Trailing pixels that do
+    not fill a complete bin are dropped.
+
+    Works in `binning` strided passes of C-level map() calls instead of
+    one Python-level loop per output pixel.
+    """
+    if binning <= 1:
+        return list(counts)
+
+    n_bins = len(counts) // binning
+    binned = list(counts[0:n_bins * binning:binning])
+    for offset in range(1, binning):
+        binned = list(map(add, binned, counts[offset:n_bins * binning:binning]))
+    return binned
+
+
+def bin_axis(wavelengths: Sequence[float], binning: int) -> List[float]:
+    """Centre wavelength of every bin produced by bin_counts()."""
+    if binning <= 1:
+        return list(wavelengths)
+    sums = bin_counts(wavelengths, binning)  # type: ignore[arg-type]
+    return list(map(mul, sums, repeat(1.0 / binning)))
+
+
+class Preprocessor:
+    """
+    Optional host-side preprocessing in the acquisition process:
+
+    1) pixel binning (sum of `binning` pixels), then
+    2) rolling average over the last `host_average` frames, either as a
+       boxcar (running sum) or exponential (alpha = 2 / (N + 1)).
+
+    Unlike the device's PHO_SetAverage, the spectrometer keeps its frame
+    rate: every acquired frame produces one output frame. The settings
+    come from SpectrometerConfig, so they travel in the 'config' message.
+    Create a new Preprocessor whenever the configuration changes.
+    """
+
+    def __init__(self, config: SpectrometerConfig) -> None:
+        self.binning = max(1, int(config.binning))
+        self.window = max(1, int(config.host_average))
+        self.mode = config.host_average_mode
+
+        if self.mode not in (AVERAGE_BOXCAR, AVERAGE_EXPONENTIAL):
+            raise ValueError(f"Unknown host averaging mode: {self.mode!r}")
+
+        self._alpha = 2.0 / (self.window + 1)
+        self._history: Deque[List[int]] = deque()
+        self._state: Optional[List[float]] = None
+
+    @property
+    def is_identity(self) -> bool:
+        return self.binning == 1 and self.window == 1
+
+    def axis(self, wavelengths: Optional[Sequence[float]]) -> Optional[List[float]]:
+        """Wavelength axis of the processed frames."""
+        if wavelengths is None:
+            return None
+        return bin_axis(wavelengths, self.binning)
+
+    def process(self, counts: Sequence[int]) -> Counts:
+        binned = bin_counts(counts, self.binning)
+        if self.window == 1:
+            return binned
+
+        if self.mode == AVERAGE_BOXCAR:
+            averaged = self._boxcar(binned)
+        else:
+            averaged = self._exponential(binned)
+
+        # one decimal is far below the shot noise and keeps the JSON small
+        return list(map(round, averaged, repeat(1)))
+
+    def _boxcar(self, frame: List[int]) -> List[float]:
+        # self._state holds the running sum of the frames in self._history
+        if self._state is None or len(self._state) != len(frame):
+            self._history.clear()
+            self._state = [0.0] * len(frame)
+
+        self._history.append(frame)
+        total = list(map(add, self._state, frame))
+        if len(self._history) > self.window:
+            total = list(map(sub, total, self._history.popleft()))
+        self._state = total
+
+        return list(map(mul, total, repeat(1.0 / len(self._history))))
+
+    def _exponential(self, frame: List[int]) -> List[float]:
+        state = self._state
+        if state is None or len(state) != len(frame):
+            self._state = [float(c) for c in frame]
+            return self._state
+
+        # state += alpha * (frame - state)
+        delta = map(mul, map(sub, frame, state), repeat(self._alpha))
+        self._state = list(map(add, state, delta))
+        return self._state
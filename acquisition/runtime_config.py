@@ -1,27 +1,94 @@
 # acquisition/runtime_config.py
-import copy
+import dataclasses
 import threading
-from typing import Optional
+from typing import Dict, List, Optional, Sequence, Tuple
 
+from .preprocessing import AVERAGE_BOXCAR, AVERAGE_EXPONENTIAL
 from .spm002.config import SpectrometerConfig
 
 
+def validate_config(
+    config: SpectrometerConfig,
+    detector_axes: Sequence[Sequence[float]] = (),
+) -> None:
+    """
+    Check the values of `config` before it reaches a device thread.
+
+    `detector_axes` are the LUT wavelength axes of the opened devices; a
+    wavelength ROI must cover at least one pixel of each. Raises
+    ValueError naming every invalid field.
+    """
+    errors: List[str] = []
+    if not config.exposure_ms > 0:
+        errors.append(f"exposure_ms must be > 0, got {config.exposure_ms!r}")
+    for name in ("average", "host_average", "binning"):
+        value = getattr(config, name)
+        if int(value) != value or value < 1:
+            errors.append(f"{name} must be an integer >= 1, got {value!r}")
+    if config.host_average_mode not in (AVERAGE_BOXCAR, AVERAGE_EXPONENTIAL):
+        errors.append(f"Unknown host_average_mode: {config.host_average_mode!r}")
+    if not 0 < config.target_fill <= 1:
+        errors.append(f"target_fill must be in (0, 1], got {config.target_fill!r}")
+    if not 0 < config.exposure_min_ms <= config.exposure_max_ms:
+        errors.append(
+            "exposure limits must satisfy 0 < exposure_min_ms <= exposure_max_ms, "
+            f"got {config.exposure_min_ms!r} / {config.exposure_max_ms!r}"
+        )
+
+    lo = min(config.roi_min_nm, config.roi_max_nm)
+    hi = max(config.roi_min_nm, config.roi_max_nm)
+    if (lo, hi) != (0, 0):
+        if lo < 0:
+            errors.append(f"ROI must be positive, got {lo:g}-{hi:g} nm")
+        for axis in detector_axes:
+            if not any(lo <= wl <= hi for wl in axis):
+                errors.append(
+                    f"ROI {lo:.3f}-{hi:.3f} nm lies outside the detector range "
+                    f"{min(axis):.3f}-{max(axis):.3f} nm"
+                )
+                break
+
+    if errors:
+        raise ValueError("; ".join(errors))
+
+
 class ConfigManager:
     """
     Thread-safe manager for the current SpectrometerConfig.
 
+    SpectrometerConfig is immutable, so the same instance is handed from
+    the setting thread to the acquisition thread without copying.
+
     - set_config(cfg): called by the GUI thread whenever the user
       clicks "Apply/Start" with new values.
+    - update_config(**changes): called by the command channel to change
+      individual fields of the current (or default) configuration.
+    - set_detector_axis(device_index, wavelengths): LUT of an opened
+      device; both setters reject invalid values (validate_config) with
+      ValueError and keep the current configuration.
     - wait_for_initial_config(): blocks until a first configuration
       has been provided.
     - get_config_if_updated(): returns a new configuration if one
       has been set since the last call, otherwise None.
+    - snapshot() / get_config_if_newer(version): versioned access for
+      several consumers (one acquisition thread per spectrometer), each
+      remembering the last version it has applied.
     """
 
     def __init__(self) -> None:
         self._lock = threading.Lock()
         self._current: Optional[SpectrometerConfig] = None
+        self._version: int = 0
         self._update_event = threading.Event()
+        self._detector_axes: Dict[int, List[float]] = {}
+
+    def set_detector_axis(self, device_index: int, wavelengths: Optional[Sequence[float]]) -> None:
+        """Wavelength axis (LUT) of an opened device, to validate ROIs against."""
+        with self._lock:
+            if wavelengths is None:
+                self._detector_axes.pop(device_index, None)
+            else:
+                self._detector_axes[device_index] = list(wavelengths)
 
     # ------------------------------------------------------------------ #
     # Called from GUI thread
@@ -30,10 +97,34 @@ class ConfigManager:
     def set_config(self, config: SpectrometerConfig) -> None:
         """
         Store a new configuration and signal that an update is available.
+
+        Raises ValueError for invalid values (see validate_config).
+        """
+        with self._lock:
+            validate_config(config, list(self._detector_axes.values()))
+            self._current = config
+            self._version += 1
+            self._update_event.set()
+
+    def update_config(self, **changes) -> None:
         """
+        Change individual fields of the current configuration (or of the
+        defaults, if none has been set yet) and signal an update.
+
+        Raises ValueError for unknown field names and invalid values
+        (see validate_config).
+        """
+        known = {f.name for f in dataclasses.fields(SpectrometerConfig)}
+        unknown = set(changes) - known
+        if unknown:
+            raise ValueError(f"Unknown config fields: {', '.join(sorted(unknown))}")
+
         with self._lock:
-            # store a copy so GUI and acquisition do not share the same object
-            self._current = copy.deepcopy(config)
+            base = self._current if self._current is not None else SpectrometerConfig()
+            config = dataclasses.replace(base, **changes)
+            validate_config(config, list(self._detector_axes.values()))
+            self._current = config
+            self._version += 1
             self._update_event.set()
 
     # ------------------------------------------------------------------ #
@@ -44,13 +135,13 @@ class ConfigManager:
         """
         Block until a first configuration has been provided via set_config().
 
-        Returns a copy of the configuration.
+        Returns the configuration.
         """
         while True:
             self._update_event.wait()
             with self._lock:
                 if self._current is not None:
-                    cfg = copy.deepcopy(self._current)
+                    cfg = self._current
                     # clear the event – this update has been consumed
                     self._update_event.clear()
                     return cfg
@@ -58,7 +149,7 @@ class ConfigManager:
     def get_config_if_updated(self) -> Optional[SpectrometerConfig]:
         """
         If a new configuration has been set since the last call,
-        return a copy of it and clear the 'updated' flag.
+        return it and clear the 'updated' flag.
 
         Otherwise return None.
         """
@@ -66,6 +157,25 @@ class ConfigManager:
             return None
 
         with self._lock:
-            cfg = copy.deepcopy(self._current)
+            cfg = self._current
             self._update_event.clear()
             return cfg
+
+    def snapshot(self) -> Tuple[int, Optional[SpectrometerConfig]]:
+        """Current (version, configuration); version 0 = nothing set yet."""
+        with self._lock:
+            return self._version, self._current
+
+    def get_config_if_newer(
+        self,
+        version: int,
+    ) -> Optional[Tuple[int, SpectrometerConfig]]:
+        """
+        (version, configuration) if a configuration newer than `version`
+        has been set, otherwise None. Does not touch the 'updated' flag
+        used by get_config_if_updated().
+        """
+        with self._lock:
+            if self._version <= version or self._current is None:
+                return None
+            return self._version, self._current
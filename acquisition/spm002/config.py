@@ -2,13 +2,17 @@
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(frozen=True)
 class SpectrometerConfig:
     """
     Configuration for the spectrometer.
 
     This object is purely a data container. The Spectrometer class is
     responsible for applying these settings to the actual hardware.
+
+    It is immutable, so GUI, command channel and acquisition thread can
+    share instances without copying; use dataclasses.replace() to derive
+    a changed configuration.
     """
     device_index: int = 0
     exposure_ms: float = 50.0
@@ -16,3 +20,22 @@ class SpectrometerConfig:
     dark_subtraction: int = 0  # 0 = off, 1 = on
     mode: int = 0              # 0 = continuous mode
     scan_delay: int = 0        # used only in certain trigger modes
+
+    # Region of interest: only pixels covering [roi_min_nm, roi_max_nm]
+    # are read from the device (0 / 0 = full detector)
+    roi_min_nm: float = 0.0
+    roi_max_nm: float = 0.0
+
+    # Host-side preprocessing in the acquisition process (not sent to the device)
+    host_average: int = 1               # rolling average over N frames, 1 = off
+    host_average_mode: str = "boxcar"   # "boxcar" or "exponential"
+    binning: int = 1                    # sum of N neighbouring pixels, 1 = off
+
+    # Auto exposure: the acquisition loop adjusts exposure_ms within
+    # [exposure_min_ms, exposure_max_ms] so the peak reaches target_fill
+    # of full scale, and average (1 unless the exposure is at its upper
+    # limit, see auto_exposure.AutoExposure)
+    auto_exposure: int = 0              # 0 = off, 1 = on
+    target_fill: float = 0.7
+    exposure_min_ms: float = 1.0
+    exposure_max_ms: float = 500.0
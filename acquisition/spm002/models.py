@@ -1,6 +1,5 @@
 # acquisition/spm002/models.py
 from dataclasses import dataclass
-from datetime import datetime
 from typing import List, Optional, Sequence
 
 from .config import SpectrometerConfig
@@ -12,13 +11,15 @@ class SpectrumData:
     Represents one acquired spectrum from the spectrometer.
 
     It keeps a snapshot of:
-    - acquisition time
+    - acquisition start/end (time.perf_counter_ns() right before and
+      after PHO_Acquire)
     - configuration that was active for this measurement
-    - pixel indices
+    - pixel indices (detector pixels, offset by the ROI start)
     - raw counts
     - optional wavelength axis (if LUT is available)
     """
-    timestamp: datetime
+    t_start_ns: int
+    t_end_ns: int
     config: SpectrometerConfig
 
     pixels: List[int]
@@ -54,8 +55,11 @@ class SpectrumData:
         counts: Sequence[int],
         wavelengths: Optional[Sequence[float]],
         config: SpectrometerConfig,
+        t_start_ns: int = 0,
+        t_end_ns: int = 0,
+        start_pixel: int = 0,
     ) -> "SpectrumData":
-        pixels = list(range(len(counts)))
+        pixels = list(range(start_pixel, start_pixel + len(counts)))
 
         if wavelengths is None:
             wl_list: Optional[List[float]] = None
@@ -63,7 +67,8 @@ class SpectrumData:
             wl_list = list(wavelengths)
 
         return cls(
-            timestamp=datetime.now(),
+            t_start_ns=t_start_ns,
+            t_end_ns=t_end_ns,
             config=config,
             pixels=pixels,
             counts=list(counts),
@@ -1,12 +1,21 @@
 # acquisition/spm002/spectrometer.py
-from typing import Optional, List
+from typing import Optional, List, Tuple
 import ctypes as ct
+import threading
+import time
 
 from .dll import lib, c_int, c_ushort
 from .config import SpectrometerConfig
 from .models import SpectrumData
 from .exceptions import SpectrometerError
 
+# Extra pixels read on each side of a wavelength ROI
+ROI_MARGIN_PIXELS = 2
+
+# Enumeration and opening go through the DLL's global device list; with
+# one acquisition thread per device they must not interleave
+_OPEN_LOCK = threading.Lock()
+
 
 class Spectrometer:
     """
@@ -15,11 +24,15 @@ class Spectrometer:
     Responsibilities:
     - open/close the device
     - read static properties (number of pixels, LUT → wavelength axis)
-    - apply a SpectrometerConfig to the device
-    - acquire spectra and return SpectrumData objects
+    - apply a SpectrometerConfig to the device, writing only the settings
+      that differ from the last applied configuration
+    - map the configured wavelength ROI to a pixel range via the LUT
+    - acquire spectra (only the ROI pixels) and return SpectrumData objects
+
+    One instance drives one device; several instances (one per
+    device_index, each in its own thread) can be used at the same time.
 
     This class does NOT:
-    - handle multiple devices
     - do any GUI or plotting
     """
 
@@ -30,6 +43,18 @@ class Spectrometer:
         self._num_pixels: Optional[int] = None
         self._wavelengths: Optional[List[float]] = None
 
+        # Pixel region of interest (start, count); None = full detector
+        self._roi: Optional[Tuple[int, int]] = None
+        self._roi_wavelengths: Optional[List[float]] = None
+
+        # Device-state cache: configuration last written to the device
+        # (None = unknown, everything is written on the next apply)
+        self._applied: Optional[SpectrometerConfig] = None
+
+        # Reconfiguration metrics of the last apply_config()
+        self.last_apply_ms: float = 0.0
+        self.last_apply_calls: Tuple[str, ...] = ()
+
     # ------------------------------------------------------------------ #
     # Properties
     # ------------------------------------------------------------------ #
@@ -57,6 +82,23 @@ class Spectrometer:
         """
         return self._wavelengths
 
+    @property
+    def roi_start(self) -> int:
+        """First pixel read by acquire_spectrum()/acquire_into()."""
+        return self._roi[0] if self._roi is not None else 0
+
+    @property
+    def roi_pixels(self) -> int:
+        """Number of pixels read per spectrum."""
+        return self._roi[1] if self._roi is not None else self.num_pixels
+
+    @property
+    def roi_wavelengths(self) -> Optional[List[float]]:
+        """Wavelength axis of the ROI, or None if LUT is not available."""
+        if self._roi is None:
+            return self._wavelengths
+        return self._roi_wavelengths
+
     # ------------------------------------------------------------------ #
     # Context manager support
     # ------------------------------------------------------------------ #
@@ -78,16 +120,26 @@ class Spectrometer:
     # Device lifecycle
     # ------------------------------------------------------------------ #
 
+    @staticmethod
+    def enumerate_devices() -> int:
+        """Number of connected spectrometers."""
+        with _OPEN_LOCK:
+            return lib.PHO_EnumerateDevices()
+
     def open(self) -> None:
         """
         Opens the spectrometer and reads the number of pixels and LUT.
 
-        It assumes a single device environment. If no devices are found,
-        or the configured device_index is invalid, an error is raised.
+        If no devices are found, or the configured device_index is
+        invalid, an error is raised.
         """
         if self._is_open:
             return
 
+        with _OPEN_LOCK:
+            self._open_device()
+
+    def _open_device(self) -> None:
         num_devices = lib.PHO_EnumerateDevices()
         if num_devices <= 0:
             raise SpectrometerError("No spectrometer detected.")
@@ -134,6 +186,7 @@ class Spectrometer:
             raise SpectrometerError("PHO_Close failed.")
 
         self._is_open = False
+        self._applied = None
 
     # ------------------------------------------------------------------ #
     # Configuration
@@ -149,27 +202,94 @@ class Spectrometer:
     def apply_config(self) -> None:
         """
         Apply the current configuration to the device.
+
+        Only settings that differ from the last applied configuration are
+        written (each PHO_Set* call blocks); the calls made and the time
+        taken are kept in last_apply_calls / last_apply_ms.
         """
         if not self._is_open:
             self.open()
 
+        t0 = time.perf_counter()
         cfg = self.config
+        old = self._applied
+        calls: List[str] = []
 
         # Exposure time
-        if lib.PHO_SetTime(self.device_index, float(cfg.exposure_ms)) == 0:
-            raise SpectrometerError("PHO_SetTime failed.")
+        if old is None or cfg.exposure_ms != old.exposure_ms:
+            if lib.PHO_SetTime(self.device_index, float(cfg.exposure_ms)) == 0:
+                self._applied = None
+                raise SpectrometerError("PHO_SetTime failed.")
+            calls.append("PHO_SetTime")
 
         # Averaging
-        if lib.PHO_SetAverage(self.device_index, int(cfg.average)) == 0:
-            raise SpectrometerError("PHO_SetAverage failed.")
+        if old is None or cfg.average != old.average:
+            if lib.PHO_SetAverage(self.device_index, int(cfg.average)) == 0:
+                self._applied = None
+                raise SpectrometerError("PHO_SetAverage failed.")
+            calls.append("PHO_SetAverage")
 
         # Dark subtraction
-        if lib.PHO_SetDs(self.device_index, int(cfg.dark_subtraction)) == 0:
-            raise SpectrometerError("PHO_SetDs failed.")
+        if old is None or cfg.dark_subtraction != old.dark_subtraction:
+            if lib.PHO_SetDs(self.device_index, int(cfg.dark_subtraction)) == 0:
+                self._applied = None
+                raise SpectrometerError("PHO_SetDs failed.")
+            calls.append("PHO_SetDs")
 
         # Mode (0 = continuous)
-        if lib.PHO_SetMode(self.device_index, int(cfg.mode), int(cfg.scan_delay)) == 0:
-            raise SpectrometerError("PHO_SetMode failed.")
+        if old is None or (cfg.mode, cfg.scan_delay) != (old.mode, old.scan_delay):
+            if lib.PHO_SetMode(self.device_index, int(cfg.mode), int(cfg.scan_delay)) == 0:
+                self._applied = None
+                raise SpectrometerError("PHO_SetMode failed.")
+            calls.append("PHO_SetMode")
+
+        # Region of interest (host side only)
+        if old is None or (cfg.roi_min_nm, cfg.roi_max_nm) != (old.roi_min_nm, old.roi_max_nm):
+            self._apply_roi(cfg.roi_min_nm, cfg.roi_max_nm)
+
+        self._applied = cfg
+        self.last_apply_calls = tuple(calls)
+        self.last_apply_ms = (time.perf_counter() - t0) * 1e3
+
+    def invalidate_state(self) -> None:
+        """Forget the cached device state; the next apply writes everything."""
+        self._applied = None
+
+    def pixel_range_for_wavelengths(
+        self,
+        min_nm: float,
+        max_nm: float,
+        margin: int = ROI_MARGIN_PIXELS,
+    ) -> Tuple[int, int]:
+        """
+        Map a wavelength range to (start_pixel, num_pixels) via the LUT,
+        widened by `margin` pixels on each side.
+        """
+        wavelengths = self._wavelengths
+        if wavelengths is None:
+            raise SpectrometerError("No LUT available to map wavelengths to pixels.")
+
+        lo, hi = min(min_nm, max_nm), max(min_nm, max_nm)
+        inside = [i for i, wl in enumerate(wavelengths) if lo <= wl <= hi]
+        if not inside:
+            raise SpectrometerError(
+                f"ROI {lo:.3f}-{hi:.3f} nm lies outside the detector range "
+                f"{min(wavelengths):.3f}-{max(wavelengths):.3f} nm."
+            )
+
+        start = max(0, inside[0] - margin)
+        stop = min(len(wavelengths), inside[-1] + 1 + margin)
+        return start, stop - start
+
+    def _apply_roi(self, min_nm: float, max_nm: float) -> None:
+        if (min_nm == 0 and max_nm == 0) or self._wavelengths is None:
+            self._roi = None
+            self._roi_wavelengths = None
+            return
+
+        start, count = self.pixel_range_for_wavelengths(min_nm, max_nm)
+        self._roi = (start, count)
+        self._roi_wavelengths = self._wavelengths[start:start + count]
 
     def configure(self, config: Optional[SpectrometerConfig] = None) -> None:
         """
@@ -192,22 +312,51 @@ class Spectrometer:
         If the device is not open yet, it will be opened and the current
         configuration will be applied automatically.
         """
+        spectrum_buffer = self.new_buffer()
+        t_start_ns, t_end_ns = self.acquire_into(spectrum_buffer)
+
+        return SpectrumData.from_raw(
+            counts=spectrum_buffer,
+            wavelengths=self.roi_wavelengths,
+            config=self.config,
+            t_start_ns=t_start_ns,
+            t_end_ns=t_end_ns,
+            start_pixel=self.roi_start,
+        )
+
+    def new_buffer(self) -> ct.Array:
+        """
+        Allocate a raw count buffer sized for one spectrum (ROI pixels).
+
+        Opens the device (and applies the configuration) if necessary.
+        """
         if not self._is_open:
             self.open()
             self.apply_config()
 
-        npix = self.num_pixels
+        return (c_ushort * self.roi_pixels)()
 
-        buffer_type = c_ushort * npix
-        spectrum_buffer = buffer_type()
+    def acquire_into(self, buffer: ct.Array) -> Tuple[int, int]:
+        """
+        Acquire one spectrum directly into a buffer from new_buffer().
 
-        if lib.PHO_Acquire(self.device_index, 0, npix, spectrum_buffer) == 0:
-            raise SpectrometerError("PHO_Acquire failed.")
+        Avoids allocating and converting per frame, so callers can reuse
+        a fixed set of buffers (see acquisition.frame_pipeline).
+
+        Returns time.perf_counter_ns() taken immediately before and after
+        PHO_Acquire.
+        """
+        npix = self.roi_pixels
+        if len(buffer) != npix:
+            raise SpectrometerError(
+                f"Buffer holds {len(buffer)} pixels, spectrum has {npix}."
+            )
 
-        counts = [spectrum_buffer[i] for i in range(npix)]
+        start = self.roi_start
+        t_start_ns = time.perf_counter_ns()
+        ok = lib.PHO_Acquire(self.device_index, start, npix, buffer)
+        t_end_ns = time.perf_counter_ns()
 
-        return SpectrumData.from_raw(
-            counts=counts,
-            wavelengths=self._wavelengths,
-            config=self.config,
-        )
+        if ok == 0:
+            raise SpectrometerError("PHO_Acquire failed.")
+        return t_start_ns, t_end_ns
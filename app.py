@@ -1,70 +1,515 @@
 # app.py (im Repo-Root, x64 side)
+"""
+x64 entry point of the phase lock.
+
+    python app.py                                   # Tk GUI
+    python app.py --headless --config lock.json     # service, no Tk
+    python app.py --headless --duration 3600 --max-rate 20 --status-interval 10
+    python app.py --status-port 8765                # + http://127.0.0.1:8765/metrics
+    python app.py --rotator serial:COM6             # native ELLx driver, no .NET
+
+Startup (phase_control.startup): the 32-bit acquisition process, the
+Elliptec discovery/homing and the fit warm-up (lmfit import, one fit on
+a synthetic spectrum) run concurrently, each with its own timeout, while
+Tk/matplotlib are imported in the background; the engines are created
+once all are ready. The warm-up is best effort: if it fails, startup
+continues and the first fit pays for it. The duration of every startup
+phase up to the first locked frame is printed once it is reached.
+
+The settings file is JSON with optional sections
+
+    {
+      "analysis":    {"wavelength_range": [800, 805], "avg_spectra": 10, ...},
+      "acquisition": {"exposure_ms": 20, "average": 1, ...},
+      "devices":     [0, 1]
+    }
+
+"analysis" holds AnalysisConfig fields (lengths in nm, angles in rad),
+"acquisition" SpectrometerConfig fields for the headless acquisition start,
+"devices" the spectrometer indices ([] = all connected).
+
+The acquisition ROI follows the analysed wavelength_range (+- ROI_MARGIN_NM),
+so only the pixels the fit uses are read and shipped.
+"""
+import argparse
+import json
 import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
 
+_IMPORT_START = time.perf_counter()
+
+from base_lib.models import Prefix
 from phase_control.analysis.config import AnalysisConfig
+from phase_control.analysis.controller import LockController
+from phase_control.analysis.phase_tracker import warm_up
 from phase_control.analysis.run_analysis import AnalysisEngine
+from phase_control.correction_io.rotator import Rotator
 from phase_control.stream_io import (
     SpectrometerStreamClient,
     FrameBuffer,
-    StreamMeta,
+    CalibrationStore,
+    FrameRecorder,
 )
-from phase_control.ui.main_window import run_main_window
+from phase_control.stream_io.calibration import capture_dark, capture_reference
+from phase_control.startup import Component, StartupProfile, bring_up, preload, watch_first_lock
+
+_IMPORT_END = time.perf_counter()
+
+# dark / reference frames, reused across runs
+CALIBRATION_PATH = Path(__file__).resolve().parent / "calibration.npz"
+
+# spectrometers to acquire: None = the configured one, [] = all connected,
+# or a list of device indices (one waveplate per device, see create_engines)
+SPECTROMETER_DEVICES: Optional[list[int]] = None
+
+# waveplate driver: "dll" = Thorlabs ELLO_DLL via clr (.NET), "serial:<port>"
+# = native ELLx protocol via pyserial (elliptec_serial), e.g. "serial:COM6"
+ROTATOR_BACKEND = "dll"
+
+# record all frames to compressed frame stores (<path>_dev<N>.psfs), None = off
+RECORD_PATH: Optional[Path] = None
+
+# headless mode: seconds between status lines
+STATUS_INTERVAL_S = 5.0
+
+# local HTTP status / Prometheus endpoint (phase_control.analysis.status_server), None = off
+STATUS_PORT: Optional[int] = None
+
+# acquire only AnalysisConfig.wavelength_range widened by this margin on each
+# side (set_roi at startup and whenever the range changes), None = full detector
+ROI_MARGIN_NM: Optional[float] = 2.0
+
+# seconds from start to the first locked frame before the startup profile warns
+STARTUP_BUDGET_S = 10.0
+
+# bring-up timeouts in seconds, measured from the common start; the GUI
+# acquisition waits for the first configuration by the user (no timeout)
+ACQUISITION_TIMEOUT_S = 30.0
+ROTATOR_TIMEOUT_S = 20.0
+WARM_UP_TIMEOUT_S = 30.0
+
+# imported in the background during the bring-up (GUI mode only)
+PRELOAD_UI_MODULES = ["phase_control.ui.main_window"]
 
 
 def reader_loop(
     client: SpectrometerStreamClient,
-    buffer: FrameBuffer,
+    buffers: dict[int, FrameBuffer],
     stop_event: threading.Event,
+    recorders: Optional[dict[int, FrameRecorder]] = None,
 ) -> None:
     """
     Background thread:
 
     - consumes frames from the SpectrometerStreamClient
-    - updates the FrameBuffer with the latest frame
-    - exits when stop_event is set or the stream ends
+    - routes each frame to the FrameBuffer of its device_index
+    - optionally records every frame (not only the latest) to disk; a
+      recorder that fails is closed and dropped, the lock continues
+    - exits when stop_event is set or the stream ends (then sets
+      stop_event, which ends a headless run)
     """
     try:
         for frame in client.frames():
             if stop_event.is_set():
                 break
-            buffer.update(frame)
+            buffer = buffers.get(frame.device_index)
+            if buffer is not None:
+                buffer.update(frame)
+            if recorders is not None:
+                recorder = recorders.get(frame.device_index)
+                if recorder is not None:
+                    try:
+                        recorder.record(frame)
+                    except Exception as exc:
+                        # a failing recording must not stop the lock
+                        print(f"Recording of device {frame.device_index} stopped: {exc!r}")
+                        recorders.pop(frame.device_index).close()
     finally:
+        stop_event.set()
         client.stop()
+        for recorder in (recorders or {}).values():
+            recorder.close()
+
+
+def roi_sync_loop(
+    client: SpectrometerStreamClient,
+    engines: dict[int, AnalysisEngine],
+    stop_event: threading.Event,
+    margin_nm: float,
+    poll_s: float = 0.2,
+    reply_timeout_s: float = 5.0,
+) -> None:
+    """
+    Background thread: keep the acquisition ROI at the analysed
+    wavelength range. Sends set_roi(union of all engines'
+    wavelength_range +- margin_nm) at start and whenever a
+    wavelength_range changes (AnalysisConfig.field_version), and prints
+    whether the acquisition accepted it.
+    """
+    versions: Optional[list[int]] = None
+    while not stop_event.is_set():
+        current = [e.config.field_version("wavelength_range") for e in engines.values()]
+        if current != versions:
+            versions = current
+            ranges = [e.config.wavelength_range for e in engines.values()]
+            min_nm = max(min(r.min.value(Prefix.NANO) for r in ranges) - margin_nm, 0.0)
+            max_nm = max(r.max.value(Prefix.NANO) for r in ranges) + margin_nm
+            try:
+                client.set_roi(min_nm, max_nm).result(timeout=reply_timeout_s)
+            except ValueError as exc:
+                print(f"Acquisition rejected the ROI {min_nm:.2f}-{max_nm:.2f} nm: {exc}")
+            except TimeoutError:
+                print(f"No reply to the acquisition ROI {min_nm:.2f}-{max_nm:.2f} nm.")
+            except (OSError, RuntimeError) as exc:
+                print(f"Cannot set the acquisition ROI: {exc!r}")
+                return
+            else:
+                print(f"Acquisition ROI: {min_nm:.2f}-{max_nm:.2f} nm")
+        stop_event.wait(poll_s)
 
 
-def main() -> None:
+def open_rotators(
+    count: Optional[int], backend: str = ROTATOR_BACKEND
+) -> tuple[list[Rotator], Callable[[], None]]:
+    """
+    Connected and homed waveplates in address order, and a function that
+    disconnects them. A single one is the device at address 0; otherwise
+    the Elliptec bus is scanned once (count None = every device found).
+
+    `backend` is "dll" (Thorlabs ELLO_DLL, ElliptecRotator/ElliptecBus)
+    or "serial:<port>" (ElliptecSerialRotator, no .NET runtime).
+    """
+    if backend.startswith("serial:"):
+        return _open_serial_rotators(count, backend[len("serial:"):])
+    if backend != "dll":
+        raise ValueError(f"Unknown rotator backend {backend!r} (use 'dll' or 'serial:<port>').")
+
+    # imported here: the Elliptec driver needs the .NET runtime (clr)
+    if count == 1:
+        from phase_control.correction_io.elliptec_ell14 import ElliptecRotator
+
+        rotator = ElliptecRotator(max_address="0")
+        return [rotator], rotator.close
+
+    from phase_control.correction_io.elliptec_bus import ElliptecBus
+
+    bus = ElliptecBus()
+    addresses = sorted(bus.addresses, key=lambda a: int(a, 16))
+    return [bus.channel(address) for address in addresses], bus.close
+
+
+def _open_serial_rotators(
+    count: Optional[int], port: str
+) -> tuple[list[Rotator], Callable[[], None]]:
+    # imported here: only this backend needs pyserial
+    from phase_control.correction_io.elliptec_serial import (
+        ElliptecSerialPort,
+        ElliptecSerialRotator,
+    )
+
+    bus = ElliptecSerialPort(port)
+    try:
+        if count == 1:
+            addresses = ["0"]
+        else:
+            addresses = [info.address for info in bus.scan()]
+        rotators: list[Rotator] = [
+            ElliptecSerialRotator(port=port, address=address, bus=bus)
+            for address in sorted(addresses, key=lambda a: int(a, 16))
+        ]
+    except BaseException:
+        bus.close()
+        raise
+    return rotators, bus.close
+
+
+def create_engines(
+    client: SpectrometerStreamClient,
+    calibration: CalibrationStore,
+    analysis_settings: Optional[dict[str, Any]] = None,
+    rotators: Optional[list[Rotator]] = None,
+) -> tuple[dict[int, FrameBuffer], dict[int, AnalysisEngine]]:
+    """
+    One FrameBuffer, AnalysisConfig and AnalysisEngine per spectrometer.
+    Every AnalysisConfig starts from `analysis_settings` (see
+    AnalysisConfig.from_dict), or the defaults.
+
+    The waveplates (`rotators`, opened here with open_rotators if None)
+    are assigned in address order to the spectrometers in device order.
+    """
+    def new_config() -> AnalysisConfig:
+        return AnalysisConfig.from_dict(analysis_settings or {})
+
+    buffers = {
+        index: FrameBuffer(meta, calibration)
+        for index, meta in client.metas.items()
+    }
+
+    if rotators is None:
+        rotators, _ = open_rotators(len(buffers))
+    if len(rotators) < len(buffers):
+        raise RuntimeError(
+            f"{len(buffers)} spectrometers but only {len(rotators)} "
+            "Elliptec devices found."
+        )
+
+    engines = {
+        index: AnalysisEngine(
+            config=new_config(),
+            buffer=buffers[index],
+            rotator=rotator,
+        )
+        for index, rotator in zip(sorted(buffers), rotators)
+    }
+    return buffers, engines
+
+
+def load_settings(path: Optional[Path]) -> dict[str, Any]:
+    """Settings file (see module docstring); an empty dict without one."""
+    if path is None:
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        settings = json.load(f)
+    unknown = set(settings) - {"analysis", "acquisition", "devices"}
+    if unknown:
+        raise ValueError(f"Unknown sections in {path}: {sorted(unknown)}")
+    return settings
+
+
+def format_status(elapsed_s: float, controller: LockController, rates: dict[int, float]) -> str:
+    """One status line: per device steps/s, phase, correction, residual, step time."""
+    parts = [f"[{elapsed_s:8.1f} s]"]
+    for device, engine in controller.engines.items():
+        result = controller.latest(device)
+        phase = correction = residual = "-"
+        if result is not None:
+            if result.current_phase is not None:
+                phase = f"{result.current_phase.Rad:+.3f} rad"
+            if result.correction_angle is not None:
+                correction = f"{result.correction_angle.Deg:+.2f} deg"
+            if result.residual is not None:
+                residual = f"{result.residual:.4g}"
+        stats = (engine.timer.snapshot() or {}).get("total")
+        step = f"{stats.p50_ms:.1f} ms" if stats is not None and stats.count else "-"
+        parts.append(
+            f"dev {device}: {rates.get(device, 0.0):5.1f}/s phase {phase} "
+            f"corr {correction} residual {residual} step {step}"
+        )
+    return " | ".join(parts)
+
+
+def run_headless(
+    engines: dict[int, AnalysisEngine],
+    stop_event: threading.Event,
+    duration_s: float = 0.0,
+    status_interval_s: float = STATUS_INTERVAL_S,
+    max_rate_hz: float = 0.0,
+) -> None:
+    """
+    Run the lock without Tk until `duration_s` has passed (0 = forever),
+    the stream ends, the analysis fails or Ctrl+C; print a status line
+    every `status_interval_s`.
+    """
+    controller = LockController(
+        engines,
+        min_interval_s=1.0 / max_rate_hz if max_rate_hz > 0 else 0.0,
+    )
+    controller.start()
+    print(f"Headless lock running on device(s) {sorted(engines)}, Ctrl+C to stop.")
+
+    t_start = t_status = time.monotonic()
+    counts = {device: 0 for device in engines}
+    try:
+        while not stop_event.is_set():
+            now = time.monotonic()
+            if duration_s > 0 and now - t_start >= duration_s:
+                break
+            if not controller.is_running:
+                print(f"Analysis stopped: {controller.error!r}")
+                break
+
+            if now - t_status >= status_interval_s:
+                rates = {}
+                for device, engine in engines.items():
+                    stats = (engine.timer.snapshot() or {}).get("total")
+                    count = stats.count if stats is not None else 0
+                    rates[device] = (count - counts[device]) / (now - t_status)
+                    counts[device] = count
+                t_status = now
+                print(format_status(now - t_start, controller, rates), flush=True)
+
+            stop_event.wait(0.1)
+    except KeyboardInterrupt:
+        print("Interrupted.")
+    finally:
+        controller.stop()
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Phase lock (x64 side).")
+    parser.add_argument("--headless", action="store_true",
+                        help="run without Tk (also starts the acquisition headless)")
+    parser.add_argument("--config", type=Path, default=None,
+                        help="JSON settings file (analysis / acquisition / devices)")
+    parser.add_argument("--devices", nargs="+", default=None,
+                        help="spectrometer indices, or 'all'")
+    parser.add_argument("--duration", type=float, default=0.0,
+                        help="headless: seconds to run, 0 = until Ctrl+C")
+    parser.add_argument("--max-rate", type=float, default=0.0,
+                        help="headless: max. analysis steps per second and device, 0 = every frame")
+    parser.add_argument("--status-interval", type=float, default=STATUS_INTERVAL_S,
+                        help="headless: seconds between status lines")
+    parser.add_argument("--record", type=Path, default=RECORD_PATH,
+                        help="record all frames to <path>_dev<N>.psfs")
+    parser.add_argument("--rotator", default=ROTATOR_BACKEND,
+                        help="waveplate driver: 'dll' (Thorlabs ELLO_DLL) or 'serial:<port>'")
+    parser.add_argument("--status-port", type=int, default=STATUS_PORT,
+                        help="serve /status (JSON) and /metrics (Prometheus) on localhost")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
     """
     x64 side entry point:
 
-    - start 32-bit acquisition subprocess via SpectrometerStreamClient
-    - create the shared AnalysisConfig instance
-    - create FrameBuffer + AnalysisEngine
-    - start a reader thread
-    - run the Tk main window (tabs) in the main thread
+    - concurrently: start the 32-bit acquisition subprocess via
+      SpectrometerStreamClient, connect and home the waveplate(s) and
+      warm up the fit; wait until all are ready
+    - load dark/reference frames
+    - create FrameBuffer + AnalysisConfig + AnalysisEngine per spectrometer
+    - start a reader thread, a thread keeping the acquisition ROI at the
+      analysed wavelength range (and optionally the HTTP status server)
+    - run the Tk main window (tabs) in the main thread, or with
+      --headless the lock loop with periodic status lines
     """
-    client = SpectrometerStreamClient()
-    meta: StreamMeta = client.start()
+    profile = StartupProfile(_IMPORT_START)
+    profile.add("imports", _IMPORT_START, _IMPORT_END)
+
+    args = parse_args(argv)
+    settings = load_settings(args.config)
+
+    devices = settings.get("devices", SPECTROMETER_DEVICES)
+    if args.devices is not None:
+        devices = [] if args.devices == ["all"] else [int(d) for d in args.devices]
+
+    client = SpectrometerStreamClient(
+        headless=args.headless,
+        initial_config=settings.get("acquisition"),
+        devices=devices,
+    )
+    analysis_settings = settings.get("analysis")
+    # None: one per selected device, as many as found for "all" ([])
+    rotator_count = 1 if devices is None else (len(devices) or None)
 
-    buffer = FrameBuffer(meta)
-    config = AnalysisConfig()
-    engine = AnalysisEngine(config=config, buffer=buffer)
+    if not args.headless:
+        preload(PRELOAD_UI_MODULES, profile)
+    try:
+        ready = bring_up(
+            [
+                Component(
+                    "acquisition start",
+                    client.start,
+                    ACQUISITION_TIMEOUT_S if args.headless else None,
+                ),
+                Component(
+                    "elliptec",
+                    lambda: open_rotators(rotator_count, args.rotator),
+                    ROTATOR_TIMEOUT_S,
+                    close=lambda opened: opened[1](),
+                ),
+                Component(
+                    "fit warm-up",
+                    lambda: warm_up(AnalysisConfig.from_dict(analysis_settings or {})),
+                    WARM_UP_TIMEOUT_S,
+                    required=False,
+                ),
+            ],
+            profile,
+        )
+    except BaseException:
+        client.stop()
+        raise
+    rotators, close_rotators = ready["elliptec"]
+
+    try:
+        with profile.phase("calibration"):
+            calibration = CalibrationStore(CALIBRATION_PATH)
+        with profile.phase("engines"):
+            buffers, engines = create_engines(
+                client, calibration, analysis_settings, rotators=rotators
+            )
+    except BaseException:
+        close_rotators()
+        client.stop()
+        raise
+
+    recorders = None
+    if args.record is not None:
+        recorders = {
+            index: FrameRecorder(args.record.with_name(f"{args.record.stem}_dev{index}"), meta)
+            for index, meta in client.metas.items()
+        }
 
     stop_event = threading.Event()
 
     reader = threading.Thread(
         target=reader_loop,
-        args=(client, buffer, stop_event),
+        args=(client, buffers, stop_event, recorders),
         name="SpectrometerReaderThread",
         daemon=True,
     )
     reader.start()
 
+    if ROI_MARGIN_NM is not None:
+        threading.Thread(
+            target=roi_sync_loop,
+            args=(client, engines, stop_event, ROI_MARGIN_NM),
+            name="RoiSyncThread",
+            daemon=True,
+        ).start()
+    watch_first_lock(engines, profile, stop_event, budget_s=STARTUP_BUDGET_S)
+
+    status_server = None
+    if args.status_port is not None:
+        from phase_control.analysis.status_server import StatusServer
+
+        status_server = StatusServer(engines, port=args.status_port)
+        status_server.start()
+        print(f"Status: {status_server.url}/status, metrics: {status_server.url}/metrics")
+
     try:
-        run_main_window(config=config, engine=engine, stop_event=stop_event)
+        if args.headless:
+            run_headless(
+                engines,
+                stop_event,
+                duration_s=args.duration,
+                status_interval_s=args.status_interval,
+                max_rate_hz=args.max_rate,
+            )
+        else:
+            # imported here: headless runs do not need Tk / matplotlib
+            with profile.phase("ui import (wait for preload)"):
+                from phase_control.ui.main_window import run_main_window
+
+            run_main_window(
+                engines=engines,
+                stop_event=stop_event,
+                on_capture_dark=lambda device: capture_dark(
+                    client, calibration, device_index=device
+                ),
+                on_capture_reference=lambda device: capture_reference(
+                    client, calibration, device_index=device
+                ),
+            )
     finally:
         stop_event.set()
+        if status_server is not None:
+            status_server.stop()
         reader.join(timeout=2.0)
         client.stop()
+        close_rotators()
 
 
 if __name__ == "__main__":
@@ -3,13 +3,19 @@ from typing import List
 
 from base_lib.models import Length, Prefix, Range
 from phase_control.domain.models import Spectrum
+from phase_control.stream_io.frame_store import FRAME_STORE_SUFFIX, FrameStoreReader
 
 def load_spectra(path: str | Path) -> List[Spectrum]:
     """
     Read the spectrum text file and return a list of Spectrogram instances.
     Each data row (after the header) becomes one Spectrogram.
+
+    Recordings in the binary frame store format (.psfs) are read with
+    load_frame_store().
     """
     path = Path(path)
+    if path.suffix == FRAME_STORE_SUFFIX:
+        return load_frame_store(path)
 
     with path.open(encoding="utf-8", errors="replace") as f:
         # 1) Skip metadata lines
@@ -46,3 +52,20 @@ def load_spectra(path: str | Path) -> List[Spectrum]:
             )
 
     return spectrograms
+
+
+def load_frame_store(
+    path: str | Path,
+    start: int = 0,
+    stop: int | None = None,
+) -> List[Spectrum]:
+    """
+    Read frames [start, stop) of a recorded frame store (.psfs) as
+    normalized spectra. Only the chunks covering the range are
+    decompressed.
+    """
+    with FrameStoreReader(path) as reader:
+        if reader.wavelengths is None:
+            raise ValueError("Frame store has no wavelength axis.")
+        counts, _, _ = reader.read(start, stop)
+        return [Spectrum.from_raw_data(reader.wavelengths, row) for row in counts]
@@ -1,17 +1,34 @@
 from dataclasses import dataclass, fields, asdict
 import inspect
 import math
-from typing import Any, Callable, ClassVar, Sequence, TypeVar, get_type_hints
+from typing import TYPE_CHECKING, Any, Callable, ClassVar, Sequence, TypeVar, get_type_hints
 
-import lmfit
 import numpy as np
 
 from base_lib.models import Angle, Length, Prefix, Range
 
+if TYPE_CHECKING:
+    # lmfit (scipy) is only imported when fitting: see PhaseTracker
+    import lmfit
+
 T = TypeVar("T", bound="FitParameter")
 
+_UNSET = object()
+
 @dataclass
 class FitParameter:
+    """
+    Fit parameters of the usCFG model.
+
+    Instances are shared and mutated in place (UI, PhaseTracker), so every
+    assignment of a public field that changes its value is versioned:
+    `version` counts changes, `field_version(name)` is the version of the
+    last change of one field and `changed_since(version)` the set of
+    fields changed after a version seen before. Consumers (UI fields,
+    cached cut indices) keep the version they last synchronized with and
+    only redo work for fields that actually changed. Versions are bumped
+    by the thread that assigns; readers only compare integers.
+    """
     carrier_wavelength: Length = Length(802.38, Prefix.NANO)
     starting_wavelength: Length = Length(808.352, Prefix.NANO)
     bandwidth: Length = Length(7.4728, Prefix.NANO)
@@ -20,6 +37,43 @@ class FitParameter:
     acceleration: float = 0.0979 * np.pi * 2
     residual: float = 0
     
+    # ------------------------------------------------------------------ #
+    # Change tracking
+    # ------------------------------------------------------------------ #
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        old = self.__dict__.get(name, _UNSET)
+        object.__setattr__(self, name, value)
+        if name.startswith("_") or old is value:
+            return
+        if old is not _UNSET:
+            try:
+                if bool(old == value):
+                    return
+            except (TypeError, ValueError):
+                pass
+
+        version = self.__dict__.get("_version", 0) + 1
+        self.__dict__["_version"] = version
+        self.__dict__.setdefault("_field_versions", {})[name] = version
+
+    @property
+    def version(self) -> int:
+        """Number of field changes so far."""
+        return self.__dict__.get("_version", 0)
+
+    def field_version(self, name: str) -> int:
+        """Version of the last change of `name` (0 = never set)."""
+        return self.__dict__.get("_field_versions", {}).get(name, 0)
+
+    def changed_since(self, version: int) -> set[str]:
+        """Names of the fields changed after `version`."""
+        return {
+            name
+            for name, changed in self.__dict__.get("_field_versions", {}).items()
+            if changed > version
+        }
+
     def to_fit_kwargs(self, func: Callable[..., Any]) -> dict[str, float]:
         sig = inspect.signature(func)
         param_names = list(sig.parameters.keys())[1:]  
@@ -37,7 +91,7 @@ class FitParameter:
 
     
     @classmethod
-    def from_fit_result(cls: type[T], base: T, result: lmfit.model.ModelResult) -> T:
+    def from_fit_result(cls: type[T], base: T, result: "lmfit.model.ModelResult") -> T:
         best = result.best_values
         type_hints: dict[str, type[Any]] = get_type_hints(cls)
         kwargs: dict[str, Any] = {}
@@ -115,3 +169,28 @@ class AnalysisConfig(FitParameter):
     wavelength_range: Range[Length] = Range(Length(800, Prefix.NANO), Length(805, Prefix.NANO))
     residuals_threshold: float = 5
     avg_spectra: int = 10
+
+    @classmethod
+    def from_dict(cls, values: dict[str, Any]) -> "AnalysisConfig":
+        """
+        Config from plain numbers as in a JSON settings file: lengths in nm,
+        angles in rad, wavelength_range as [min_nm, max_nm]. Missing fields
+        keep their defaults, unknown ones raise ValueError.
+        """
+        config = cls()
+        type_hints = get_type_hints(cls)
+        names = {f.name for f in fields(cls)}
+
+        for name, value in values.items():
+            if name not in names:
+                raise ValueError(f"Unknown analysis setting: {name!r}")
+            if name == "wavelength_range":
+                wl_min, wl_max = value
+                value = Range(Length(float(wl_min), Prefix.NANO), Length(float(wl_max), Prefix.NANO))
+            elif type_hints[name] is int:
+                value = int(value)
+            else:
+                value = cls._from_float_conv(type_hints[name])(float(value))
+            setattr(config, name, value)
+
+        return config
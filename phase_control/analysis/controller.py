@@ -0,0 +1,108 @@
+# phase_control/analysis/controller.py
+"""
+Run / reset logic of the phase lock, shared by the Tk MainWindow and
+the headless service in app.py.
+
+LockController owns the AnalysisWorker for a set of engines (one per
+spectrometer):
+
+- start(): reset all engines (new PhaseTracker with the current config,
+  cleared timings and history) and start the worker thread
+- stop():  stop the worker, keep the engine state (timeout 0: only
+  signal the stop, start()/reset() wait for the threads)
+- reset(): stop and reset the engines; waits for a step still in
+  progress (up to STEP_TIMEOUT_S) and raises RuntimeError instead of
+  resetting engines that are still being stepped
+
+Results are kept per device (latest()) and optionally forwarded to
+`on_result(device_index, result)` in the analysis thread.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Callable, Mapping, Optional
+
+from phase_control.analysis.run_analysis import AnalysisEngine, AnalysisPlotResult
+from phase_control.analysis.worker import STOP_TIMEOUT_S, AnalysisWorker
+
+# longest analysis step waited for before the engines are reset
+# (a rotate blocks for the move plus its settle time)
+STEP_TIMEOUT_S = 15.0
+
+
+class LockController:
+
+    def __init__(
+        self,
+        engines: Mapping[int, AnalysisEngine],
+        on_result: Optional[Callable[[int, AnalysisPlotResult], None]] = None,
+        min_interval_s: float = 0.0,
+    ) -> None:
+        if not engines:
+            raise ValueError("LockController needs at least one AnalysisEngine.")
+
+        self.engines = dict(engines)
+        self._on_result = on_result
+
+        self._lock = threading.Lock()
+        self._latest: dict[int, AnalysisPlotResult] = {}
+
+        self._worker = AnalysisWorker(
+            self.engines,
+            self._publish,
+            min_interval_s=min_interval_s,
+        )
+
+    # ------------------------------------------------------------------ #
+    # State
+    # ------------------------------------------------------------------ #
+
+    @property
+    def is_running(self) -> bool:
+        return self._worker.is_running
+
+    @property
+    def error(self) -> Optional[BaseException]:
+        """Exception that stopped the analysis, if any."""
+        return self._worker.error
+
+    @property
+    def steps(self) -> int:
+        """Analysis steps with a result since the controller was created."""
+        return self._worker.steps
+
+    def latest(self, device: int) -> Optional[AnalysisPlotResult]:
+        """Newest result of `device` (not consumed, unlike LatestResult.take)."""
+        with self._lock:
+            return self._latest.get(device)
+
+    # ------------------------------------------------------------------ #
+    # Control
+    # ------------------------------------------------------------------ #
+
+    def start(self) -> None:
+        """Reset all engines and (re)start the analysis thread."""
+        self.reset()
+        self._worker.start()
+
+    def stop(self, timeout: Optional[float] = STOP_TIMEOUT_S) -> bool:
+        """Stop the analysis; False if a step is still finishing after `timeout`."""
+        return self._worker.stop(timeout)
+
+    def reset(self) -> None:
+        if not self._worker.stop(STEP_TIMEOUT_S):
+            raise RuntimeError(
+                f"Analysis step still running after {STEP_TIMEOUT_S:g} s; "
+                "engines not reset."
+            )
+        for engine in self.engines.values():
+            engine.reset()
+        with self._lock:
+            self._latest.clear()
+
+    def _publish(self, device: int, result: AnalysisPlotResult) -> None:
+        with self._lock:
+            self._latest[device] = result
+        if self._on_result is not None:
+            self._on_result(device, result)
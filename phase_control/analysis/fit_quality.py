@@ -0,0 +1,166 @@
+# phase_control/analysis/fit_quality.py
+"""
+Fit-quality diagnostics of the PhaseTracker.
+
+FitQualityLog keeps the last `capacity` fits and the last `capacity`
+accept/reject decisions in preallocated rolling arrays:
+
+- per fit (one lmfit run per spectrum): time, residual (sum of squared
+  residuals), number of function evaluations, fit duration, success
+- per decision (every `avg_spectra` fits the averaged fit is compared
+  with `residuals_threshold`): time, averaged residual, accepted
+
+summary() condenses them into FitQualityStats (rates, acceptance ratio,
+percentiles) and arrays() returns copies for histograms, to tune
+residuals_threshold and avg_spectra for throughput vs. stability.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+DEFAULT_CAPACITY = 2048
+
+# FitQualityLog.arrays() keys
+FIT_FIELDS = ("residual", "nfev", "fit_ms")
+
+
+@dataclass(frozen=True)
+class FitQualityStats:
+    """Summary over the fits / decisions currently held by a FitQualityLog."""
+    fits: int               # total since the last reset
+    failed_fits: int        # over the fits held: lmfit reported no success
+    decisions: int          # total since the last reset
+    accepted: int           # over the decisions held
+    rejected: int           # over the decisions held
+    accept_ratio: float     # over the decisions held
+    fit_rate_hz: float      # over the fits held
+    accept_rate_hz: float   # accepted phase updates per second
+    fit_ms_p50: float
+    fit_ms_p95: float
+    nfev_mean: float
+    residual_p50: float
+    residual_p95: float
+
+
+class _Ring:
+    """Fixed-size columns, overwritten oldest first."""
+
+    def __init__(self, capacity: int, columns: tuple[str, ...]) -> None:
+        self.capacity = capacity
+        self.t_ns = np.zeros(capacity, dtype=np.int64)
+        self.columns = {name: np.full(capacity, np.nan) for name in columns}
+        self.next = 0
+        self.count = 0
+        self.total = 0
+
+    def add(self, t_ns: int, values: dict[str, float]) -> None:
+        i = self.next
+        self.t_ns[i] = t_ns
+        for name, column in self.columns.items():
+            column[i] = values[name]
+        self.next = (i + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        self.total += 1
+
+    def get(self, name: str) -> np.ndarray:
+        return self.columns[name][: self.count].copy()
+
+    def rate(self, mask: Optional[np.ndarray] = None) -> float:
+        """Entries (matching `mask`) per second over the time span held."""
+        if self.count < 2:
+            return 0.0
+        t_ns = self.t_ns[: self.count]
+        span_ns = int(t_ns.max() - t_ns.min())
+        if span_ns <= 0:
+            return 0.0
+        n = self.count if mask is None else int(np.count_nonzero(mask))
+        return n * 1e9 / span_ns
+
+    def clear(self) -> None:
+        for column in self.columns.values():
+            column.fill(np.nan)
+        self.next = 0
+        self.count = 0
+        self.total = 0
+
+
+class FitQualityLog:
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        self._lock = threading.Lock()
+        self._fits = _Ring(capacity, FIT_FIELDS + ("success",))
+        self._decisions = _Ring(capacity, ("residual", "accepted"))
+
+    # ------------------------------------------------------------------ #
+    # Recording (analysis thread)
+    # ------------------------------------------------------------------ #
+
+    def add_fit(self, residual: float, nfev: int, fit_ms: float, success: bool) -> None:
+        with self._lock:
+            self._fits.add(
+                time.perf_counter_ns(),
+                {"residual": residual, "nfev": nfev, "fit_ms": fit_ms, "success": float(success)},
+            )
+
+    def add_decision(self, residual: float, accepted: bool) -> None:
+        with self._lock:
+            self._decisions.add(
+                time.perf_counter_ns(),
+                {"residual": residual, "accepted": float(accepted)},
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._fits.clear()
+            self._decisions.clear()
+
+    # ------------------------------------------------------------------ #
+    # Reading
+    # ------------------------------------------------------------------ #
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        """
+        Copies of the held values: the FIT_FIELDS per fit plus
+        "decision_residual" and "accepted" (bool) per decision.
+        """
+        with self._lock:
+            out = {name: self._fits.get(name) for name in FIT_FIELDS}
+            out["decision_residual"] = self._decisions.get("residual")
+            out["accepted"] = self._decisions.get("accepted") > 0.5
+            return out
+
+    def summary(self) -> FitQualityStats:
+        with self._lock:
+            fits, decisions = self._fits, self._decisions
+            fit_ms = fits.get("fit_ms")
+            nfev = fits.get("nfev")
+            residual = fits.get("residual")
+            success = fits.get("success") > 0.5
+            accepted = decisions.get("accepted") > 0.5
+
+            return FitQualityStats(
+                fits=fits.total,
+                failed_fits=int(np.count_nonzero(~success)),
+                decisions=decisions.total,
+                accepted=int(np.count_nonzero(accepted)),
+                rejected=int(np.count_nonzero(~accepted)),
+                accept_ratio=float(accepted.mean()) if len(accepted) else 0.0,
+                fit_rate_hz=fits.rate(),
+                accept_rate_hz=decisions.rate(accepted),
+                fit_ms_p50=_percentile(fit_ms, 50),
+                fit_ms_p95=_percentile(fit_ms, 95),
+                nfev_mean=float(nfev.mean()) if len(nfev) else 0.0,
+                residual_p50=_percentile(residual, 50),
+                residual_p95=_percentile(residual, 95),
+            )
+
+
+def _percentile(values: np.ndarray, q: float) -> float:
+    values = values[np.isfinite(values)]
+    return float(np.percentile(values, q)) if len(values) else 0.0
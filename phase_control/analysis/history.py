@@ -0,0 +1,189 @@
+# phase_control/analysis/history.py
+"""
+Fixed-size phase history of an AnalysisEngine.
+
+PhaseHistory is a preallocated ring of (time, phase, correction, fit
+residual) samples, so memory stays constant however long a session runs.
+Every sample is written twice, at i and i + capacity, which makes the
+last `count` samples always one contiguous slice of the storage: reading
+a time window needs no wrap-around handling and no concatenation.
+
+At tens to hundreds of steps per second the sample ring covers minutes.
+For longer windows a second ring of the same layout keeps the min and
+max of every field per `bin_s` interval (DEFAULT_BINS x DEFAULT_BIN_S =
+4 h by default); window() reads from it whenever the samples do not
+reach back far enough, so a strip chart of hours keeps its envelope.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+
+DEFAULT_CAPACITY = 16384
+
+# min/max bins for windows longer than the sample ring holds
+DEFAULT_BIN_S = 1.0
+DEFAULT_BINS = 4 * 3600
+
+# value rows of PhaseHistory.window()
+HISTORY_FIELDS = ("phase_rad", "correction_deg", "residual")
+
+
+class PhaseHistory:
+
+    def __init__(
+        self,
+        capacity: int = DEFAULT_CAPACITY,
+        bins: int = DEFAULT_BINS,
+        bin_s: float = DEFAULT_BIN_S,
+    ) -> None:
+        if capacity < 1 or bins < 1:
+            raise ValueError("capacity and bins must be >= 1")
+        if bin_s <= 0:
+            raise ValueError("bin_s must be > 0")
+        self.capacity = capacity
+        self.bins = bins
+        self.bin_s = bin_s
+
+        self._lock = threading.Lock()
+        self._t_ns = np.zeros(2 * capacity, dtype=np.int64)
+        self._values = np.full((len(HISTORY_FIELDS), 2 * capacity), np.nan)
+        self._next = 0
+        self._count = 0
+
+        # closed bins: centre time, min and max per field (doubled ring)
+        self._bin_ns = int(bin_s * 1e9)
+        self._bin_t_ns = np.zeros(2 * bins, dtype=np.int64)
+        self._bin_min = np.full((len(HISTORY_FIELDS), 2 * bins), np.nan)
+        self._bin_max = np.full((len(HISTORY_FIELDS), 2 * bins), np.nan)
+        self._bin_next = 0
+        self._bin_count = 0
+
+        # bin being filled: index (t_ns // bin_ns), min, max, newest time
+        self._open_bin: Optional[int] = None
+        self._open_min = np.full(len(HISTORY_FIELDS), np.nan)
+        self._open_max = np.full(len(HISTORY_FIELDS), np.nan)
+        self._open_t_ns = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(
+        self,
+        t_ns: int,
+        phase_rad: Optional[float],
+        correction_deg: Optional[float],
+        residual: Optional[float],
+    ) -> None:
+        """Add one sample; None is stored as NaN (gap in the plot)."""
+        row = (
+            np.nan if phase_rad is None else phase_rad,
+            np.nan if correction_deg is None else correction_deg,
+            np.nan if residual is None else residual,
+        )
+        with self._lock:
+            i = self._next
+            j = i + self.capacity
+            self._t_ns[i] = self._t_ns[j] = t_ns
+            self._values[:, i] = self._values[:, j] = row
+            self._next = (i + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+            self._add_to_bin(t_ns, row)
+
+    def _add_to_bin(self, t_ns: int, row: tuple[float, ...]) -> None:
+        b = t_ns // self._bin_ns
+        if b != self._open_bin:
+            if self._open_bin is not None:
+                i = self._bin_next
+                j = i + self.bins
+                self._bin_t_ns[i] = self._bin_t_ns[j] = self._open_bin * self._bin_ns + self._bin_ns // 2
+                self._bin_min[:, i] = self._bin_min[:, j] = self._open_min
+                self._bin_max[:, i] = self._bin_max[:, j] = self._open_max
+                self._bin_next = (i + 1) % self.bins
+                self._bin_count = min(self._bin_count + 1, self.bins)
+            self._open_bin = b
+            self._open_min[:] = row
+            self._open_max[:] = row
+        else:
+            np.fmin(self._open_min, row, out=self._open_min)
+            np.fmax(self._open_max, row, out=self._open_max)
+        self._open_t_ns = t_ns
+
+    def window(self, span_s: Optional[float] = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Copy of the samples of the last `span_s` seconds (all stored ones
+        if None), oldest first: (t_ns, values[len(HISTORY_FIELDS), n]).
+
+        If the sample ring has dropped samples of that span, the span is
+        read from the bins instead: two points per bin, (centre, min) and
+        (centre, max), the newest bin ending at the newest sample.
+        """
+        with self._lock:
+            stop = self._next + self.capacity
+            start = stop - self._count
+            t_ns = self._t_ns[start:stop]
+            if span_s is not None and self._count:
+                t_min = t_ns[-1] - int(span_s * 1e9)
+                if self._count == self.capacity and t_ns[0] > t_min:
+                    return self._binned_window(t_min)
+                start += int(np.searchsorted(t_ns, t_min, side="left"))
+            return self._t_ns[start:stop].copy(), self._values[:, start:stop].copy()
+
+    def _binned_window(self, t_min: int) -> tuple[np.ndarray, np.ndarray]:
+        stop = self._bin_next + self.bins
+        start = stop - self._bin_count
+        start += int(np.searchsorted(self._bin_t_ns[start:stop], t_min, side="left"))
+        n = stop - start + 1  # + the open bin
+
+        t_ns = np.empty(n, dtype=np.int64)
+        t_ns[:-1] = self._bin_t_ns[start:stop]
+        t_ns[-1] = self._open_t_ns
+        lows = np.concatenate((self._bin_min[:, start:stop], self._open_min[:, None]), axis=1)
+        highs = np.concatenate((self._bin_max[:, start:stop], self._open_max[:, None]), axis=1)
+
+        values = np.empty((len(HISTORY_FIELDS), 2 * n))
+        values[:, 0::2] = lows
+        values[:, 1::2] = highs
+        return np.repeat(t_ns, 2), values
+
+    def latest(self) -> Optional[tuple[int, np.ndarray]]:
+        """(t_ns, values[len(HISTORY_FIELDS)]) of the newest sample, or None."""
+        with self._lock:
+            if not self._count:
+                return None
+            i = self._next + self.capacity - 1
+            return int(self._t_ns[i]), self._values[:, i].copy()
+
+    def rate(self, span_s: float, now_ns: Optional[int] = None) -> float:
+        """
+        Samples per second over the last `span_s` seconds before `now_ns`
+        (default: now, perf_counter_ns), so a stalled loop reads 0.
+        """
+        if now_ns is None:
+            now_ns = time.perf_counter_ns()
+        span_ns = int(span_s * 1e9)
+        with self._lock:
+            stop = self._next + self.capacity
+            t_ns = self._t_ns[stop - self._count:stop]
+            if len(t_ns) == 0:
+                return 0.0
+            first = int(np.searchsorted(t_ns, now_ns - span_ns, side="left"))
+            window_ns = min(span_ns, now_ns - int(t_ns[0]))
+            if window_ns <= 0:
+                return 0.0
+            return (len(t_ns) - first) * 1e9 / window_ns
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.fill(np.nan)
+            self._next = 0
+            self._count = 0
+            self._bin_min.fill(np.nan)
+            self._bin_max.fill(np.nan)
+            self._bin_next = 0
+            self._bin_count = 0
+            self._open_bin = None
@@ -16,6 +16,7 @@ from dataclasses import dataclass
 @dataclass
 class PhaseCorrector:
     _correction_angle: Angle = Angle(0, AngleUnit.DEG)
+    tolerance: Angle = PHASE_TOLERANCE
 
     def update(self, phase: Angle) -> Angle:
         
@@ -23,7 +24,7 @@ class PhaseCorrector:
 
         phase_error = Angle(phase_wrapped - STARTING_PHASE)
 
-        if np.abs(phase_error) > PHASE_TOLERANCE:
+        if np.abs(phase_error) > self.tolerance:
             correction_phase = phase_error
         else:
             correction_phase = Angle(0)
@@ -1,23 +1,41 @@
 from collections import deque
 import inspect
-from typing import Any, cast
-import lmfit
-from base_lib.models import Angle
+import time
+from typing import TYPE_CHECKING, Any, Optional, cast
+import numpy as np
+from base_lib.models import Angle, Prefix
 from phase_control.analysis.config import AnalysisConfig, FitParameter
+from phase_control.analysis.fit_quality import FitQualityLog
 from phase_control.domain.models import Spectrum
 from base_lib.functions import usCFG_projection
 
+if TYPE_CHECKING:
+    import lmfit
+
 RESIDUAL_THRESHOLD = 5
 MAX_LEN = int(10)
 
+# pixels of the synthetic spectrum fitted by warm_up()
+WARM_UP_POINTS = 256
+
 class PhaseTracker():
     current_phase: Angle | None = None
+    # residual of the last averaged fit (also when above the threshold)
+    residual: float | None = None
     
-    def __init__(self, start_config: AnalysisConfig) -> None:
+    def __init__(self, start_config: AnalysisConfig, fit_log: Optional[FitQualityLog] = None) -> None:
         self._config: AnalysisConfig = start_config
+        # per-fit residual / nfev / duration and accept/reject decisions
+        self._fit_log = fit_log
         self._fits: deque[FitParameter] = deque(maxlen=self._config.avg_spectra)
+        self._avg_version = self._config.field_version("avg_spectra")
 
     def update(self, spectrum: Spectrum) -> None:
+        if self._config.field_version("avg_spectra") != self._avg_version:
+            # avg_spectra changed in the UI: resize, keeping the newest fits
+            self._avg_version = self._config.field_version("avg_spectra")
+            self._fits = deque(self._fits, maxlen=self._config.avg_spectra)
+
         if len(self._fits) < self._config.avg_spectra and self.current_phase is None:
             self._fits.append(self._initialize_fit_parameters(spectrum))
             print("gathering configs")
@@ -25,6 +43,7 @@ class PhaseTracker():
         else:
             if self.current_phase is None:
                 self._config.copy_from(FitParameter.mean(self._fits))
+                self.residual = self._config.residual
                 
             if len(self._fits) < self._config.avg_spectra:
                 self._fits.append(self._fit_phase(spectrum))
@@ -32,26 +51,36 @@ class PhaseTracker():
             else:
                 new_config = FitParameter.mean(self._fits)
                 self._fits.clear()
+                self.residual = new_config.residual
+
+                accepted = new_config.residual < self._config.residuals_threshold
+                if self._fit_log is not None:
+                    self._fit_log.add_decision(new_config.residual, accepted)
                 
-                if new_config.residual < self._config.residuals_threshold:
+                if accepted:
                     print("Residuals: ", new_config.residual)
                     self.current_phase = new_config.phase
                     self._config.phase = new_config.phase
     
     def _initialize_fit_parameters(self, spectrum: Spectrum) -> FitParameter:
-        
+        # imported on first use: lmfit pulls in scipy (~1.5 s), which app.py
+        # preloads in the background while the acquisition starts
+        import lmfit
+
         first_arg_name = self._get_first_arg_name()
         model = lmfit.Model(usCFG_projection, independent_vars=[first_arg_name])
         
         fit_kwargs: dict[str, Any] = self._config.to_fit_kwargs(usCFG_projection)
         fit_kwargs[first_arg_name] = spectrum.wavelengths_nm
         
+        t0 = time.perf_counter_ns()
         result = model.fit(spectrum.intensity, **fit_kwargs, max_nfev=int(1000000))
-        return FitParameter.from_fit_result(self._config, result)
+        return self._log_fit(result, t0)
     
     
     def _fit_phase(self, spectrum: Spectrum) -> FitParameter:
-        
+        import lmfit
+
         first_arg_name = self._get_first_arg_name()
         model = lmfit.Model(usCFG_projection, independent_vars=[first_arg_name])
 
@@ -65,15 +94,48 @@ class PhaseTracker():
 
         x_kwargs: dict[str, Any] = {first_arg_name: spectrum.wavelengths_nm}
 
+        t0 = time.perf_counter_ns()
         result = model.fit(
             spectrum.intensity,
             params=params,
             **x_kwargs,
         )
         
-        return FitParameter.from_fit_result(self._config, result)
+        return self._log_fit(result, t0)
+
+    def _log_fit(self, result: "lmfit.model.ModelResult", t0_ns: int) -> FitParameter:
+        fit_ms = (time.perf_counter_ns() - t0_ns) * 1e-6
+        fit = FitParameter.from_fit_result(self._config, result)
+        if self._fit_log is not None:
+            self._fit_log.add_fit(fit.residual, result.nfev, fit_ms, bool(result.success))
+        return fit
 
     def _get_first_arg_name(self) -> str:
         sig = inspect.signature(usCFG_projection)
         return next(iter(sig.parameters))
-    
\ No newline at end of file
+    
+
+
+def warm_up(config: AnalysisConfig, num_points: int = WARM_UP_POINTS) -> None:
+    """
+    Import lmfit and run one phase-only fit, as in PhaseTracker, on a
+    synthetic spectrum of `config` (the model over its wavelength_range),
+    so the first real fit pays neither the import nor the first-call
+    setup. `config` is only read.
+    """
+    import lmfit
+
+    first_arg_name = next(iter(inspect.signature(usCFG_projection).parameters))
+    x = np.linspace(
+        config.wavelength_range.min.value(Prefix.NANO),
+        config.wavelength_range.max.value(Prefix.NANO),
+        num_points,
+    )
+    fit_kwargs = config.to_fit_kwargs(usCFG_projection)
+    y = usCFG_projection(x, **fit_kwargs)
+
+    model = lmfit.Model(usCFG_projection, independent_vars=[first_arg_name])
+    params = model.make_params(**fit_kwargs)
+    for name, par in params.items():
+        par.vary = (name == "phase")
+    model.fit(y, params=params, **{first_arg_name: x})
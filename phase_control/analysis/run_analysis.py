@@ -1,20 +1,26 @@
 # phase_control/analysis/run_analysis.py
 from __future__ import annotations
 
+import time
 from dataclasses import dataclass
 from typing import Optional, cast
 
 import numpy as np
 
 from base_lib.functions import usCFG_projection
-from base_lib.models import Angle
+from base_lib.models import Angle, Prefix
 from phase_control.analysis.config import AnalysisConfig, FitParameter
+from phase_control.analysis.fit_quality import FitQualityLog
+from phase_control.analysis.history import DEFAULT_CAPACITY, PhaseHistory
 from phase_control.analysis.phase_corrector import PhaseCorrector
 from phase_control.analysis.phase_tracker import PhaseTracker
-from phase_control.correction_io.elliptec_ell14 import ElliptecRotator
+from phase_control.analysis.timing import StageStats, StageTimer
+from phase_control.correction_io.rotator import Rotator
 from phase_control.domain.models import Spectrum
 from phase_control.stream_io import FrameBuffer, StreamMeta
 
+STEP_STAGES = ("buffer", "cut", "tracker", "model", "correction", "rotate", "total")
+
 
 @dataclass
 class AnalysisPlotResult:
@@ -28,6 +34,9 @@ class AnalysisPlotResult:
     current_phase: Optional[Angle]
     correction_angle: Optional[Angle]
     spectrum: Spectrum
+    timings: Optional[dict[str, StageStats]] = None
+    # sum of squared residuals of the last averaged fit
+    residual: Optional[float] = None
 
 
 class AnalysisEngine:
@@ -35,7 +44,11 @@ class AnalysisEngine:
     def __init__(
         self,
         config: AnalysisConfig,
-        buffer: FrameBuffer
+        buffer: FrameBuffer,
+        rotator: Optional[Rotator] = None,
+        phase_corrector: Optional[PhaseCorrector] = None,
+        timing: bool = True,
+        history_capacity: int = DEFAULT_CAPACITY,
     ) -> None:
         # Shared config instance used by UI and analysis
         self.config = config
@@ -43,32 +56,69 @@ class AnalysisEngine:
         # Data source
         self._buffer = buffer
 
+        # Per-fit residual / nfev / duration and accept/reject decisions
+        # (fit_quality.summary(), fit_quality.arrays())
+        self.fit_quality = FitQualityLog()
+
         # Helpers – they keep a reference to the same config instance
-        self._phase_tracker = PhaseTracker(cast(FitParameter, self.config))
-        self._phase_corrector = PhaseCorrector()
-        self._rotator = ElliptecRotator(max_address="0")
+        self._phase_tracker = PhaseTracker(cast(FitParameter, self.config), self.fit_quality)
+        self._phase_corrector = phase_corrector or PhaseCorrector()
+
+        if rotator is None:
+            # imported here: the Elliptec driver needs the .NET runtime (clr)
+            from phase_control.correction_io.elliptec_ell14 import ElliptecRotator
+            rotator = ElliptecRotator(max_address="0")
+        self._rotator = rotator
+
+        # Per-stage timing of step()
+        self.timer = StageTimer(enabled=timing, stages=STEP_STAGES)
+
+        # Phase / correction / residual over time (fixed-size ring)
+        self.history = PhaseHistory(history_capacity)
+
+        # Cut indices, recomputed only when wavelength_range or the pixel
+        # axis changes
+        self._cut_key: Optional[tuple[int, int, float, float]] = None
+        self._cut_index: Optional[np.ndarray] = None
+
+    @property
+    def buffer(self) -> FrameBuffer:
+        """Data source (read-only, e.g. for its drop counters)."""
+        return self._buffer
 
     def reset(self) -> None:
             """
             Optional reset for a fresh run (e.g. after big config changes).
-            Recreates the PhaseTracker with the current shared config.
+            Recreates the PhaseTracker with the current shared config
+            and clears the stage timings, the phase history and the
+            fit-quality log.
             """
-            self._phase_tracker = PhaseTracker(self.config)
+            self.fit_quality.clear()
+            self._phase_tracker = PhaseTracker(self.config, self.fit_quality)
+            self.timer.reset()
+            self.history.clear()
         # ------------------------------------------------------------------ #
         # Public API
         # ------------------------------------------------------------------ #
 
     def step(self) -> Optional[AnalysisPlotResult]:
+        timer = self.timer
+        t_start = t = timer.start()
+
         spectrum = self._buffer.get_latest()
         
         if spectrum is None:
             return None
+        t = timer.lap("buffer", t)
 
-        spectrum = spectrum.cut(self.config.wavelength_range)
+        spectrum = self._cut(spectrum)
+        t = timer.lap("cut", t)
 
         # Phase tracking
         self._phase_tracker.update(spectrum)
         current_phase: Optional[Angle] = self._phase_tracker.current_phase
+        residual: Optional[float] = self._phase_tracker.residual
+        t = timer.lap("tracker", t)
 
         # Fit and zero-phase fit
         try:
@@ -83,12 +133,23 @@ class AnalysisEngine:
         except Exception:
             y_fit = None
             y_zero = None
+        t = timer.lap("model", t)
 
         # Correction angle
         correction_angle: Optional[Angle] = None
         if current_phase is not None:
             correction_angle = self._phase_corrector.update(current_phase)
+            t = timer.lap("correction", t)
             self._rotator.rotate(correction_angle)
+            t = timer.lap("rotate", t)
+        timer.lap("total", t_start)
+
+        self.history.append(
+            time.perf_counter_ns(),
+            None if current_phase is None else current_phase.Rad,
+            None if correction_angle is None else correction_angle.Deg,
+            residual,
+        )
 
         return AnalysisPlotResult(
             x=spectrum.wavelengths_nm,
@@ -98,4 +159,21 @@ class AnalysisEngine:
             current_phase=current_phase,
             correction_angle=correction_angle,
             spectrum=spectrum,
+            timings=timer.snapshot(),
+            residual=residual,
+        )
+
+    def _cut(self, spectrum: Spectrum) -> Spectrum:
+        wavelengths = spectrum.wavelengths
+        if not wavelengths:
+            return spectrum
+        key = (
+            self.config.field_version("wavelength_range"),
+            len(wavelengths),
+            wavelengths[0].value(Prefix.NANO),
+            wavelengths[-1].value(Prefix.NANO),
         )
+        if key != self._cut_key or self._cut_index is None:
+            self._cut_index = spectrum.cut_indices(self.config.wavelength_range)
+            self._cut_key = key
+        return spectrum.take(self._cut_index)
@@ -0,0 +1,234 @@
+# phase_control/analysis/status_server.py
+"""
+Optional embedded HTTP endpoint to observe a running lock from outside
+the process (stdlib only).
+
+    GET /status    JSON
+    GET /metrics   Prometheus text format (version 0.0.4)
+
+Per device: current phase, correction and fit residual (newest sample
+of the engine's PhaseHistory), analysis rate, frame counters of the
+FrameBuffer (received, dropped before analysis, acquisition overruns),
+fit rate and acceptance (FitQualityLog) and the stage latencies of the
+engine's StageTimer.
+
+The server runs in its own threads (ThreadingHTTPServer) and only reads:
+a request holds the history and fit-log locks only for O(capacity)
+copies and never waits for an analysis step. Bind to localhost
+(default) and put a reverse proxy or SSH tunnel in front to reach it
+from a dashboard.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Mapping, Optional
+
+from phase_control.analysis.history import HISTORY_FIELDS
+from phase_control.analysis.run_analysis import AnalysisEngine
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# analysis rate is averaged over this many seconds
+RATE_WINDOW_S = 10.0
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class StatusServer:
+
+    def __init__(
+        self,
+        engines: Mapping[int, AnalysisEngine],
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+    ) -> None:
+        self._engines = dict(engines)
+        self._started = time.time()
+
+        self._httpd = ThreadingHTTPServer((host, port), _StatusHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.status_server = self  # type: ignore[attr-defined]
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    # ------------------------------------------------------------------ #
+    # Lifecycle
+    # ------------------------------------------------------------------ #
+
+    def start(self) -> None:
+        if self._thread is not None:
+            raise RuntimeError("Status server is already running.")
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever,
+            name="StatusServerThread",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._thread.join(timeout=2.0)
+        self._thread = None
+
+    # ------------------------------------------------------------------ #
+    # Content
+    # ------------------------------------------------------------------ #
+
+    def status(self) -> dict[str, Any]:
+        """Current state of all engines as plain JSON types."""
+        now_ns = time.perf_counter_ns()
+        devices: dict[str, Any] = {}
+
+        for device, engine in self._engines.items():
+            history = engine.history
+            latest = history.latest()
+            values: dict[str, Optional[float]] = dict.fromkeys(HISTORY_FIELDS)
+            age_s = None
+            if latest is not None:
+                t_ns, row = latest
+                values = {name: _finite(v) for name, v in zip(HISTORY_FIELDS, row)}
+                age_s = (now_ns - t_ns) * 1e-9
+
+            buffer = engine.buffer
+            fits = engine.fit_quality.summary()
+            timings = engine.timer.snapshot() or {}
+            devices[str(device)] = {
+                **values,
+                "sample_age_s": age_s,
+                "rate_hz": history.rate(RATE_WINDOW_S, now_ns),
+                "frames_received": buffer.received,
+                "frames_dropped": buffer.dropped,
+                "acquisition_overruns": buffer.overruns,
+                "fit_rate_hz": fits.fit_rate_hz,
+                "fit_accept_ratio": fits.accept_ratio,
+                "fits": fits.fits,
+                "fit_decisions": fits.decisions,
+                "stages": {
+                    stage: {
+                        "count": stats.count,
+                        "last_ms": stats.last_ms,
+                        "mean_ms": stats.mean_ms,
+                        "p50_ms": stats.p50_ms,
+                        "p95_ms": stats.p95_ms,
+                        "max_ms": stats.max_ms,
+                    }
+                    for stage, stats in timings.items()
+                },
+            }
+
+        return {
+            "time": time.time(),
+            "uptime_s": time.time() - self._started,
+            "devices": devices,
+        }
+
+    def metrics(self) -> str:
+        """status() in the Prometheus text exposition format."""
+        return render_prometheus(self.status())
+
+
+# ---------------------------------------------------------------------- #
+# Prometheus text format
+# ---------------------------------------------------------------------- #
+
+# JSON key -> (metric name, type, help)
+_DEVICE_METRICS = (
+    ("phase_rad", "phase_lock_phase_radians", "gauge", "Measured phase of the newest fit."),
+    ("correction_deg", "phase_lock_correction_degrees", "gauge", "Last waveplate correction."),
+    ("residual", "phase_lock_fit_residual", "gauge", "Sum of squared residuals of the last averaged fit."),
+    ("sample_age_s", "phase_lock_sample_age_seconds", "gauge", "Age of the newest analysis result."),
+    ("rate_hz", "phase_lock_analysis_rate_hertz", "gauge", f"Analysis steps per second over {RATE_WINDOW_S:g} s."),
+    ("frames_received", "phase_lock_frames_received_total", "counter", "Frames received from the acquisition."),
+    ("frames_dropped", "phase_lock_frames_dropped_total", "counter", "Frames overwritten before they were analysed."),
+    ("acquisition_overruns", "phase_lock_acquisition_overruns_total", "counter", "Frames dropped by the acquisition pipeline."),
+    ("fit_rate_hz", "phase_lock_fit_rate_hertz", "gauge", "Phase fits per second (recent fits)."),
+    ("fit_accept_ratio", "phase_lock_fit_accept_ratio", "gauge", "Accepted share of the recent averaged fits."),
+    ("fits", "phase_lock_fits_total", "counter", "Phase fits since the last reset."),
+    ("fit_decisions", "phase_lock_fit_decisions_total", "counter", "Averaged fits checked against the threshold."),
+)
+
+_STAGE_QUANTILES = (("p50_ms", "0.5"), ("p95_ms", "0.95"), ("max_ms", "1"))
+
+
+def render_prometheus(status: dict[str, Any]) -> str:
+    devices: dict[str, Any] = status["devices"]
+    lines = [
+        "# HELP phase_lock_uptime_seconds Seconds since the status server started.",
+        "# TYPE phase_lock_uptime_seconds gauge",
+        f"phase_lock_uptime_seconds {_number(status['uptime_s'])}",
+    ]
+
+    for key, name, kind, text in _DEVICE_METRICS:
+        lines.append(f"# HELP {name} {text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for device, values in devices.items():
+            lines.append(f'{name}{{device="{device}"}} {_number(values[key])}')
+
+    name = "phase_lock_stage_latency_seconds"
+    lines.append(f"# HELP {name} Analysis stage latency (histogram bucket upper edges).")
+    lines.append(f"# TYPE {name} summary")
+    for device, values in devices.items():
+        for stage, stats in values["stages"].items():
+            labels = f'device="{device}",stage="{stage}"'
+            for key, quantile in _STAGE_QUANTILES:
+                lines.append(
+                    f'{name}{{{labels},quantile="{quantile}"}} {_number(stats[key] * 1e-3)}'
+                )
+            lines.append(f"{name}_sum{{{labels}}} {_number(stats['mean_ms'] * stats['count'] * 1e-3)}")
+            lines.append(f"{name}_count{{{labels}}} {stats['count']}")
+
+    return "\n".join(lines) + "\n"
+
+
+def _finite(value: float) -> Optional[float]:
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+
+def _number(value: Optional[float]) -> str:
+    return "NaN" if value is None else repr(float(value))
+
+
+# ---------------------------------------------------------------------- #
+# HTTP
+# ---------------------------------------------------------------------- #
+
+class _StatusHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self) -> None:  # noqa: N802 (http.server naming)
+        server: StatusServer = self.server.status_server  # type: ignore[attr-defined]
+        path = self.path.split("?", 1)[0].rstrip("/")
+
+        if path in ("/status", ""):
+            body = json.dumps(server.status()).encode("utf-8")
+            content_type = "application/json"
+        elif path == "/metrics":
+            body = server.metrics().encode("utf-8")
+            content_type = PROMETHEUS_CONTENT_TYPE
+        else:
+            self.send_error(404, "Use /status or /metrics")
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # no line on stdout per scrape
+        pass
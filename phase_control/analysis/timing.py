@@ -0,0 +1,132 @@
+# phase_control/analysis/timing.py
+"""
+Lightweight per-stage timing for the analysis hot path.
+
+Usage inside a loop:
+
+    t = timer.start()
+    ...                      # stage 1
+    t = timer.lap("cut", t)
+    ...                      # stage 2
+    t = timer.lap("tracker", t)
+
+Each lap adds the elapsed perf_counter_ns() span to a fixed-size
+log2 histogram of its stage. When the timer is disabled, start() and
+lap() return immediately without reading the clock.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+# Bucket i holds spans in [2**(i + MIN_EXP), 2**(i + MIN_EXP + 1)) ns;
+# the first bucket also collects everything shorter (< ~1 µs), the last
+# one everything longer (> ~17 s).
+MIN_EXP = 10
+NUM_BUCKETS = 25
+
+
+@dataclass(frozen=True)
+class StageStats:
+    """Summary of one stage; percentiles are histogram bucket upper edges."""
+    count: int
+    last_ms: float
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    max_ms: float
+
+
+class StageHistogram:
+    __slots__ = ("buckets", "count", "total_ns", "max_ns", "last_ns")
+
+    def __init__(self) -> None:
+        self.buckets: list[int] = [0] * NUM_BUCKETS
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.last_ns = 0
+
+    def add(self, span_ns: int) -> None:
+        index = span_ns.bit_length() - MIN_EXP - 1
+        if index < 0:
+            index = 0
+        elif index >= NUM_BUCKETS:
+            index = NUM_BUCKETS - 1
+
+        self.buckets[index] += 1
+        self.count += 1
+        self.total_ns += span_ns
+        self.last_ns = span_ns
+        if span_ns > self.max_ns:
+            self.max_ns = span_ns
+
+    def percentile_ns(self, q: float) -> int:
+        """Upper bucket edge below which a fraction `q` of the spans lie."""
+        if self.count == 0:
+            return 0
+
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                return min(1 << (i + MIN_EXP + 1), self.max_ns)
+        return self.max_ns
+
+    def stats(self) -> StageStats:
+        mean_ns = self.total_ns / self.count if self.count else 0.0
+        return StageStats(
+            count=self.count,
+            last_ms=self.last_ns / 1e6,
+            mean_ms=mean_ns / 1e6,
+            p50_ms=self.percentile_ns(0.50) / 1e6,
+            p95_ms=self.percentile_ns(0.95) / 1e6,
+            max_ms=self.max_ns / 1e6,
+        )
+
+
+class StageTimer:
+    """
+    Collects per-stage histograms. `stages` fixes the reporting order;
+    unknown stages are added on first use.
+    """
+
+    def __init__(self, enabled: bool = True, stages: Sequence[str] = ()) -> None:
+        self.enabled = enabled
+        self._order = tuple(stages)
+        self._stages: dict[str, StageHistogram] = {}
+        self.reset()
+
+    def start(self) -> int:
+        if not self.enabled:
+            return 0
+        return time.perf_counter_ns()
+
+    def lap(self, stage: str, since_ns: int) -> int:
+        """
+        Record the span since `since_ns` for `stage` and return the current
+        time, so consecutive stages can be chained.
+        """
+        if not self.enabled:
+            return 0
+
+        now = time.perf_counter_ns()
+        hist = self._stages.get(stage)
+        if hist is None:
+            hist = self._stages[stage] = StageHistogram()
+        hist.add(now - since_ns)
+        return now
+
+    def snapshot(self) -> Optional[dict[str, StageStats]]:
+        """Stats for all stages, or None if the timer is disabled."""
+        if not self.enabled:
+            return None
+        return {
+            name: hist.stats() for name, hist in self._stages.items() if hist.count
+        }
+
+    def reset(self) -> None:
+        self._stages = {name: StageHistogram() for name in self._order}
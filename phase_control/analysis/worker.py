@@ -0,0 +1,138 @@
+# phase_control/analysis/worker.py
+"""
+Background threads running the AnalysisEngines, independent of the UI.
+
+Every engine (one per spectrometer) is stepped by its own thread, so a
+step that blocks in rotate() for a move and its settle time does not
+hold up the other arms: corrections of several arms overlap and their
+latency is that of the slowest move, not the sum.
+
+Every step that produced a result is handed to
+`on_result(device_index, result)` (from the engine's thread); the UI
+picks up the newest result at its own frame rate (see
+phase_control.ui.display.LatestResult). When an engine's buffer held no
+new frame, its thread waits `idle_s` before polling again; with
+`min_interval_s` > 0 each engine is paced to at most one step per
+interval. An exception in one engine stops all of them.
+
+A step cannot be interrupted, so stop() may return while threads still
+finish their step. The worker keeps them until they have exited:
+start() waits for them (or raises), and every run has its own stop
+event, so an old thread never resumes stepping the engines.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import traceback
+from typing import Callable, Mapping, Optional
+
+from phase_control.analysis.run_analysis import AnalysisEngine, AnalysisPlotResult
+
+IDLE_WAIT_S = 0.002
+
+# default wait for the steps in progress in stop()
+STOP_TIMEOUT_S = 2.0
+
+
+class AnalysisWorker:
+
+    def __init__(
+        self,
+        engines: Mapping[int, AnalysisEngine],
+        on_result: Callable[[int, AnalysisPlotResult], None],
+        idle_s: float = IDLE_WAIT_S,
+        min_interval_s: float = 0.0,
+    ) -> None:
+        self._engines = dict(engines)
+        self._on_result = on_result
+        self._idle_s = idle_s
+        self.min_interval_s = min_interval_s
+
+        # stop event of the current run (a new one per start())
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+        # exception that ended the run, if any
+        self.error: Optional[BaseException] = None
+        self._steps_lock = threading.Lock()
+        self.steps: int = 0
+
+    @property
+    def is_running(self) -> bool:
+        """The loop runs and has not been asked to stop."""
+        return self.is_alive and not self._stop.is_set()
+
+    @property
+    def is_alive(self) -> bool:
+        """Threads exist, possibly still finishing a step after stop()."""
+        return any(thread.is_alive() for thread in self._threads)
+
+    def start(self, timeout: Optional[float] = STOP_TIMEOUT_S) -> None:
+        """
+        Start a new run. Threads that are still finishing their last step
+        are waited for up to `timeout` seconds; RuntimeError if the worker
+        is running or they do not exit in time.
+        """
+        if self.is_running:
+            raise RuntimeError("Analysis worker is already running.")
+        if not self.stop(timeout):
+            raise RuntimeError("Analysis worker is still finishing its last step.")
+
+        self._stop = stop = threading.Event()
+        self.error = None
+        self._threads = [
+            threading.Thread(
+                target=self._run,
+                args=(stop, device, engine),
+                name=f"AnalysisWorkerThread-{device}",
+                daemon=True,
+            )
+            for device, engine in self._engines.items()
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: Optional[float] = STOP_TIMEOUT_S) -> bool:
+        """
+        Stop the run and wait up to `timeout` seconds (None = no limit)
+        for the steps in progress. True once all threads have exited; if
+        not, they are kept (is_alive) and stop() or start() wait again.
+        """
+        self._stop.set()
+        if threading.current_thread() in self._threads:
+            # called from on_result: the threads end after their step
+            return False
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self._threads:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            thread.join(timeout=remaining)
+        if self.is_alive:
+            return False
+        self._threads = []
+        return True
+
+    def _run(self, stop: threading.Event, device: int, engine: AnalysisEngine) -> None:
+        try:
+            while not stop.is_set():
+                t_step = time.perf_counter()
+                result = engine.step()
+                if result is None:
+                    stop.wait(self._idle_s)
+                    continue
+
+                with self._steps_lock:
+                    self.steps += 1
+                self._on_result(device, result)
+
+                if self.min_interval_s > 0:
+                    remaining = self.min_interval_s - (time.perf_counter() - t_step)
+                    if remaining > 0:
+                        stop.wait(remaining)
+        except Exception as exc:
+            self.error = exc
+            stop.set()
+            print(f"Analysis step of device {device} failed:")
+            traceback.print_exc()
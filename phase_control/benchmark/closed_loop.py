@@ -0,0 +1,224 @@
+# phase_control/benchmark/closed_loop.py
+"""
+Closed-loop lock benchmark.
+
+Wires a synthetic drifting spectrum source, the real FrameBuffer /
+AnalysisEngine (PhaseTracker + PhaseCorrector) and a simulated waveplate
+into one loop on a simulated clock, and reports per configuration:
+
+- time_to_lock_s:      simulated time until the phase error stays within
+                       the tolerance for `lock_hold` consecutive frames
+- residual_rms_rad:    RMS of the wrapped phase error after lock
+- moves_per_minute:    actuator moves per simulated minute
+- cpu_ms_per_frame:    mean / p95 process CPU time of AnalysisEngine.step
+
+Results are written as JSON so runs can be diffed against each other.
+
+Usage (from the repository root):
+
+    python -m phase_control.benchmark.closed_loop --out bench.json
+    python -m phase_control.benchmark.closed_loop --avg-spectra 5 10 --frame-rate 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import itertools
+import json
+import math
+import os
+import platform
+import sys
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Iterable, Optional
+
+import numpy as np
+
+from base_lib.models import Angle, AngleUnit
+from phase_control.analysis.config import AnalysisConfig
+from phase_control.analysis.phase_corrector import STARTING_PHASE, PhaseCorrector
+from phase_control.analysis.run_analysis import AnalysisEngine
+from phase_control.stream_io import FrameBuffer
+
+from .simulation import (
+    DriftingPhase,
+    SimulatedRotator,
+    SimulationClock,
+    SyntheticSpectrumSource,
+)
+
+
+@dataclass(frozen=True)
+class LoopConfig:
+    avg_spectra: int
+    tolerance_deg: float
+    num_pixels: int
+    frame_rate_hz: float
+
+
+@dataclass
+class LoopResult:
+    config: LoopConfig
+    duration_s: float
+    frames: int
+    locked: bool
+    time_to_lock_s: Optional[float]
+    residual_rms_rad: Optional[float]
+    moves: int
+    moves_per_minute: float
+    cpu_ms_per_frame: float
+    cpu_ms_per_frame_p95: float
+
+
+def _wrap_pi(phase_rad: float) -> float:
+    """Wrap into [-pi/2, pi/2), matching the pi-periodic fit model."""
+    return (phase_rad + math.pi / 2) % math.pi - math.pi / 2
+
+
+def run_loop(
+    config: LoopConfig,
+    duration_s: float = 60.0,
+    lock_hold: int = 10,
+    seed: int = 0,
+) -> LoopResult:
+    """
+    Run one closed-loop simulation for `duration_s` of simulated time.
+    """
+    clock = SimulationClock()
+    drift = DriftingPhase(seed=seed)
+    source = SyntheticSpectrumSource(config.num_pixels, seed=seed)
+    rotator = SimulatedRotator(clock)
+    tolerance = Angle(config.tolerance_deg, AngleUnit.DEG)
+
+    buffer = FrameBuffer(source.meta)
+    engine = AnalysisEngine(
+        config=AnalysisConfig(avg_spectra=config.avg_spectra),
+        buffer=buffer,
+        rotator=rotator,
+        phase_corrector=PhaseCorrector(tolerance=tolerance),
+    )
+
+    period = 1.0 / config.frame_rate_hz
+    errors: list[float] = []
+    cpu_ms: list[float] = []
+    lock_index: Optional[int] = None
+    lock_time: Optional[float] = None
+    in_band = 0
+
+    # PhaseTracker / ElliptecRotator report via print()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        while clock.now_s < duration_s:
+            t = clock.now_s
+            phase = drift.at(t) + rotator.phase_offset_rad
+            error = _wrap_pi(phase - float(STARTING_PHASE))
+            errors.append(error)
+
+            if abs(error) <= float(tolerance):
+                in_band += 1
+                if in_band == lock_hold and lock_index is None:
+                    lock_index = len(errors) - lock_hold
+                    lock_time = t - (lock_hold - 1) * period
+            else:
+                in_band = 0
+
+            buffer.update(source.frame(phase, t))
+
+            cpu_start = time.process_time()
+            wall_start = time.perf_counter()
+            engine.step()
+            cpu_ms.append((time.process_time() - cpu_start) * 1e3)
+            wall = time.perf_counter() - wall_start
+
+            # the next frame is the first one completed after the step
+            # (including any move) has finished; older frames are dropped
+            clock.advance(wall)
+            clock.now_s = math.ceil(clock.now_s / period + 1e-9) * period
+
+    residual_rms: Optional[float] = None
+    if lock_index is not None:
+        settled = np.asarray(errors[lock_index:], dtype=float)
+        residual_rms = float(np.sqrt(np.mean(settled**2)))
+
+    return LoopResult(
+        config=config,
+        duration_s=duration_s,
+        frames=len(errors),
+        locked=lock_index is not None,
+        time_to_lock_s=lock_time,
+        residual_rms_rad=residual_rms,
+        moves=rotator.moves,
+        moves_per_minute=rotator.moves / (duration_s / 60.0),
+        cpu_ms_per_frame=float(np.mean(cpu_ms)),
+        cpu_ms_per_frame_p95=float(np.percentile(cpu_ms, 95)),
+    )
+
+
+def config_matrix(
+    avg_spectra: Iterable[int],
+    tolerances_deg: Iterable[float],
+    pixel_counts: Iterable[int],
+    frame_rates_hz: Iterable[float],
+) -> list[LoopConfig]:
+    return [
+        LoopConfig(a, tol, n, rate)
+        for a, tol, n, rate in itertools.product(
+            avg_spectra, tolerances_deg, pixel_counts, frame_rates_hz
+        )
+    ]
+
+
+def _parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--avg-spectra", type=int, nargs="+", default=[1, 5, 10])
+    parser.add_argument("--tolerance-deg", type=float, nargs="+", default=[5.0, 10.0])
+    parser.add_argument("--pixels", type=int, nargs="+", default=[512, 2048])
+    parser.add_argument("--frame-rate", type=float, nargs="+", default=[10.0, 50.0])
+    parser.add_argument("--duration", type=float, default=60.0,
+                        help="simulated seconds per configuration")
+    parser.add_argument("--lock-hold", type=int, default=10,
+                        help="consecutive in-tolerance frames that count as locked")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=str, default=None,
+                        help="JSON output file (default: stdout)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    args = _parse_args(argv)
+
+    configs = config_matrix(
+        args.avg_spectra, args.tolerance_deg, args.pixels, args.frame_rate
+    )
+
+    results = []
+    for i, cfg in enumerate(configs, start=1):
+        print(f"[{i}/{len(configs)}] {cfg}", file=sys.stderr, flush=True)
+        result = run_loop(
+            cfg, duration_s=args.duration, lock_hold=args.lock_hold, seed=args.seed
+        )
+        results.append(asdict(result))
+
+    report = {
+        "benchmark": "closed_loop",
+        "created": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "duration_s": args.duration,
+        "lock_hold": args.lock_hold,
+        "seed": args.seed,
+        "results": results,
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.out is None:
+        print(text)
+    else:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+# phase_control/benchmark/simulation.py
+"""
+Simulated hardware for closed-loop benchmarks.
+
+Everything here runs on a simulated clock, so a benchmark of several
+minutes of lab time finishes as fast as the analysis code allows:
+
+- SimulationClock: shared simulated time in seconds
+- DriftingPhase: slowly drifting optical phase (linear drift + random walk)
+- SyntheticSpectrumSource: usCFG spectra with noise, delivered as StreamFrames
+- SimulatedRotator: waveplate actuator that feeds its position back into
+  the optical phase and charges move time to the clock
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Optional
+
+import numpy as np
+
+from base_lib.functions import usCFG_projection
+from base_lib.models import Angle, AngleUnit
+from phase_control.analysis.config import FitParameter
+from phase_control.analysis.phase_corrector import CONVERSION_CONST, CORRECTION_SIGN
+from phase_control.correction_io.wrap_planner import ANGLE_RANGE, WrapPlanner
+from phase_control.stream_io import StreamFrame, StreamMeta
+
+FULL_SCALE_COUNTS = 50000
+
+
+class SimulationClock:
+    """Simulated time in seconds, advanced explicitly by the simulation."""
+
+    def __init__(self) -> None:
+        self.now_s: float = 0.0
+
+    def advance(self, seconds: float) -> None:
+        self.now_s += max(0.0, seconds)
+
+
+class DriftingPhase:
+    """
+    Optical phase of the interferometer without any correction.
+
+    phase(t) = start + drift_rate * t + random walk with `diffusion`
+    [rad / sqrt(s)]. Calls must use non-decreasing times.
+    """
+
+    def __init__(
+        self,
+        start_rad: float = 0.8,
+        drift_rad_per_s: float = 0.02,
+        diffusion_rad_per_sqrt_s: float = 0.01,
+        seed: Optional[int] = 0,
+    ) -> None:
+        self._start = start_rad
+        self._drift = drift_rad_per_s
+        self._diffusion = diffusion_rad_per_sqrt_s
+        self._rng = np.random.default_rng(seed)
+
+        self._last_t = 0.0
+        self._walk = 0.0
+
+    def at(self, t: float) -> float:
+        dt = t - self._last_t
+        if dt > 0:
+            self._walk += self._diffusion * math.sqrt(dt) * self._rng.standard_normal()
+            self._last_t = t
+        return self._start + self._drift * t + self._walk
+
+
+class SyntheticSpectrumSource:
+    """
+    Produces raw spectrometer frames following the usCFG model.
+
+    The wavelength axis spans `span_nm` with `num_pixels` pixels, so the
+    analysis cut (AnalysisConfig.wavelength_range) keeps only a part of it,
+    as with the real detector.
+    """
+
+    def __init__(
+        self,
+        num_pixels: int,
+        params: Optional[FitParameter] = None,
+        span_nm: tuple[float, float] = (790.0, 815.0),
+        noise: float = 0.02,
+        seed: Optional[int] = 0,
+    ) -> None:
+        self._params = params or FitParameter()
+        self._wavelengths = np.linspace(span_nm[0], span_nm[1], num_pixels)
+        self._noise = noise
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def meta(self) -> StreamMeta:
+        return StreamMeta(
+            device_index=0,
+            num_pixels=int(self._wavelengths.size),
+            wavelengths=self._wavelengths.tolist(),
+        )
+
+    def frame(self, phase_rad: float, t: float) -> StreamFrame:
+        kwargs = self._params.to_fit_kwargs(usCFG_projection)
+        kwargs["phase"] = phase_rad
+
+        y = np.asarray(usCFG_projection(self._wavelengths, **kwargs), dtype=float)
+        y = y + self._noise * self._rng.standard_normal(y.size)
+        counts = np.clip(y * FULL_SCALE_COUNTS, 0, 65535).astype(np.uint16)
+
+        return StreamFrame(
+            t_start_ns=int(t * 1e9),
+            t_end_ns=int(t * 1e9),
+            device_index=0,
+            counts=counts.tolist(),
+        )
+
+
+class SimulatedRotator:
+    """
+    Waveplate actuator on the simulated clock.
+
+    Moves are planned like ElliptecRotator (one absolute move inside
+    ANGLE_RANGE) and cost `settle_s` plus travel at `speed_deg_per_s`.
+    The current position shifts the optical phase by the inverse of the
+    PhaseCorrector conversion.
+    """
+
+    def __init__(
+        self,
+        clock: SimulationClock,
+        settle_s: float = 0.3,
+        speed_deg_per_s: float = 430.0,
+    ) -> None:
+        self._clock = clock
+        self._settle_s = settle_s
+        self._speed = speed_deg_per_s
+        self._planner = WrapPlanner(ANGLE_RANGE)
+
+        self.position: Angle = Angle(0, AngleUnit.DEG)
+        self.moves: int = 0
+        self.busy_s: float = 0.0
+
+    @property
+    def phase_offset_rad(self) -> float:
+        phase_deg = -self.position.Deg / (CORRECTION_SIGN * CONVERSION_CONST)
+        return math.radians(phase_deg)
+
+    def rotate(self, angle: Angle) -> None:
+        if float(angle) == 0.0:
+            return
+
+        move = self._planner.plan(self.position, angle)
+        duration = self._settle_s + abs(move.travel.Deg) / self._speed
+
+        self.position = move.target
+        self.moves += 1
+        self.busy_s += duration
+        self._clock.advance(duration)
@@ -0,0 +1,246 @@
+# phase_control/correction_io/elliptec_bus.py
+"""
+Concurrent control of several Elliptec devices on one serial bus.
+
+ElliptecBus scans the bus once, configures every device it finds and
+caches their description. Each device gets an ElliptecChannel with its
+own move queue and worker thread, so moves for different addresses run
+at the same time and the latency of a multi-device correction is that
+of the slowest move instead of the sum.
+
+DLL calls share the bus and are serialized by a port lock; the settle
+time after a move (the dominant dead time) is spent outside the lock.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Callable, Mapping, Optional
+
+from System import Decimal
+from base_lib.models import Angle
+from phase_control.correction_io.elliptec_ell14 import (
+    HOME_ANGLE,
+    ELLBaseDevice,
+    ELLDevicePort,
+    ELLDevices,
+)
+from phase_control.correction_io.wrap_planner import ANGLE_RANGE, WrapPlanner
+
+SETTLE_TIME_S = 2.0
+HOME_TIME_S = 1.0
+
+
+@dataclass(frozen=True)
+class ElliptecDeviceInfo:
+    address: str
+    description: tuple[str, ...]
+
+
+class ElliptecChannel:
+    """
+    One device on the bus.
+
+    Moves are queued and executed in order by the channel's worker thread.
+    Corrections are planned with WrapPlanner against the tracked absolute
+    position at execution time, so queued moves compose correctly.
+    Implements the Rotator interface via the blocking rotate().
+    """
+
+    def __init__(
+        self,
+        device,
+        info: ElliptecDeviceInfo,
+        port_lock: threading.Lock,
+    ) -> None:
+        self._device = device
+        self._port_lock = port_lock
+        self.info = info
+
+        self._position: Angle = HOME_ANGLE
+        self._planner = WrapPlanner(ANGLE_RANGE)
+
+        self._queue: queue.Queue[Optional[tuple[Callable[[], Angle], Future]]] = queue.Queue()
+        self._worker = threading.Thread(
+            target=self._run,
+            name=f"ElliptecChannel-{info.address}",
+            daemon=True,
+        )
+        self._worker.start()
+
+    @property
+    def address(self) -> str:
+        return self.info.address
+
+    @property
+    def position(self) -> Angle:
+        return self._position
+
+    # ------------------------------------------------------------------ #
+    # Public API
+    # ------------------------------------------------------------------ #
+
+    def submit(self, angle: Angle) -> Future:
+        """
+        Queue a relative correction. The future resolves to the new
+        absolute position once the move has settled.
+        """
+        return self._submit(lambda: self._move(angle))
+
+    def submit_home(self) -> Future:
+        return self._submit(self._home)
+
+    def rotate(self, angle: Angle) -> None:
+        if float(angle) == 0.0:
+            return
+        self.submit(angle).result()
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._worker.join(timeout=SETTLE_TIME_S + 1.0)
+
+    # ------------------------------------------------------------------ #
+    # Worker
+    # ------------------------------------------------------------------ #
+
+    def _submit(self, action: Callable[[], Angle]) -> Future:
+        future: Future = Future()
+        self._queue.put((action, future))
+        return future
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            action, future = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(action())
+            except Exception as exc:
+                future.set_exception(exc)
+
+    def _move(self, angle: Angle) -> Angle:
+        if float(angle) == 0.0:
+            return self._position
+
+        move = self._planner.plan(self._position, angle)
+        with self._port_lock:
+            self._device.MoveAbsolute(Decimal(move.target.Deg))
+        self._position = move.target
+        time.sleep(SETTLE_TIME_S)
+        return self._position
+
+    def _home(self) -> Angle:
+        with self._port_lock:
+            self._device.Home(ELLBaseDevice.DeviceDirection.Linear)
+        self._position = HOME_ANGLE
+        time.sleep(HOME_TIME_S)
+        return self._position
+
+
+class ElliptecBus:
+    """
+    All configurable Elliptec devices on one COM port.
+
+    - devices: cached info of every discovered device, keyed by address
+    - channel(address): per-device handle (Rotator) with its own queue
+    - move_many({address: angle}): concurrent moves, returns when all settled
+    - home_all(): concurrent homing
+    """
+
+    def __init__(
+        self,
+        port: str = "COM6",
+        min_address: str = "0",
+        max_address: str = "F",
+        home: bool = True,
+    ) -> None:
+        self._port_lock = threading.Lock()
+        self._channels: dict[str, ElliptecChannel] = {}
+
+        self._discover(port, min_address, max_address)
+
+        if home:
+            self.home_all()
+
+    @property
+    def devices(self) -> dict[str, ElliptecDeviceInfo]:
+        return {address: ch.info for address, ch in self._channels.items()}
+
+    @property
+    def addresses(self) -> list[str]:
+        return list(self._channels)
+
+    def channel(self, address: str) -> ElliptecChannel:
+        try:
+            return self._channels[address]
+        except KeyError:
+            raise KeyError(
+                f"No Elliptec device at address {address!r}. "
+                f"Found: {', '.join(self._channels) or 'none'}"
+            ) from None
+
+    def move_many(self, moves: Mapping[str, Angle]) -> dict[str, Angle]:
+        """
+        Dispatch relative corrections to several devices at once and wait
+        until all of them have settled. Returns the new absolute positions.
+        """
+        futures = {
+            address: self.channel(address).submit(angle)
+            for address, angle in moves.items()
+        }
+        return {address: f.result() for address, f in futures.items()}
+
+    def home_all(self) -> None:
+        futures = [ch.submit_home() for ch in self._channels.values()]
+        for f in futures:
+            f.result()
+
+    def close(self) -> None:
+        for ch in self._channels.values():
+            ch.close()
+        try:
+            ELLDevicePort.Disconnect()
+        except Exception:
+            pass
+
+    # ------------------------------------------------------------------ #
+    # internal helpers
+    # ------------------------------------------------------------------ #
+
+    def _discover(self, port: str, min_address: str, max_address: str) -> None:
+        print(f"Connecting to Elliptec bus on {port} ...")
+        ELLDevicePort.Connect(port)
+
+        ell_devices = ELLDevices()
+        devices = ell_devices.ScanAddresses(min_address, max_address)
+        if not devices:
+            raise RuntimeError("No Elliptec devices found on bus.")
+
+        for dev in devices:
+            if not ell_devices.Configure(dev):
+                continue
+
+            address = str(dev[0])
+            device = ell_devices.AddressedDevice(dev[0])
+            info = ElliptecDeviceInfo(
+                address=address,
+                description=tuple(str(line) for line in device.DeviceInfo.Description()),
+            )
+            self._channels[address] = ElliptecChannel(device, info, self._port_lock)
+
+            print(f"Elliptec device at address {address}:")
+            for line in info.description:
+                print("  ", line)
+
+        if not self._channels:
+            raise RuntimeError("No configurable Elliptec device found.")
+
+        self._ell_devices = ell_devices
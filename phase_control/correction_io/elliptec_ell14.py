@@ -1,11 +1,10 @@
 import time
 import clr
 from System import Decimal
-from base_lib.models import Angle, AngleUnit, Range
+from base_lib.models import Angle, AngleUnit
+from phase_control.correction_io.wrap_planner import ANGLE_RANGE, WrapPlanner
 
 # === Konstanten ===
-ANGLE_RANGE = Range(Angle(-90, AngleUnit.DEG), Angle(90, AngleUnit.DEG))
-OUT_OF_RANGE_RELATIVE_ANGLE = Angle(90, AngleUnit.DEG)
 HOME_ANGLE = Angle(0, AngleUnit.DEG)
 
 # === DLL laden ===
@@ -23,26 +22,32 @@ class ElliptecRotator:
         self._device = None
         self._ell_devices = None
 
-        self._current_angle: Angle = Angle(0, AngleUnit.DEG)
+        # absolute waveplate position relative to home
+        self._position: Angle = HOME_ANGLE
+        self._planner = WrapPlanner(ANGLE_RANGE)
 
         self._initialize(port, min_address, max_address)
 
+    @property
+    def position(self) -> Angle:
+        return self._position
 
     def rotate(self, angle: Angle) -> None:
         
         if float(angle) == 0.0:
             return
 
-        new_angle = Angle(self._current_angle + angle)
-        self._validate_new_delta_angle(new_angle)
-        self._move_relative(angle)
-        print("Current wp angle:", self._current_angle.Deg)
+        move = self._planner.plan(self._position, angle)
+        if move.wrapped:
+            print("wrapped target into range")
+        self._move_absolute(move.target)
+        print("Current wp angle:", self._position.Deg)
         print("--------------------------")
 
     def home(self) -> None:
         self._device.Home(ELLBaseDevice.DeviceDirection.Linear)
         time.sleep(1.0)
-        self._current_angle = Angle(0, AngleUnit.DEG)
+        self._position = HOME_ANGLE
 
     def close(self) -> None:
         try:
@@ -85,27 +90,14 @@ class ElliptecRotator:
         time.sleep(1.0)
         print("Device homed.")
 
-        # Startzustand: delta = 0
-        self._current_angle = Angle(0, AngleUnit.DEG)
+        # Startzustand: Home-Position
+        self._position = HOME_ANGLE
 
-    def _move_relative(self, angle: Angle) -> None:
-        d = Decimal(angle.Deg)
-        self._device.MoveRelative(d)
-        self._current_angle = Angle(self._current_angle + angle)
+    def _move_absolute(self, target: Angle) -> None:
+        d = Decimal(target.Deg)
+        self._device.MoveAbsolute(d)
+        self._position = target
         time.sleep(2.0)
 
-    def _validate_new_delta_angle(self, new_angle: Angle) -> None:
-        
-        if ANGLE_RANGE.is_in_range(new_angle):
-            return
-
-        if new_angle > ANGLE_RANGE.max:
-            correction = Angle(-OUT_OF_RANGE_RELATIVE_ANGLE)
-            print("corrected max")
-        else:
-            correction = OUT_OF_RANGE_RELATIVE_ANGLE
-            print("corrected min")
-
-        self._move_relative(correction)
 
         
@@ -0,0 +1,205 @@
+# phase_control/correction_io/elliptec_serial.py
+"""
+Native serial backend for Elliptec rotators.
+
+Talks the ELLx ASCII protocol (see ellx_protocol) directly over a serial
+port via pyserial, instead of loading Thorlabs.Elliptec.ELLO_DLL through
+clr. No .NET runtime and no COM-port scan are needed, it runs on Linux
+too (e.g. against the pty emulator in ellx_emulator), and every move is
+timed from command to position reply.
+
+ElliptecSerialRotator has the same public API as ElliptecRotator
+(position, rotate, home, close) and can be passed to AnalysisEngine as
+its rotator; app.py uses it with --rotator serial:<port>.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Optional
+
+from base_lib.models import Angle, AngleUnit
+from phase_control.correction_io import ellx_protocol as ellx
+from phase_control.correction_io.wrap_planner import ANGLE_RANGE, WrapPlanner
+
+HOME_ANGLE = Angle(0, AngleUnit.DEG)
+
+REPLY_TIMEOUT_S = 1.0
+MOVE_TIMEOUT_S = 10.0
+
+
+class ElliptecSerialPort:
+    """
+    One serial bus with Elliptec devices.
+
+    request() sends a command and waits for the matching reply line;
+    transactions are serialized by a lock, so the port can be shared.
+    """
+
+    def __init__(self, port: str) -> None:
+        try:
+            import serial
+        except ImportError as exc:
+            raise RuntimeError(
+                "The serial Elliptec backend needs pyserial (pip install pyserial)."
+            ) from exc
+
+        self._lock = threading.Lock()
+        self._serial = serial.Serial(
+            port=port,
+            baudrate=ellx.BAUDRATE,
+            bytesize=serial.EIGHTBITS,
+            parity=serial.PARITY_NONE,
+            stopbits=serial.STOPBITS_ONE,
+            timeout=REPLY_TIMEOUT_S,
+        )
+        self._serial.reset_input_buffer()
+
+    def request(
+        self,
+        address: str,
+        cmd: str,
+        data: str = "",
+        timeout: float = REPLY_TIMEOUT_S,
+    ) -> ellx.Reply:
+        with self._lock:
+            self._serial.write(ellx.command(address, cmd, data))
+            return self._read_reply(address, timeout)
+
+    def scan(self, min_address: str = "0", max_address: str = "F") -> list[ellx.DeviceInfo]:
+        """Query "in" on every address in the range; silent addresses are skipped."""
+        found: list[ellx.DeviceInfo] = []
+        for a in range(int(min_address, 16), int(max_address, 16) + 1):
+            try:
+                reply = self.request(f"{a:X}", ellx.CMD_INFO, timeout=0.2)
+            except TimeoutError:
+                continue
+            found.append(ellx.parse_info(reply))
+        return found
+
+    def close(self) -> None:
+        self._serial.close()
+
+    def _read_reply(self, address: str, timeout: float) -> ellx.Reply:
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            # readline() blocks for the port timeout: never past the deadline
+            self._serial.timeout = remaining
+            line = self._serial.readline()
+            if not line:
+                continue
+            reply = ellx.parse_reply(line)
+            if reply.address == address:
+                return reply
+        raise TimeoutError(f"No reply from Elliptec device at address {address}.")
+
+
+class ElliptecSerialRotator:
+    """
+    Elliptec rotator (ELL14/ELL18) on a serial port, without the Thorlabs DLL.
+    """
+
+    def __init__(
+        self,
+        port: str = "COM6",
+        address: str = "0",
+        home: bool = True,
+        bus: Optional[ElliptecSerialPort] = None,
+    ) -> None:
+        t0 = time.perf_counter()
+
+        self._bus = bus or ElliptecSerialPort(port)
+        self._owns_bus = bus is None
+        self._address = address
+
+        self.info = ellx.parse_info(self._bus.request(address, ellx.CMD_INFO))
+        self._pulses_per_deg = self.info.pulses_per_degree
+
+        self._position: Angle = HOME_ANGLE
+        self._planner = WrapPlanner(ANGLE_RANGE)
+
+        # timing of the last move (command -> position reply)
+        self.last_move_ms: Optional[float] = None
+
+        print(f"Connected to Elliptec device {address} on {port}:")
+        for line in self.info.description():
+            print("  ", line)
+
+        if home:
+            self.home()
+        self.startup_ms = (time.perf_counter() - t0) * 1e3
+
+    @property
+    def position(self) -> Angle:
+        return self._position
+
+    def rotate(self, angle: Angle) -> None:
+
+        if float(angle) == 0.0:
+            return
+
+        move = self._planner.plan(self._position, angle)
+        if move.wrapped:
+            print("wrapped target into range")
+        self._move_absolute(move.target)
+        print("Current wp angle:", self._position.Deg, f"({self.last_move_ms:.1f} ms)")
+        print("--------------------------")
+
+    def home(self) -> None:
+        reply = self._bus.request(
+            self._address,
+            ellx.CMD_HOME,
+            ellx.HOME_CLOCKWISE,
+            timeout=MOVE_TIMEOUT_S,
+        )
+        self._position = self._angle_from_reply(reply)
+
+    def get_position(self) -> Angle:
+        reply = self._bus.request(self._address, ellx.CMD_GET_POSITION)
+        self._position = self._angle_from_reply(reply)
+        return self._position
+
+    def status(self) -> int:
+        reply = self._bus.request(self._address, ellx.CMD_STATUS)
+        if reply.code != ellx.REPLY_STATUS:
+            raise ellx.ProtocolError(f"Not a status reply: {reply!r}")
+        return int(reply.data, 16)
+
+    def close(self) -> None:
+        if self._owns_bus:
+            self._bus.close()
+
+    # ------------------------------------------------------------------
+    # internal helpers
+    # ------------------------------------------------------------------
+
+    def _move_absolute(self, target: Angle) -> None:
+        pulses = round(target.Deg * self._pulses_per_deg)
+
+        t0 = time.perf_counter()
+        reply = self._bus.request(
+            self._address,
+            ellx.CMD_MOVE_ABSOLUTE,
+            ellx.encode_position(pulses),
+            timeout=MOVE_TIMEOUT_S,
+        )
+        self.last_move_ms = (time.perf_counter() - t0) * 1e3
+
+        self._position = self._angle_from_reply(reply)
+
+    def _angle_from_reply(self, reply: ellx.Reply) -> Angle:
+        if reply.code == ellx.REPLY_STATUS:
+            status = int(reply.data, 16)
+            raise RuntimeError(
+                f"Elliptec device {reply.address} reported status {status}: "
+                f"{ellx.STATUS_MESSAGES.get(status, 'unknown')}"
+            )
+        if reply.code != ellx.REPLY_POSITION:
+            raise ellx.ProtocolError(f"Not a position reply: {reply!r}")
+
+        pulses = ellx.decode_position(reply.data)
+        return Angle(pulses / self._pulses_per_deg, AngleUnit.DEG)
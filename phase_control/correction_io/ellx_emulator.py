@@ -0,0 +1,227 @@
+# phase_control/correction_io/ellx_emulator.py
+"""
+Elliptec (ELLx) device emulator on a pseudo-terminal.
+
+The emulator opens a pty pair and answers the ELLx ASCII protocol on the
+master side; the slave side (port_name) behaves like the device's serial
+port, so ElliptecSerialRotator can be exercised without hardware:
+
+    emulator = ElliptecEmulator()
+    port = emulator.start()
+    rotator = ElliptecSerialRotator(port=port)
+
+Moves reply with the new position after a simulated move time, so round
+trips are measurable. Several addresses can be emulated on one bus;
+their moves run concurrently.
+
+Run standalone (Linux/macOS):
+
+    python -m phase_control.correction_io.ellx_emulator --addresses 0 1
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+from phase_control.correction_io import ellx_protocol as ellx
+
+ELL14_PULSES_PER_REV = 0x23000
+
+
+@dataclass
+class _EmulatedDevice:
+    info: ellx.DeviceInfo
+    position: int = 0
+    busy_until: float = 0.0
+
+
+class ElliptecEmulator:
+    """
+    Emulates one or more ELL14 rotators on a pty.
+
+    move_time_s + |travel| / speed_deg_per_s is spent before a move or
+    home command replies.
+    """
+
+    def __init__(
+        self,
+        addresses: Sequence[str] = ("0",),
+        move_time_s: float = 0.05,
+        speed_deg_per_s: float = 430.0,
+    ) -> None:
+        self._devices = {
+            a: _EmulatedDevice(
+                ellx.DeviceInfo(
+                    address=a,
+                    device_type=14,
+                    serial_number=f"1140{int(a, 16):04d}",
+                    year=2024,
+                    firmware=0x17,
+                    hardware=0x01,
+                    travel=360,
+                    pulses_per_unit=ELL14_PULSES_PER_REV,
+                )
+            )
+            for a in addresses
+        }
+        self._move_time_s = move_time_s
+        self._speed = speed_deg_per_s
+
+        self._master: Optional[int] = None
+        self._slave: Optional[int] = None
+        self._write_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.port_name: Optional[str] = None
+
+    # ------------------------------------------------------------------ #
+    # Lifecycle
+    # ------------------------------------------------------------------ #
+
+    def start(self) -> str:
+        """Open the pty, start serving and return the slave port name."""
+        import tty  # POSIX only
+
+        master, slave = os.openpty()
+        tty.setraw(slave)
+
+        self._master, self._slave = master, slave
+        self.port_name = os.ttyname(slave)
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._serve,
+            name="ElliptecEmulator",
+            daemon=True,
+        )
+        self._thread.start()
+        return self.port_name
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        for fd in (self._master, self._slave):
+            if fd is not None:
+                os.close(fd)
+        self._master = self._slave = None
+
+    def __enter__(self) -> "ElliptecEmulator":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+    def position_pulses(self, address: str) -> int:
+        return self._devices[address].position
+
+    # ------------------------------------------------------------------ #
+    # Protocol handling
+    # ------------------------------------------------------------------ #
+
+    def _serve(self) -> None:
+        import select
+
+        pending = b""
+        while not self._stop_event.is_set():
+            readable, _, _ = select.select([self._master], [], [], 0.05)
+            if not readable:
+                continue
+            try:
+                chunk = os.read(self._master, 1024)
+            except OSError:
+                return
+            pending = self._consume(pending + chunk)
+
+    def _consume(self, data: bytes) -> bytes:
+        """Handle all complete commands in `data`, return the remainder."""
+        while data:
+            # tolerate line endings sent by some hosts
+            if data[:1] in (b"\r", b"\n"):
+                data = data[1:]
+                continue
+            if len(data) < 3:
+                return data
+
+            address = chr(data[0])
+            cmd = data[1:3].decode("ascii", errors="replace")
+            length = ellx.COMMAND_DATA_LENGTH.get(cmd)
+            if length is None:
+                data = data[3:]
+                if address in self._devices:
+                    self._write(ellx.format_status(address, 3))
+                continue
+            if len(data) < 3 + length:
+                return data
+
+            payload = data[3:3 + length].decode("ascii", errors="replace")
+            data = data[3 + length:]
+            if address in self._devices:
+                self._handle(self._devices[address], cmd, payload)
+        return data
+
+    def _handle(self, dev: _EmulatedDevice, cmd: str, payload: str) -> None:
+        address = dev.info.address
+
+        if cmd == ellx.CMD_INFO:
+            self._write(ellx.format_info(dev.info))
+        elif cmd == ellx.CMD_STATUS:
+            busy = time.monotonic() < dev.busy_until
+            self._write(ellx.format_status(address, 9 if busy else ellx.STATUS_OK))
+        elif cmd == ellx.CMD_GET_POSITION:
+            self._write(ellx.format_position(address, dev.position))
+        elif cmd == ellx.CMD_HOME:
+            self._move(dev, 0)
+        elif cmd == ellx.CMD_MOVE_ABSOLUTE:
+            self._move(dev, ellx.decode_position(payload))
+        elif cmd == ellx.CMD_MOVE_RELATIVE:
+            self._move(dev, dev.position + ellx.decode_position(payload))
+
+    def _move(self, dev: _EmulatedDevice, target: int) -> None:
+        travel_deg = abs(target - dev.position) / dev.info.pulses_per_degree
+        duration = self._move_time_s + travel_deg / self._speed
+
+        dev.position = target
+        dev.busy_until = time.monotonic() + duration
+
+        reply = ellx.format_position(dev.info.address, target)
+        timer = threading.Timer(duration, self._write, args=(reply,))
+        timer.daemon = True
+        timer.start()
+
+    def _write(self, data: bytes) -> None:
+        if self._master is None:
+            return
+        with self._write_lock:
+            try:
+                os.write(self._master, data)
+            except OSError:
+                pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Elliptec ELLx emulator on a pty")
+    parser.add_argument("--addresses", nargs="+", default=["0"])
+    parser.add_argument("--move-time", type=float, default=0.05,
+                        help="fixed time per move [s]")
+    args = parser.parse_args()
+
+    with ElliptecEmulator(args.addresses, move_time_s=args.move_time) as emulator:
+        print(f"Elliptec emulator listening on {emulator.port_name}", flush=True)
+        try:
+            while True:
+                time.sleep(1.0)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+# phase_control/correction_io/ellx_protocol.py
+"""
+Encoding and decoding of the Thorlabs Elliptec (ELLx) ASCII protocol.
+
+Host -> device: "<address><command><data>", e.g. "0ma00002300"
+Device -> host: "<address><REPLY><data>\\r\\n", e.g. "0PO00002300\\r\\n"
+
+Positions are signed 32-bit integers in encoder pulses, sent as
+8 upper-case hex digits (two's complement). The pulses per unit come
+from the device information ("in" -> "IN") reply.
+
+Shared by the serial driver (elliptec_serial) and the emulator
+(ellx_emulator), so both sides agree on the wire format.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+BAUDRATE = 9600
+TERMINATOR = b"\r\n"
+
+# Host commands (lower case)
+CMD_INFO = "in"
+CMD_STATUS = "gs"
+CMD_GET_POSITION = "gp"
+CMD_HOME = "ho"
+CMD_MOVE_ABSOLUTE = "ma"
+CMD_MOVE_RELATIVE = "mr"
+
+# Device replies (upper case)
+REPLY_INFO = "IN"
+REPLY_STATUS = "GS"
+REPLY_POSITION = "PO"
+
+# Data length (characters) following each host command
+COMMAND_DATA_LENGTH = {
+    CMD_INFO: 0,
+    CMD_STATUS: 0,
+    CMD_GET_POSITION: 0,
+    CMD_HOME: 1,
+    CMD_MOVE_ABSOLUTE: 8,
+    CMD_MOVE_RELATIVE: 8,
+}
+
+# Status codes ("GS" reply)
+STATUS_OK = 0
+STATUS_MESSAGES = {
+    0: "OK",
+    1: "communication time out",
+    2: "mechanical time out",
+    3: "command error or not supported",
+    4: "value out of range",
+    5: "module isolated",
+    6: "module out of isolation",
+    7: "initializing error",
+    8: "thermal error",
+    9: "busy",
+    10: "sensor error",
+    11: "motor error",
+    12: "out of range",
+    13: "over current error",
+}
+
+HOME_CLOCKWISE = "0"
+HOME_COUNTERCLOCKWISE = "1"
+
+
+class ProtocolError(Exception):
+    """Malformed or unexpected reply from an Elliptec device."""
+    pass
+
+
+@dataclass(frozen=True)
+class DeviceInfo:
+    """Parsed "IN" reply."""
+    address: str
+    device_type: int
+    serial_number: str
+    year: int
+    firmware: int
+    hardware: int
+    travel: int             # mm (linear) or degrees (rotary)
+    pulses_per_unit: int    # pulses per mm (linear) or per revolution (rotary)
+
+    @property
+    def pulses_per_degree(self) -> float:
+        """Encoder resolution of rotary devices (travel = 360 degrees)."""
+        return self.pulses_per_unit / self.travel
+
+    def description(self) -> list[str]:
+        return [
+            f"Address: {self.address}",
+            f"Device type: ELL{self.device_type}",
+            f"Serial number: {self.serial_number}",
+            f"Year: {self.year}",
+            f"Firmware: {self.firmware}",
+            f"Travel: {self.travel}",
+            f"Pulses per unit: {self.pulses_per_unit}",
+        ]
+
+
+@dataclass(frozen=True)
+class Reply:
+    address: str
+    code: str
+    data: str
+
+
+# ---------------------------------------------------------------------------
+# Host side
+# ---------------------------------------------------------------------------
+
+def encode_position(pulses: int) -> str:
+    return f"{pulses & 0xFFFFFFFF:08X}"
+
+
+def decode_position(data: str) -> int:
+    value = int(data, 16)
+    if value >= 1 << 31:
+        value -= 1 << 32
+    return value
+
+
+def command(address: str, cmd: str, data: str = "") -> bytes:
+    if len(data) != COMMAND_DATA_LENGTH[cmd]:
+        raise ValueError(f"Command {cmd!r} expects {COMMAND_DATA_LENGTH[cmd]} data characters.")
+    return f"{address}{cmd}{data}".encode("ascii")
+
+
+def parse_reply(line: bytes) -> Reply:
+    text = line.decode("ascii", errors="replace").strip()
+    if len(text) < 3:
+        raise ProtocolError(f"Reply too short: {text!r}")
+    return Reply(address=text[0], code=text[1:3], data=text[3:])
+
+
+def parse_info(reply: Reply) -> DeviceInfo:
+    if reply.code != REPLY_INFO or len(reply.data) < 30:
+        raise ProtocolError(f"Not a device information reply: {reply!r}")
+
+    d = reply.data
+    return DeviceInfo(
+        address=reply.address,
+        device_type=int(d[0:2], 16),
+        serial_number=d[2:10],
+        year=int(d[10:14]),
+        firmware=int(d[14:16], 16),
+        hardware=int(d[16:18], 16),
+        travel=int(d[18:22], 16),
+        pulses_per_unit=int(d[22:30], 16),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Device side (emulator)
+# ---------------------------------------------------------------------------
+
+def format_info(info: DeviceInfo) -> bytes:
+    data = (
+        f"{info.device_type:02X}"
+        f"{info.serial_number:>08}"
+        f"{info.year:04d}"
+        f"{info.firmware:02X}"
+        f"{info.hardware:02X}"
+        f"{info.travel:04X}"
+        f"{info.pulses_per_unit:08X}"
+    )
+    return format_reply(info.address, REPLY_INFO, data)
+
+
+def format_reply(address: str, code: str, data: str = "") -> bytes:
+    return f"{address}{code}{data}".encode("ascii") + TERMINATOR
+
+
+def format_status(address: str, status: int) -> bytes:
+    return format_reply(address, REPLY_STATUS, f"{status:02X}")
+
+
+def format_position(address: str, pulses: int) -> bytes:
+    return format_reply(address, REPLY_POSITION, encode_position(pulses))
@@ -0,0 +1,16 @@
+# phase_control/correction_io/rotator.py
+from typing import Protocol
+
+from base_lib.models import Angle
+
+
+class Rotator(Protocol):
+    """
+    Minimal interface the AnalysisEngine needs from a waveplate actuator.
+
+    ElliptecRotator implements it for the real hardware; simulated
+    actuators (e.g. for benchmarks) only need to provide rotate().
+    """
+
+    def rotate(self, angle: Angle) -> None:
+        ...
@@ -0,0 +1,81 @@
+# phase_control/correction_io/wrap_planner.py
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+
+from base_lib.models import Angle, AngleUnit, Range
+from phase_control.analysis.phase_corrector import CONVERSION_CONST
+
+# Allowed waveplate travel around the home position
+ANGLE_RANGE = Range(Angle(-90, AngleUnit.DEG), Angle(90, AngleUnit.DEG))
+
+# A phase change of pi is indistinguishable for the fit model, so every
+# waveplate position has equivalent positions spaced by pi * CONVERSION_CONST.
+EQUIVALENT_PERIOD = Angle(180.0 * abs(CONVERSION_CONST), AngleUnit.DEG)
+
+
+@dataclass(frozen=True)
+class PlannedMove:
+    """
+    Result of planning a single correction.
+
+    - target: absolute waveplate position to move to
+    - travel: signed distance from the current position to the target
+    - wrapped: True if the target differs from the naive position
+      (current + delta) by a multiple of the equivalent period
+    """
+    target: Angle
+    travel: Angle
+    wrapped: bool
+
+
+class WrapPlanner:
+    """
+    Plans absolute waveplate moves inside a limited travel range.
+
+    A relative correction `delta` requested at absolute position `p`
+    can be realised by any target `p + delta + k * period`. The planner
+    picks the candidate inside `allowed_range` with the shortest travel,
+    so leaving the range costs one absolute move instead of a fixed
+    wrap move followed by the requested move.
+    """
+
+    def __init__(
+        self,
+        allowed_range: Range[Angle] = ANGLE_RANGE,
+        period: Angle = EQUIVALENT_PERIOD,
+    ) -> None:
+        if period.Deg <= 0:
+            raise ValueError("Equivalent period must be positive.")
+        if allowed_range.max.Deg - allowed_range.min.Deg < period.Deg:
+            raise ValueError(
+                "Allowed range must span at least one equivalent period."
+            )
+
+        self._min_deg = allowed_range.min.Deg
+        self._max_deg = allowed_range.max.Deg
+        self._period_deg = period.Deg
+
+    def plan(self, position: Angle, delta: Angle) -> PlannedMove:
+        """
+        Return the shortest equivalent move for `delta` starting at `position`.
+        """
+        naive_deg = position.Deg + delta.Deg
+
+        # all k with min <= naive + k*period <= max
+        k_low = math.ceil((self._min_deg - naive_deg) / self._period_deg)
+        k_high = math.floor((self._max_deg - naive_deg) / self._period_deg)
+
+        # on equal travel prefer the unwrapped target (smallest |k|)
+        best_k = min(
+            range(k_low, k_high + 1),
+            key=lambda k: (abs(naive_deg + k * self._period_deg - position.Deg), abs(k)),
+        )
+
+        target_deg = naive_deg + best_k * self._period_deg
+        return PlannedMove(
+            target=Angle(target_deg, AngleUnit.DEG),
+            travel=Angle(target_deg - position.Deg, AngleUnit.DEG),
+            wrapped=best_k != 0,
+        )
@@ -26,6 +26,15 @@ class Spectrum:
         intensities = intensities / np.amax(intensities)
         
         return cls([Length(w, Prefix.NANO) for w in wavelengths], intensities)
+
+    @classmethod
+    def from_calibrated_data(
+        cls,
+        wavelengths: list[float],
+        intensities: np.ndarray,
+    ) -> Spectrum:
+        """Spectrum from intensities that are already dark/reference corrected."""
+        return cls([Length(w, Prefix.NANO) for w in wavelengths], intensities)
     
     def cut(self, range_wl: Range) -> Spectrum:
         wave = []
@@ -35,4 +44,15 @@ class Spectrum:
                 wave.append(self.wavelengths[i])
                 intensity.append(self.intensity[i])
                 
-        return Spectrum(wave, intensity)     
+        return Spectrum(wave, intensity)
+
+    def cut_indices(self, range_wl: Range) -> np.ndarray:
+        """Pixel indices cut() keeps, to be reused with take()."""
+        return np.flatnonzero([range_wl.is_in_range(w) for w in self.wavelengths])
+
+    def take(self, indices: np.ndarray) -> Spectrum:
+        """Spectrum of the given pixels only (e.g. cached cut indices)."""
+        return Spectrum(
+            [self.wavelengths[i] for i in indices],
+            np.asarray(self.intensity)[indices],
+        )     
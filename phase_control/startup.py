@@ -0,0 +1,274 @@
+# phase_control/startup.py
+"""
+Startup profiling, background preloading and concurrent bring-up for app.py.
+
+Heavy modules (lmfit/scipy, matplotlib with TkAgg, the Elliptec .NET
+DLL via clr) are no longer imported when app.py is loaded. preload()
+imports them in a background thread while the main thread waits for
+the 32-bit acquisition process; the first real use then finds them in
+sys.modules (or waits on the import lock for the rest of the import).
+
+bring_up() starts independent components (acquisition process,
+Elliptec discovery/homing, fit warm-up) in parallel threads and waits
+for all of them (readiness barrier) with a timeout per component, so
+startup takes as long as the slowest component instead of the sum.
+
+StartupProfile records the duration of every startup phase, the
+background imports and the milestones up to the first locked frame
+(first analysis result with a phase), and prints them as one table:
+
+    phase                        start [ms]   duration [ms]
+    imports                            0.0           85.2
+    acquisition start                 85.2         2410.7
+    ...
+"""
+
+from __future__ import annotations
+
+import importlib
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator, Mapping, Optional, Sequence
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class StartupPhase:
+    name: str
+    start_s: float      # since StartupProfile.t0
+    duration_s: float
+    thread: str
+    error: Optional[str] = None
+
+
+class StartupProfile:
+
+    def __init__(self, t0: Optional[float] = None) -> None:
+        # perf_counter() of the process start (e.g. taken at the top of app.py)
+        self.t0 = time.perf_counter() if t0 is None else t0
+        self._lock = threading.Lock()
+        self._phases: list[StartupPhase] = []
+        self._milestones: dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        error = None
+        try:
+            yield
+        except BaseException as exc:
+            error = repr(exc)
+            raise
+        finally:
+            self.add(name, start, time.perf_counter(), error)
+
+    def add(self, name: str, start: float, end: float, error: Optional[str] = None) -> None:
+        with self._lock:
+            self._phases.append(
+                StartupPhase(
+                    name=name,
+                    start_s=start - self.t0,
+                    duration_s=end - start,
+                    thread=threading.current_thread().name,
+                    error=error,
+                )
+            )
+
+    def mark(self, name: str) -> bool:
+        """Record a milestone (first call per name only); True if it is new."""
+        with self._lock:
+            if name in self._milestones:
+                return False
+            self._milestones[name] = time.perf_counter() - self.t0
+            return True
+
+    def milestone(self, name: str) -> Optional[float]:
+        """Seconds since t0 at which `name` was marked, or None."""
+        with self._lock:
+            return self._milestones.get(name)
+
+    def report(self) -> str:
+        with self._lock:
+            phases = sorted(self._phases, key=lambda p: p.start_s)
+            milestones = sorted(self._milestones.items(), key=lambda item: item[1])
+
+        rows = [
+            (p.name if p.thread in ("MainThread", p.name) else f"{p.name} ({p.thread})", p)
+            for p in phases
+        ]
+        width = max([len(name) for name, _ in rows] + [len(name) + 3 for name, _ in milestones] + [5])
+
+        lines = [f"{'phase':<{width}} {'start [ms]':>11} {'duration [ms]':>14}"]
+        for name, p in rows:
+            line = f"{name:<{width}} {p.start_s * 1e3:11.1f} {p.duration_s * 1e3:14.1f}"
+            if p.error is not None:
+                line += f"  failed: {p.error}"
+            lines.append(line)
+        for name, t in milestones:
+            lines.append(f"{'-> ' + name:<{width}} {t * 1e3:11.1f}")
+        return "\n".join(lines)
+
+
+# ---------------------------------------------------------------------- #
+# Background preloading
+# ---------------------------------------------------------------------- #
+
+def preload(modules: Iterable[str], profile: StartupProfile) -> threading.Thread:
+    """
+    Import `modules` in order in a daemon thread, each as its own
+    profile phase. Import errors (e.g. no .NET runtime) are recorded
+    and ignored; the real import raises them again where it matters.
+    """
+    names = list(modules)
+
+    def run() -> None:
+        for name in names:
+            start = time.perf_counter()
+            error = None
+            try:
+                importlib.import_module(name)
+            except Exception as exc:
+                error = repr(exc)
+            profile.add(f"import {name}", start, time.perf_counter(), error)
+
+    thread = threading.Thread(target=run, name="Preload", daemon=True)
+    thread.start()
+    return thread
+
+
+# ---------------------------------------------------------------------- #
+# Concurrent bring-up
+# ---------------------------------------------------------------------- #
+
+@dataclass(frozen=True)
+class Component:
+    name: str
+    start: Callable[[], Any]
+    # seconds from the common start, None = no limit (e.g. waits for the user)
+    timeout_s: Optional[float] = None
+    # False: an optimization only; failure or timeout is reported, result None
+    required: bool = True
+    # releases the result of start() if the bring-up fails
+    close: Optional[Callable[[Any], None]] = None
+
+
+def bring_up(components: Sequence[Component], profile: StartupProfile) -> dict[str, Any]:
+    """
+    Run every component's start() in its own daemon thread and wait
+    until all have finished (readiness barrier). Returns the results by
+    component name.
+
+    A component that is not `required` may fail or time out: that is
+    printed and its result is None. Otherwise RuntimeError names every
+    required component that failed or was not ready within its timeout,
+    after the others have finished; the results of the components that
+    did start (also of those finishing later) are released with their
+    `close`. A timed out start() keeps running in its thread; the caller
+    releases what has no `close` (e.g. stops the acquisition process).
+    """
+    results: dict[str, Any] = {}
+    errors: dict[str, BaseException] = {}
+    done = {c.name: threading.Event() for c in components}
+    lock = threading.Lock()
+    failed = False
+
+    def release(component: Component, result: Any) -> None:
+        if component.close is None:
+            return
+        try:
+            component.close(result)
+        except Exception as exc:
+            print(f"Releasing {component.name} failed: {exc!r}")
+
+    def run(component: Component) -> None:
+        try:
+            with profile.phase(component.name):
+                result = component.start()
+            with lock:
+                results[component.name] = result
+                late = failed
+            if late:
+                release(component, result)
+        except BaseException as exc:
+            errors[component.name] = exc
+        finally:
+            done[component.name].set()
+
+    t0 = time.perf_counter()
+    for component in components:
+        threading.Thread(
+            target=run, args=(component,), name=component.name, daemon=True
+        ).start()
+
+    failures = []
+    for component in components:
+        timeout = None
+        if component.timeout_s is not None:
+            timeout = max(0.0, t0 + component.timeout_s - time.perf_counter())
+        if not done[component.name].wait(timeout):
+            failure = f"{component.name}: not ready after {component.timeout_s:g} s"
+        elif component.name in errors:
+            failure = f"{component.name}: {errors[component.name]!r}"
+        else:
+            continue
+        if component.required:
+            failures.append(failure)
+        else:
+            print(f"Startup continues without {failure}")
+
+    if failures:
+        with lock:
+            failed = True
+            started = dict(results)
+        for component in components:
+            if component.name in started:
+                release(component, started[component.name])
+        raise RuntimeError("Startup failed:\n  " + "\n  ".join(failures)) from next(
+            iter(errors.values()), None
+        )
+    profile.mark("devices ready")
+    return {c.name: results.get(c.name) for c in components}
+
+
+# ---------------------------------------------------------------------- #
+# Milestones
+# ---------------------------------------------------------------------- #
+
+def watch_first_lock(
+    engines: Mapping[int, object],
+    profile: StartupProfile,
+    stop_event: threading.Event,
+    budget_s: Optional[float] = None,
+    poll_s: float = 0.02,
+) -> threading.Thread:
+    """
+    Mark "first analysis result" and "first locked frame" (first result
+    with a measured phase) from the engines' PhaseHistory, then print
+    the profile, with a warning if the first locked frame took longer
+    than `budget_s`.
+    """
+
+    def run() -> None:
+        while not stop_event.wait(poll_s):
+            for engine in engines.values():
+                latest = engine.history.latest()  # type: ignore[attr-defined]
+                if latest is None:
+                    continue
+                profile.mark("first analysis result")
+                if np.isfinite(latest[1][0]):
+                    profile.mark("first locked frame")
+                    print("Startup profile:\n" + profile.report(), flush=True)
+                    t_lock = profile.milestone("first locked frame")
+                    if budget_s is not None and t_lock is not None and t_lock > budget_s:
+                        print(
+                            f"Startup took {t_lock:.1f} s to the first locked frame "
+                            f"(budget {budget_s:.1f} s)."
+                        )
+                    return
+
+    thread = threading.Thread(target=run, name="StartupWatch", daemon=True)
+    thread.start()
+    return thread
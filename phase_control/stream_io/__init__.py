@@ -1,11 +1,20 @@
 # phase_control/stream_io/__init__.py
-from .models import StreamMeta, StreamFrame
+from .models import StreamMeta, StreamFrame, AveragedFrame
+from .calibration import Calibration, CalibrationKey, CalibrationStore
 from .frame_buffer import FrameBuffer
+from .frame_store import FrameRecorder, FrameStoreReader, FrameStoreWriter
 from .stream_client import SpectrometerStreamClient
 
 __all__ = [
     "StreamMeta",
     "StreamFrame",
+    "AveragedFrame",
+    "Calibration",
+    "CalibrationKey",
+    "CalibrationStore",
     "FrameBuffer",
+    "FrameRecorder",
+    "FrameStoreReader",
+    "FrameStoreWriter",
     "SpectrometerStreamClient",
 ]
@@ -0,0 +1,307 @@
+# phase_control/stream_io/calibration.py
+"""
+Dark and reference (flat-field) frames for the analysis side.
+
+A calibration belongs to one device and set of acquisition settings
+(CalibrationKey: device, exposure, average, binning, ROI start, number of
+pixels). CalibrationStore keeps the averaged frames per key, persists them
+to an .npz file and hands out a Calibration that corrects a frame in a
+single vectorized operation:
+
+    intensity = (counts - dark) * scale
+
+- with a reference: scale = 1 / (reference - dark), i.e. a fixed
+  flat-field normalization that does not change from frame to frame
+- dark only: scale = 1 / peak of the first dark-corrected frame, then
+  kept fixed (no per-frame extrema scan)
+
+For an exposure without captured frames (auto exposure changes it at run
+time) the calibration of the nearest captured exposure with otherwise
+equal settings is scaled to it: dark and reference grow in proportion to
+the exposure.
+
+Frames for which no calibration matches fall back to the per-frame
+min/max normalization of Spectrum.from_raw_data.
+
+The averaged frames are captured by the acquisition process
+(capture_dark / capture_reference below); the frames() iterator of the
+stream client has to be running in the reader thread meanwhile.
+"""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+
+from .models import AveragedFrame, StreamMeta
+from .stream_client import SpectrometerStreamClient
+
+# reference - dark below this is treated as a dead pixel (scale 0)
+MIN_REFERENCE_COUNTS = 1.0
+
+# calibrations scaled to other exposures kept per store
+MAX_SCALED_CALIBRATIONS = 32
+
+CAPTURE_TIMEOUT_S = 30.0
+
+
+@dataclass(frozen=True)
+class CalibrationKey:
+    """Device and acquisition settings a dark/reference frame is valid for."""
+    device_index: int
+    exposure_ms: float
+    average: int
+    binning: int
+    roi_start: int
+    num_pixels: int
+
+    @classmethod
+    def from_meta(cls, meta: StreamMeta) -> Optional[CalibrationKey]:
+        if meta.exposure_ms is None or meta.average is None:
+            return None
+        return cls(
+            device_index=meta.device_index,
+            exposure_ms=float(meta.exposure_ms),
+            average=int(meta.average),
+            binning=meta.binning,
+            roi_start=meta.roi_start,
+            num_pixels=meta.num_pixels,
+        )
+
+    @classmethod
+    def from_frame(cls, frame: AveragedFrame) -> CalibrationKey:
+        return cls(
+            device_index=frame.device_index,
+            exposure_ms=float(frame.exposure_ms),
+            average=int(frame.average),
+            binning=frame.binning,
+            roi_start=frame.roi_start,
+            num_pixels=len(frame.counts),
+        )
+
+    @property
+    def token(self) -> str:
+        """Key as used for the array names in the .npz file."""
+        return (
+            f"{self.device_index}_{self.exposure_ms!r}_{self.average}_{self.binning}"
+            f"_{self.roi_start}_{self.num_pixels}"
+        )
+
+    @classmethod
+    def from_token(cls, token: str) -> CalibrationKey:
+        device, exposure, average, binning, roi_start, num_pixels = token.split("_")
+        return cls(
+            int(device),
+            float(exposure),
+            int(average),
+            int(binning),
+            int(roi_start),
+            int(num_pixels),
+        )
+
+
+class Calibration:
+    """
+    Precomputed dark offset and scale for one CalibrationKey.
+
+    `exposure_ratio` scales captured frames to another exposure (exposure
+    of the frames to correct / exposure of the captured ones).
+    """
+
+    def __init__(
+        self,
+        dark: np.ndarray,
+        reference: Optional[np.ndarray] = None,
+        exposure_ratio: float = 1.0,
+    ) -> None:
+        self.dark = np.asarray(dark, dtype=np.float64) * exposure_ratio
+        self.scale: Optional[np.ndarray] = None
+        # dark only: 1 / peak of the first corrected frame
+        self._peak_scale: Optional[float] = None
+        if reference is not None:
+            span = np.asarray(reference, dtype=np.float64) * exposure_ratio - self.dark
+            self.scale = np.where(
+                span > MIN_REFERENCE_COUNTS,
+                1.0 / np.maximum(span, MIN_REFERENCE_COUNTS),
+                0.0,
+            )
+
+    @property
+    def has_reference(self) -> bool:
+        return self.scale is not None
+
+    def apply(self, counts: Union[list[int], list[float], np.ndarray]) -> np.ndarray:
+        corrected = np.asarray(counts, dtype=np.float64) - self.dark
+        if self.scale is not None:
+            corrected *= self.scale
+            return corrected
+
+        if self._peak_scale is None:
+            peak = corrected.max()
+            self._peak_scale = 1.0 / peak if peak > 0 else 1.0
+        corrected *= self._peak_scale
+        return corrected
+
+
+class CalibrationStore:
+    """
+    Thread-safe collection of dark/reference frames keyed by acquisition
+    settings, optionally persisted to `path` (.npz).
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None) -> None:
+        self.path = Path(path) if path is not None else None
+
+        self._lock = threading.Lock()
+        self._darks: dict[CalibrationKey, np.ndarray] = {}
+        self._references: dict[CalibrationKey, np.ndarray] = {}
+        self._calibrations: dict[CalibrationKey, Calibration] = {}
+        # calibrations scaled to exposures without captured frames
+        self._scaled: dict[CalibrationKey, Calibration] = {}
+
+        if self.path is not None and self.path.exists():
+            self.load()
+
+    # ------------------------------------------------------------------ #
+    # Frames
+    # ------------------------------------------------------------------ #
+
+    def set_dark(self, key: CalibrationKey, counts) -> None:
+        with self._lock:
+            self._darks[key] = np.asarray(counts, dtype=np.float64)
+            self._calibrations.pop(key, None)
+            self._scaled.clear()
+
+    def set_reference(self, key: CalibrationKey, counts) -> None:
+        with self._lock:
+            self._references[key] = np.asarray(counts, dtype=np.float64)
+            self._calibrations.pop(key, None)
+            self._scaled.clear()
+
+    def add(self, frame: AveragedFrame) -> CalibrationKey:
+        """Store a captured dark or reference frame under its own settings."""
+        key = CalibrationKey.from_frame(frame)
+        if frame.kind == "reference":
+            self.set_reference(key, frame.counts)
+        else:
+            self.set_dark(key, frame.counts)
+        return key
+
+    def lookup(self, key: Optional[CalibrationKey]) -> Optional[Calibration]:
+        """
+        Calibration for `key`: from the frames stored for it, else scaled
+        from the nearest exposure with otherwise equal settings. None if
+        no matching dark frame is stored.
+        """
+        if key is None:
+            return None
+        with self._lock:
+            calibration = self._calibrations.get(key) or self._scaled.get(key)
+            if calibration is not None:
+                return calibration
+
+            if key in self._darks:
+                calibration = Calibration(self._darks[key], self._references.get(key))
+                self._calibrations[key] = calibration
+                return calibration
+
+            source = self._nearest_exposure(key)
+            if source is None:
+                return None
+            if len(self._scaled) >= MAX_SCALED_CALIBRATIONS:
+                self._scaled.clear()
+            calibration = Calibration(
+                self._darks[source],
+                self._references.get(source),
+                exposure_ratio=key.exposure_ms / source.exposure_ms,
+            )
+            self._scaled[key] = calibration
+            return calibration
+
+    def clear(self) -> None:
+        with self._lock:
+            self._darks.clear()
+            self._references.clear()
+            self._calibrations.clear()
+            self._scaled.clear()
+
+    def _nearest_exposure(self, key: CalibrationKey) -> Optional[CalibrationKey]:
+        """Stored dark key equal to `key` but for the closest exposure ratio."""
+        if key.exposure_ms <= 0:
+            return None
+        candidates = [
+            k for k in self._darks
+            if k.exposure_ms > 0 and replace(k, exposure_ms=key.exposure_ms) == key
+        ]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda k: abs(np.log(k.exposure_ms / key.exposure_ms)))
+
+    # ------------------------------------------------------------------ #
+    # Persistence
+    # ------------------------------------------------------------------ #
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        with self._lock:
+            arrays = {f"dark__{k.token}": v for k, v in self._darks.items()}
+            arrays.update({f"reference__{k.token}": v for k, v in self._references.items()})
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "wb") as f:
+            np.savez(f, **arrays)
+
+    def load(self) -> None:
+        if self.path is None:
+            return
+        with np.load(self.path) as data:
+            for name in data.files:
+                kind, token = name.split("__", 1)
+                key = CalibrationKey.from_token(token)
+                if kind == "reference":
+                    self.set_reference(key, data[name])
+                else:
+                    self.set_dark(key, data[name])
+
+
+# ---------------------------------------------------------------------- #
+# Capture helpers
+# ---------------------------------------------------------------------- #
+
+def capture_dark(
+    client: SpectrometerStreamClient,
+    store: CalibrationStore,
+    count: int = 20,
+    timeout: float = CAPTURE_TIMEOUT_S,
+    device_index: int = 0,
+) -> CalibrationKey:
+    """
+    Let the acquisition process average `count` frames with the light
+    blocked, store the result and save the store.
+    """
+    client.request_dark(count, device_index)
+    return _store_capture(client.wait_for_dark(timeout, device_index), store)
+
+
+def capture_reference(
+    client: SpectrometerStreamClient,
+    store: CalibrationStore,
+    count: int = 20,
+    timeout: float = CAPTURE_TIMEOUT_S,
+    device_index: int = 0,
+) -> CalibrationKey:
+    """Same as capture_dark(), for the reference (flat-field) spectrum."""
+    client.request_reference(count, device_index)
+    return _store_capture(client.wait_for_reference(timeout, device_index), store)
+
+
+def _store_capture(frame: Optional[AveragedFrame], store: CalibrationStore) -> CalibrationKey:
+    if frame is None:
+        raise RuntimeError("No averaged frame received from the acquisition process.")
+    key = store.add(frame)
+    store.save()
+    return key
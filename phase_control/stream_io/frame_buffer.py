@@ -7,6 +7,7 @@ import numpy as np
 
 from phase_control.domain.models import Spectrum
 
+from .calibration import CalibrationKey, CalibrationStore
 from .models import StreamFrame, StreamMeta
 
 
@@ -16,21 +17,43 @@ class FrameBuffer:
 
     - update(frame): store a new frame (overwrites previous one)
     - get_latest(): return the most recent frame or None if nothing yet
+
+    If a CalibrationStore holds a dark (and reference) frame for the
+    current acquisition settings, frames are corrected with it instead of
+    being normalized by their own min/max.
+
+    Counters (for monitoring): `received` frames, `dropped` frames that
+    were overwritten before get_latest() consumed them, and `overruns`,
+    the acquisition-side drop count reported with the latest frame.
     """
 
-    def __init__(self, meta: StreamMeta) -> None:
+    def __init__(
+        self,
+        meta: StreamMeta,
+        calibration: Optional[CalibrationStore] = None,
+    ) -> None:
         self._lock = threading.Lock()
         self._latest: Optional[StreamFrame] = None
         self.meta: StreamMeta = meta
+        self.calibration = calibration
+
+        self.received: int = 0
+        self.dropped: int = 0
+        self.overruns: int = 0
 
     def update(self, frame: StreamFrame) -> None:
         """Store a new frame, overwriting any previous frame."""
         with self._lock:
+            if self._latest is not None:
+                self.dropped += 1
             self._latest = frame
+            self.received += 1
+            self.overruns = frame.overruns
 
     def get_latest(self) -> Spectrum | None:
         """
-        Return the most recent frame, or None if no frame has been stored yet.
+        Return the most recent frame, or None if no frame has been stored yet
+        or it was acquired with a pixel axis that has since changed.
         """
         if self._latest is None:
             return None
@@ -39,8 +62,17 @@ class FrameBuffer:
             self._latest = None
             return spec
 
-    def _generate_Spectrogram(self, frame: StreamFrame) -> Spectrum:
+    def _generate_Spectrogram(self, frame: StreamFrame) -> Spectrum | None:
         if self.meta.wavelengths is not None:
+            if len(frame.counts) != len(self.meta.wavelengths):
+                # frame from before a binning change
+                return None
+            if self.calibration is not None:
+                cal = self.calibration.lookup(CalibrationKey.from_meta(self.meta))
+                if cal is not None:
+                    return Spectrum.from_calibrated_data(
+                        self.meta.wavelengths, cal.apply(frame.counts)
+                    )
             return Spectrum.from_raw_data(self.meta.wavelengths, frame.counts)
         else:
             raise ValueError("Wavelengths not readable.")
@@ -0,0 +1,525 @@
+# phase_control/stream_io/frame_store.py
+"""
+Chunked, compressed on-disk store for spectrum frames.
+
+Layout of a .psfs file (all integers little-endian):
+
+    header      b"PSFS", version u16, length u32, JSON (axis, codec, ...)
+    chunk*      b"CHNK", n_frames u32, payload length u32, payload
+    index       b"INDX", n_chunks u32, n_chunks x (offset u64,
+                first_frame u64, n_frames u32, t_first_ns i64)
+    footer      index offset u64, b"PSFX"
+
+A chunk holds up to `chunk_frames` consecutive frames. Its payload is
+compressed with a stdlib codec (zlib or lzma) and contains:
+
+- t_start_ns and t_end_ns of every frame (int64)
+- the counts, delta-encoded along time (first frame as is, then the
+  difference to the previous frame with unsigned wrap-around, so the
+  encoding is lossless) and split into byte planes, which turns the
+  mostly small deltas into long runs the codec compresses well
+
+The index at the end makes random access and time seeks decompress only
+the chunks they touch. If a recording was not closed (no footer), the
+reader rebuilds the index by walking the chunk headers; a torn last
+chunk is ignored.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import lzma
+import struct
+import zlib
+from pathlib import Path
+from typing import Any, BinaryIO, Iterator, NamedTuple, Optional, Sequence, Union
+
+import numpy as np
+
+from phase_control.domain.models import Spectrum
+
+from .models import StreamFrame, StreamMeta
+
+FRAME_STORE_SUFFIX = ".psfs"
+FORMAT_VERSION = 1
+
+CODEC_ZLIB = "zlib"
+CODEC_LZMA = "lzma"
+
+DEFAULT_CHUNK_FRAMES = 256
+
+_FILE_HEADER = struct.Struct("<4sHI")
+_CHUNK_HEADER = struct.Struct("<4sII")
+_INDEX_HEADER = struct.Struct("<4sI")
+_INDEX_ENTRY = struct.Struct("<QQIq")
+_FOOTER = struct.Struct("<Q4s")
+
+_FILE_MAGIC = b"PSFS"
+_CHUNK_MAGIC = b"CHNK"
+_INDEX_MAGIC = b"INDX"
+_FOOTER_MAGIC = b"PSFX"
+
+# stored sample types and the unsigned type their deltas are taken in
+_DTYPES = {
+    "uint16": (np.dtype("<u2"), np.dtype("<u2")),
+    "uint32": (np.dtype("<u4"), np.dtype("<u4")),
+    "float32": (np.dtype("<f4"), np.dtype("<u4")),
+}
+
+
+class ChunkInfo(NamedTuple):
+    offset: int         # file offset of the chunk header
+    first_frame: int
+    n_frames: int
+    t_first_ns: int
+
+
+# ---------------------------------------------------------------------- #
+# Chunk encoding
+# ---------------------------------------------------------------------- #
+
+def _compress(codec: str, data: bytes, level: Optional[int]) -> bytes:
+    if codec == CODEC_ZLIB:
+        return zlib.compress(data, 1 if level is None else level)
+    if codec == CODEC_LZMA:
+        return lzma.compress(data, preset=0 if level is None else level)
+    raise ValueError(f"Unknown codec: {codec!r}")
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(data)
+    if codec == CODEC_LZMA:
+        return lzma.decompress(data)
+    raise ValueError(f"Unknown codec: {codec!r}")
+
+
+def encode_chunk(
+    counts: np.ndarray,
+    t_start_ns: np.ndarray,
+    t_end_ns: np.ndarray,
+    delta_dtype: np.dtype,
+) -> bytes:
+    """Uncompressed payload for a (n_frames, n_pixels) block of counts."""
+    raw = np.ascontiguousarray(counts).view(delta_dtype)
+    delta = np.empty_like(raw)
+    delta[0] = raw[0]
+    np.subtract(raw[1:], raw[:-1], out=delta[1:])
+
+    # byte planes: all lowest bytes, then all next bytes, ...
+    planes = delta.view(np.uint8).reshape(-1, delta_dtype.itemsize).T
+
+    return b"".join((
+        t_start_ns.astype("<i8").tobytes(),
+        t_end_ns.astype("<i8").tobytes(),
+        planes.tobytes(),
+    ))
+
+
+def decode_chunk(
+    payload: bytes,
+    n_frames: int,
+    n_pixels: int,
+    dtype: np.dtype,
+    delta_dtype: np.dtype,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Inverse of encode_chunk(): (counts, t_start_ns, t_end_ns)."""
+    times = np.frombuffer(payload, dtype="<i8", count=2 * n_frames)
+    t_start_ns, t_end_ns = times[:n_frames], times[n_frames:]
+
+    planes = np.frombuffer(payload, dtype=np.uint8, offset=times.nbytes)
+    planes = planes.reshape(delta_dtype.itemsize, n_frames * n_pixels)
+    delta = np.ascontiguousarray(planes.T).view(delta_dtype).reshape(n_frames, n_pixels)
+
+    raw = np.cumsum(delta, axis=0, dtype=delta_dtype)  # wraps like the encoder
+    return raw.view(dtype), t_start_ns, t_end_ns
+
+
+# ---------------------------------------------------------------------- #
+# Writer
+# ---------------------------------------------------------------------- #
+
+class FrameStoreWriter:
+    """
+    Append frames of one pixel axis to a .psfs file.
+
+        with FrameStoreWriter(path, wavelengths) as store:
+            store.append(counts, t_start_ns, t_end_ns)
+
+    Frames are buffered and written as one compressed chunk every
+    `chunk_frames` frames; close() writes the last chunk and the index.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        wavelengths: Optional[Sequence[float]],
+        num_pixels: Optional[int] = None,
+        device_index: int = 0,
+        dtype: str = "uint16",
+        codec: str = CODEC_ZLIB,
+        level: Optional[int] = None,
+        chunk_frames: int = DEFAULT_CHUNK_FRAMES,
+        extra: Optional[dict[str, Any]] = None,
+    ) -> None:
+        if dtype not in _DTYPES:
+            raise ValueError(f"Unsupported dtype: {dtype!r}")
+        if codec not in (CODEC_ZLIB, CODEC_LZMA):
+            raise ValueError(f"Unknown codec: {codec!r}")
+        if num_pixels is None:
+            if wavelengths is None:
+                raise ValueError("Either wavelengths or num_pixels is required.")
+            num_pixels = len(wavelengths)
+
+        self.path = Path(path)
+        self.num_pixels = int(num_pixels)
+        self.codec = codec
+        self.level = level
+        self.chunk_frames = max(1, int(chunk_frames))
+        self._dtype, self._delta_dtype = _DTYPES[dtype]
+
+        self._counts = np.empty((self.chunk_frames, self.num_pixels), dtype=self._dtype)
+        self._t_start = np.empty(self.chunk_frames, dtype=np.int64)
+        self._t_end = np.empty(self.chunk_frames, dtype=np.int64)
+        self._pending = 0
+
+        self._index: list[ChunkInfo] = []
+        self.num_frames = 0
+
+        header = {
+            "version": FORMAT_VERSION,
+            "device_index": device_index,
+            "num_pixels": self.num_pixels,
+            "wavelengths": None if wavelengths is None else list(wavelengths),
+            "dtype": dtype,
+            "codec": codec,
+            "chunk_frames": self.chunk_frames,
+            **(extra or {}),
+        }
+        header_bytes = json.dumps(header).encode("utf-8")
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file: Optional[BinaryIO] = open(self.path, "wb")
+        self._file.write(_FILE_HEADER.pack(_FILE_MAGIC, FORMAT_VERSION, len(header_bytes)))
+        self._file.write(header_bytes)
+
+    def __enter__(self) -> FrameStoreWriter:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def append(self, counts: Sequence[float], t_start_ns: int = 0, t_end_ns: int = 0) -> None:
+        if self._file is None:
+            raise RuntimeError("FrameStoreWriter is closed.")
+        if len(counts) != self.num_pixels:
+            raise ValueError(
+                f"Frame has {len(counts)} pixels, store has {self.num_pixels}."
+            )
+
+        i = self._pending
+        self._counts[i] = counts
+        self._t_start[i] = t_start_ns
+        self._t_end[i] = t_end_ns
+        self._pending += 1
+
+        if self._pending == self.chunk_frames:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered frames as one chunk."""
+        n = self._pending
+        if n == 0 or self._file is None:
+            return
+
+        payload = encode_chunk(
+            self._counts[:n], self._t_start[:n], self._t_end[:n], self._delta_dtype
+        )
+        compressed = _compress(self.codec, payload, self.level)
+
+        offset = self._file.tell()
+        self._file.write(_CHUNK_HEADER.pack(_CHUNK_MAGIC, n, len(compressed)))
+        self._file.write(compressed)
+        self._file.flush()
+
+        self._index.append(ChunkInfo(offset, self.num_frames, n, int(self._t_start[0])))
+        self.num_frames += n
+        self._pending = 0
+
+    def close(self) -> None:
+        if self._file is None:
+            return
+        self.flush()
+
+        f = self._file
+        index_offset = f.tell()
+        f.write(_INDEX_HEADER.pack(_INDEX_MAGIC, len(self._index)))
+        for entry in self._index:
+            f.write(_INDEX_ENTRY.pack(*entry))
+        f.write(_FOOTER.pack(index_offset, _FOOTER_MAGIC))
+        f.close()
+        self._file = None
+
+
+# ---------------------------------------------------------------------- #
+# Reader
+# ---------------------------------------------------------------------- #
+
+class FrameStoreReader:
+    """
+    Random access and streaming reads of a .psfs file.
+
+    - len(reader), reader[i] -> (counts, t_start_ns, t_end_ns)
+    - read(start, stop) -> 2D counts and time arrays of a frame range
+    - index_at_time(t_ns) -> first frame acquired at or after t_ns
+    - iter_chunks() / frames() / spectra(): stream chunk by chunk
+
+    The last decoded chunk is cached, so sequential single-frame access
+    decompresses every chunk once.
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+        self._file: BinaryIO = open(self.path, "rb")
+
+        magic, version, header_len = _FILE_HEADER.unpack(self._file.read(_FILE_HEADER.size))
+        if magic != _FILE_MAGIC:
+            raise ValueError(f"{self.path} is not a frame store.")
+        if version > FORMAT_VERSION:
+            raise ValueError(f"Unsupported frame store version {version}.")
+
+        self.header: dict[str, Any] = json.loads(self._file.read(header_len))
+        self.num_pixels: int = self.header["num_pixels"]
+        self.wavelengths: Optional[list[float]] = self.header.get("wavelengths")
+        self.codec: str = self.header["codec"]
+        self._dtype, self._delta_dtype = _DTYPES[self.header["dtype"]]
+        self._data_start = _FILE_HEADER.size + header_len
+
+        self.chunks: list[ChunkInfo] = self._read_index() or self._scan_chunks()
+        self._first_frames = [c.first_frame for c in self.chunks]
+        self._t_firsts = [c.t_first_ns for c in self.chunks]
+        self.num_frames = sum(c.n_frames for c in self.chunks)
+
+        self._cached: Optional[tuple[int, tuple[np.ndarray, np.ndarray, np.ndarray]]] = None
+
+    def __enter__(self) -> FrameStoreReader:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __len__(self) -> int:
+        return self.num_frames
+
+    def __getitem__(self, i: int) -> tuple[np.ndarray, int, int]:
+        if i < 0:
+            i += self.num_frames
+        if not 0 <= i < self.num_frames:
+            raise IndexError(i)
+        k = bisect.bisect_right(self._first_frames, i) - 1
+        counts, t_start, t_end = self.read_chunk(k)
+        j = i - self.chunks[k].first_frame
+        return counts[j], int(t_start[j]), int(t_end[j])
+
+    def read(self, start: int = 0, stop: Optional[int] = None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Frames [start, stop) as (counts[n, pixels], t_start_ns[n], t_end_ns[n])."""
+        stop = self.num_frames if stop is None else min(stop, self.num_frames)
+        start = max(0, start)
+        if start >= stop:
+            empty = np.empty((0, self.num_pixels), dtype=self._dtype)
+            return empty, np.empty(0, np.int64), np.empty(0, np.int64)
+
+        first = bisect.bisect_right(self._first_frames, start) - 1
+        last = bisect.bisect_right(self._first_frames, stop - 1) - 1
+        parts = [self.read_chunk(k) for k in range(first, last + 1)]
+
+        offset = start - self.chunks[first].first_frame
+        counts = np.concatenate([p[0] for p in parts])[offset:offset + stop - start]
+        t_start = np.concatenate([p[1] for p in parts])[offset:offset + stop - start]
+        t_end = np.concatenate([p[2] for p in parts])[offset:offset + stop - start]
+        return counts, t_start, t_end
+
+    def index_at_time(self, t_ns: int) -> int:
+        """Index of the first frame with t_start_ns >= t_ns (len() if none)."""
+        k = max(0, bisect.bisect_right(self._t_firsts, t_ns) - 1)
+        for k in range(k, len(self.chunks)):
+            _, t_start, _ = self.read_chunk(k)
+            j = int(np.searchsorted(t_start, t_ns, side="left"))
+            if j < len(t_start):
+                return self.chunks[k].first_frame + j
+        return self.num_frames
+
+    def read_chunk(self, k: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        if self._cached is not None and self._cached[0] == k:
+            return self._cached[1]
+
+        info = self.chunks[k]
+        self._file.seek(info.offset)
+        _, n_frames, length = _CHUNK_HEADER.unpack(self._file.read(_CHUNK_HEADER.size))
+        payload = _decompress(self.codec, self._file.read(length))
+        decoded = decode_chunk(payload, n_frames, self.num_pixels, self._dtype, self._delta_dtype)
+
+        self._cached = (k, decoded)
+        return decoded
+
+    def iter_chunks(self) -> Iterator[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        for k in range(len(self.chunks)):
+            yield self.read_chunk(k)
+
+    def frames(self) -> Iterator[StreamFrame]:
+        """Stored frames as StreamFrame objects (as the stream client yields them)."""
+        device_index = self.header.get("device_index", 0)
+        for counts, t_start, t_end in self.iter_chunks():
+            for row, ts, te in zip(counts.tolist(), t_start.tolist(), t_end.tolist()):
+                yield StreamFrame(
+                    t_start_ns=ts,
+                    t_end_ns=te,
+                    device_index=device_index,
+                    counts=row,
+                )
+
+    def spectra(self) -> Iterator[Spectrum]:
+        """Stored frames as normalized Spectrum objects for offline analysis."""
+        if self.wavelengths is None:
+            raise ValueError("Frame store has no wavelength axis.")
+        for counts, _, _ in self.iter_chunks():
+            for row in counts:
+                yield Spectrum.from_raw_data(self.wavelengths, row)
+
+    # ------------------------------------------------------------------ #
+    # Index
+    # ------------------------------------------------------------------ #
+
+    def _read_index(self) -> Optional[list[ChunkInfo]]:
+        f = self._file
+        f.seek(0, 2)
+        size = f.tell()
+        if size < self._data_start + _FOOTER.size:
+            return None
+
+        f.seek(size - _FOOTER.size)
+        index_offset, magic = _FOOTER.unpack(f.read(_FOOTER.size))
+        if magic != _FOOTER_MAGIC:
+            return None
+
+        f.seek(index_offset)
+        magic, n_chunks = _INDEX_HEADER.unpack(f.read(_INDEX_HEADER.size))
+        if magic != _INDEX_MAGIC:
+            return None
+        data = f.read(n_chunks * _INDEX_ENTRY.size)
+        return [ChunkInfo(*entry) for entry in _INDEX_ENTRY.iter_unpack(data)]
+
+    def _scan_chunks(self) -> list[ChunkInfo]:
+        """Rebuild the index of a recording that was not closed."""
+        f = self._file
+        f.seek(0, 2)
+        size = f.tell()
+
+        chunks: list[ChunkInfo] = []
+        offset, first_frame = self._data_start, 0
+        while offset + _CHUNK_HEADER.size <= size:
+            f.seek(offset)
+            magic, n_frames, length = _CHUNK_HEADER.unpack(f.read(_CHUNK_HEADER.size))
+            end = offset + _CHUNK_HEADER.size + length
+            if magic != _CHUNK_MAGIC or end > size:
+                break  # index reached, or torn last chunk
+
+            payload = _decompress(self.codec, f.read(length))
+            t_first = int(np.frombuffer(payload, dtype="<i8", count=1)[0])
+            chunks.append(ChunkInfo(offset, first_frame, n_frames, t_first))
+
+            first_frame += n_frames
+            offset = end
+        return chunks
+
+
+# ---------------------------------------------------------------------- #
+# Recorder
+# ---------------------------------------------------------------------- #
+
+class FrameRecorder:
+    """
+    Records the frames of one device from the stream into .psfs files.
+
+    The pixel axis and the sample type of a store are fixed; when a
+    'config' message changes the frame format (ROI start or width,
+    binning, host averaging), the recorder closes the current file and
+    continues in a new segment <stem>_<n>.psfs. Host-averaged frames are
+    stored as float32, binned frames (sums of pixels) as uint32 and raw
+    counts as uint16.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        meta: StreamMeta,
+        codec: str = CODEC_ZLIB,
+        chunk_frames: int = DEFAULT_CHUNK_FRAMES,
+    ) -> None:
+        self.path = Path(path)
+        self.meta = meta
+        self.codec = codec
+        self.chunk_frames = chunk_frames
+
+        self._writer: Optional[FrameStoreWriter] = None
+        self._format: Optional[tuple[int, int, int, int]] = None
+        self._segment = 0
+        self.paths: list[Path] = []
+
+    def record(self, frame: StreamFrame) -> None:
+        writer = self._writer
+        if writer is None or self._frame_format(frame) != self._format:
+            writer = self._open_segment(frame)
+        writer.append(frame.counts, frame.t_start_ns, frame.t_end_ns)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def _frame_format(self, frame: StreamFrame) -> tuple[int, int, int, int]:
+        meta = self.meta
+        return (len(frame.counts), meta.roi_start, meta.binning, meta.host_average)
+
+    def _open_segment(self, frame: StreamFrame) -> FrameStoreWriter:
+        self.close()
+        self._format = self._frame_format(frame)
+
+        path = self.path.with_suffix(FRAME_STORE_SUFFIX)
+        if self._segment:
+            path = path.with_name(f"{path.stem}_{self._segment}{FRAME_STORE_SUFFIX}")
+        self._segment += 1
+
+        meta = self.meta
+        wavelengths = meta.wavelengths if meta.num_pixels == len(frame.counts) else None
+        if meta.host_average > 1 or any(isinstance(c, float) for c in frame.counts[:16]):
+            dtype = "float32"
+        elif meta.binning > 1:
+            dtype = "uint32"
+        else:
+            dtype = "uint16"
+
+        self._writer = FrameStoreWriter(
+            path,
+            wavelengths=wavelengths,
+            num_pixels=len(frame.counts),
+            device_index=frame.device_index,
+            dtype=dtype,
+            codec=self.codec,
+            chunk_frames=self.chunk_frames,
+            extra={
+                "roi_start": meta.roi_start,
+                "binning": meta.binning,
+                "host_average": meta.host_average,
+                "exposure_ms": meta.exposure_ms,
+                "average": meta.average,
+                "clock_perf_ns": meta.clock_perf_ns,
+                "clock_wall_ns": meta.clock_wall_ns,
+            },
+        )
+        self.paths.append(path)
+        return self._writer
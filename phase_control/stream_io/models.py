@@ -6,12 +6,36 @@ from typing import List, Optional
 @dataclass
 class StreamMeta:
     """
-    Static information about the spectrometer stream.
-    Sent once as the initial 'meta' JSON object.
+    Information about the spectrometer stream.
+    Sent once as the initial 'meta' JSON object; the pixel axis
+    (num_pixels, wavelengths, binning, roi_start) and the acquisition
+    settings (exposure_ms, average, host_average) are updated in place by the stream
+    client when a 'config' message changes them.
+
+    - wavelengths: axis of the shipped frames (ROI, binned)
+    - roi_start: first detector pixel of the shipped frames
+    - detector_wavelengths: full detector axis from the LUT
+    - clock_perf_ns / clock_wall_ns: simultaneous readings of the
+      acquisition process' perf_counter_ns() and time.time_ns(); all
+      *_ns stream timestamps are perf_counter_ns() values
     """
     device_index: int
     num_pixels: int
     wavelengths: Optional[List[float]]
+    binning: int = 1
+    roi_start: int = 0
+    detector_wavelengths: Optional[List[float]] = None
+    exposure_ms: Optional[float] = None
+    average: Optional[int] = None
+    host_average: int = 1   # rolling average over frames in the acquisition process
+    clock_perf_ns: Optional[int] = None
+    clock_wall_ns: Optional[int] = None
+
+    def wall_time_ns(self, t_ns: int) -> Optional[int]:
+        """Convert a stream timestamp to time.time_ns() (epoch) scale."""
+        if self.clock_perf_ns is None or self.clock_wall_ns is None:
+            return None
+        return self.clock_wall_ns + (t_ns - self.clock_perf_ns)
 
 
 @dataclass
@@ -20,6 +44,33 @@ class StreamFrame:
     One spectrum frame from the acquisition process.
     Corresponds to a 'frame' JSON object.
     """
-    timestamp: str          # ISO-8601 string
+    t_start_ns: int         # perf_counter_ns() before PHO_Acquire
+    t_end_ns: int           # perf_counter_ns() after PHO_Acquire
     device_index: int
     counts: List[int]
+    overruns: int = 0       # frames dropped so far by the acquisition pipeline
+
+    @property
+    def exposure_ns(self) -> int:
+        """Duration of the acquisition call."""
+        return self.t_end_ns - self.t_start_ns
+
+
+@dataclass
+class AveragedFrame:
+    """
+    Averaged spectrum requested with SpectrometerStreamClient.request_dark()
+    or request_reference(). Corresponds to a 'dark' or 'reference' JSON
+    object; the acquisition settings it was taken with are included so it
+    can be matched to later frames.
+    """
+    kind: str               # "dark" or "reference"
+    t_start_ns: int         # first acquisition started
+    t_end_ns: int           # last acquisition finished
+    device_index: int
+    count: int              # number of averaged acquisitions
+    counts: List[float]
+    exposure_ms: float
+    average: int
+    binning: int = 1
+    roi_start: int = 0
@@ -4,8 +4,13 @@ Low-level stream client for the 32-bit acquisition process.
 
 Responsibilities:
 - start the 32-bit Python process running `acquisition.json_stream_server`
-- read the initial 'meta' JSON object
-- provide an iterator over 'frame' JSON objects
+- read the initial 'devices' JSON object and one 'meta' per device
+- keep each device's meta pixel axis in sync with 'config' JSON objects
+- provide an iterator over 'frame' JSON objects of all devices (tagged
+  by device_index)
+- send control commands (config, ROI, pause/resume, dark and reference
+  frames) as JSON lines on the process' stdin; set_config/set_roi
+  return a Future that the 'ack'/'error' reply on stdout resolves
 - stop/terminate the process when done
 
 This module does NOT:
@@ -16,11 +21,14 @@ This module does NOT:
 import json
 import os
 import subprocess
+import sys
+import threading
+from concurrent.futures import Future
 from pathlib import Path
-from typing import Iterator, Optional
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
 
 from acquisition.config import PYTHON32_PATH
-from .models import StreamMeta, StreamFrame
+from .models import AveragedFrame, StreamMeta, StreamFrame
 
 
 class SpectrometerStreamClient:
@@ -28,7 +36,13 @@ class SpectrometerStreamClient:
     Stream client for the JSON output of the 32-bit acquisition process.
     """
 
-    def __init__(self, python32_path: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        python32_path: Optional[str] = None,
+        headless: bool = False,
+        initial_config: Optional[Dict[str, Any]] = None,
+        devices: Optional[Sequence[int]] = None,
+    ) -> None:
         """
         Parameters
         ----------
@@ -39,11 +53,31 @@ class SpectrometerStreamClient:
             1. explicit python32_path argument
             2. environment variable 'PYTHON32_PATH'
             3. acquisition.config.PYTHON32_PATH
+        headless:
+            Start the acquisition process without its Tk configuration
+            window. The initial configuration is then sent over the
+            command channel.
+        initial_config:
+            SpectrometerConfig fields for the headless start (missing
+            fields keep their defaults).
+        devices:
+            Device indices to acquire concurrently; an empty sequence
+            means all connected spectrometers, None the configured one.
         """
         self.python32_path = PYTHON32_PATH
+        self.headless = headless
+        self.initial_config = dict(initial_config or {})
+        self.devices = None if devices is None else list(devices)
 
         self._proc: Optional[subprocess.Popen[str]] = None
-        self._meta: Optional[StreamMeta] = None
+        self._metas: Dict[int, StreamMeta] = {}
+
+        self._send_lock = threading.Lock()
+        self._next_id = 0
+        self._pending: Dict[int, Future] = {}
+        self._captures: Dict[Tuple[str, int], AveragedFrame] = {}
+        self._capture_events: Dict[Tuple[str, int], threading.Event] = {}
+        self._capture_lock = threading.Lock()
 
     # ------------------------------------------------------------------ #
     # Properties
@@ -52,12 +86,22 @@ class SpectrometerStreamClient:
     @property
     def meta(self) -> StreamMeta:
         """
-        Static meta information. Only valid after start() has been called.
+        Static meta information of the first device. Only valid after
+        start() has been called.
         """
-        if self._meta is None:
+        if not self._metas:
             raise RuntimeError("StreamMeta not available. Did you call start()?")
 
-        return self._meta
+        return next(iter(self._metas.values()))
+
+    @property
+    def metas(self) -> Dict[int, StreamMeta]:
+        """Meta information per device_index (after start())."""
+        return self._metas
+
+    @property
+    def device_indices(self) -> List[int]:
+        return list(self._metas)
 
     # ------------------------------------------------------------------ #
     # Lifecycle
@@ -65,24 +109,33 @@ class SpectrometerStreamClient:
 
     def start(self) -> StreamMeta:
         """
-        Start the 32-bit acquisition process and read the 'meta' frame.
+        Start the 32-bit acquisition process and read the 'devices' and
+        'meta' frames.
 
         Returns
         -------
         StreamMeta
-            Static meta information describing the stream.
+            Static meta information of the first device; see `metas`
+            for all devices.
         """
         if self._proc is not None:
             raise RuntimeError("Acquisition process is already running.")
 
         repo_root = Path(__file__).resolve().parents[2]  # .../SPM-002
 
+        args = [self.python32_path, "-m", "acquisition.json_stream_server"]
+        if self.headless:
+            args.append("--headless")
+        if self.devices is not None:
+            args += ["--devices"] + ([str(d) for d in self.devices] or ["all"])
+
+        # stderr is inherited: the process' diagnostics go straight to our
+        # console, and a pipe nobody reads could fill and block it
         proc = subprocess.Popen(
-            [self.python32_path, "-m", "acquisition.json_stream_server"],
+            args,
             cwd=str(repo_root),          # acquisition package visible for -m
             stdout=subprocess.PIPE,
-            stdin=subprocess.DEVNULL,
-            stderr=subprocess.PIPE,
+            stdin=subprocess.PIPE,       # command channel
             text=True,
             bufsize=1,                   # line-buffered
         )
@@ -91,29 +144,65 @@ class SpectrometerStreamClient:
         if proc.stdout is None:
             raise RuntimeError("Failed to open stdout from acquisition process.")
 
-        # Read one line (meta)
-        meta_line = proc.stdout.readline()
-        if not meta_line:
-            stderr_msg = ""
-            if proc.stderr is not None:
-                stderr_msg = proc.stderr.read()
-            raise RuntimeError(
-                "Acquisition process terminated before sending meta data.\n"
-                f"stderr:\n{stderr_msg}"
-            )
+        initial: Optional[Future] = None
+        if self.headless:
+            # no GUI: the first configuration starts the acquisition
+            initial = self.set_config(**self.initial_config)
 
-        meta_raw = json.loads(meta_line)
-        if meta_raw.get("type") != "meta":
-            raise RuntimeError(f"Expected meta frame, got: {meta_raw!r}")
+        # 'devices' line, then one 'meta' line per device
+        devices_raw = self._read_header("devices", initial)
+        self._metas = {}
+        for _ in devices_raw["device_indices"]:
+            meta = self._parse_meta(self._read_header("meta"))
+            self._metas[meta.device_index] = meta
 
-        self._meta = StreamMeta(
+        return self.meta
+
+    def _read_header(self, expected_type: str, initial: Optional[Future] = None) -> dict:
+        """
+        Next header message; command replies before it are handled. A
+        rejected `initial` configuration raises, as the acquisition would
+        wait for a valid one forever.
+        """
+        proc = self._proc
+        assert proc is not None and proc.stdout is not None
+
+        while True:
+            line = proc.stdout.readline()
+            if not line:
+                raise RuntimeError(
+                    "Acquisition process terminated before sending meta data "
+                    "(see its output on stderr)."
+                )
+
+            raw = json.loads(line)
+            if raw.get("type") in ("ack", "error"):
+                self._handle_reply(raw)
+                if initial is not None and initial.done() and initial.exception() is not None:
+                    raise RuntimeError(
+                        f"Initial acquisition configuration rejected: {initial.exception()}"
+                    )
+                continue
+            if raw.get("type") != expected_type:
+                raise RuntimeError(f"Expected {expected_type} frame, got: {raw!r}")
+            return raw
+
+    @staticmethod
+    def _parse_meta(meta_raw: dict) -> StreamMeta:
+        return StreamMeta(
             device_index=meta_raw["device_index"],
             num_pixels=meta_raw["num_pixels"],
             wavelengths=meta_raw["wavelengths"],  # may be None
+            binning=meta_raw.get("binning", 1),
+            roi_start=meta_raw.get("roi_start", 0),
+            detector_wavelengths=meta_raw.get("detector_wavelengths"),
+            exposure_ms=meta_raw.get("exposure_ms"),
+            average=meta_raw.get("average"),
+            host_average=meta_raw.get("host_average", 1),
+            clock_perf_ns=meta_raw.get("clock_perf_ns"),
+            clock_wall_ns=meta_raw.get("clock_wall_ns"),
         )
 
-        return self._meta
-
     def frames(self) -> Iterator[StreamFrame]:
         """
         Iterate over frames from the acquisition process.
@@ -135,25 +224,205 @@ class SpectrometerStreamClient:
             except json.JSONDecodeError:
                 continue
 
-            if frame_raw.get("type") != "frame":
+            msg_type = frame_raw.get("type")
+            if msg_type == "config":
+                self._update_axis(frame_raw)
+                continue
+            if msg_type in ("dark", "reference"):
+                self._store_capture(frame_raw)
+                continue
+            if msg_type in ("ack", "error"):
+                self._handle_reply(frame_raw)
+                continue
+            if msg_type != "frame":
                 continue  # ignore meta or other messages
 
             yield StreamFrame(
-                timestamp=frame_raw["timestamp"],
+                t_start_ns=frame_raw["t_start_ns"],
+                t_end_ns=frame_raw["t_end_ns"],
                 device_index=frame_raw["device_index"],
                 counts=frame_raw["counts"],
+                overruns=frame_raw.get("overruns", 0),
             )
 
+    def _update_axis(self, config_raw: dict) -> None:
+        """
+        Apply the pixel axis announced in a 'config' message (ROI and
+        binning change it) to the shared StreamMeta of that device, before
+        the first frame that uses it is yielded.
+        """
+        meta = self._metas.get(config_raw.get("device_index", 0))
+        if meta is None or "binning" not in config_raw:
+            return
+
+        wavelengths = config_raw.get("wavelengths")
+        meta.binning = config_raw["binning"]
+        meta.roi_start = config_raw.get("roi_start", 0)
+        meta.exposure_ms = config_raw.get("exposure_ms")
+        meta.average = config_raw.get("average")
+        meta.host_average = config_raw.get("host_average", 1)
+        meta.wavelengths = wavelengths
+        if wavelengths is not None:
+            meta.num_pixels = len(wavelengths)
+
+    def _handle_reply(self, reply_raw: dict) -> None:
+        """
+        Resolve the Future of the command an 'ack'/'error' answers: None,
+        or ValueError with the acquisition's message. Errors without a
+        command (a device rejected an accepted configuration) are printed.
+        """
+        with self._send_lock:
+            future = self._pending.pop(reply_raw.get("id"), None)
+
+        if reply_raw["type"] == "ack":
+            if future is not None:
+                future.set_result(None)
+            return
+
+        message = reply_raw.get("message", "")
+        if future is not None:
+            future.set_exception(ValueError(message))
+            return
+        device = reply_raw.get("device_index")
+        source = "Acquisition" if device is None else f"Acquisition device {device}"
+        print(f"{source}: {message}", file=sys.stderr, flush=True)
+
+    def _store_capture(self, capture_raw: dict) -> None:
+        kind = capture_raw["type"]
+        key = (kind, capture_raw["device_index"])
+        self._captures[key] = AveragedFrame(
+            kind=kind,
+            t_start_ns=capture_raw["t_start_ns"],
+            t_end_ns=capture_raw["t_end_ns"],
+            device_index=capture_raw["device_index"],
+            count=capture_raw["count"],
+            counts=capture_raw["counts"],
+            exposure_ms=capture_raw["exposure_ms"],
+            average=capture_raw["average"],
+            binning=capture_raw.get("binning", 1),
+            roi_start=capture_raw.get("roi_start", 0),
+        )
+        self._capture_event(key).set()
+
+    # ------------------------------------------------------------------ #
+    # Commands (JSON lines on stdin of the acquisition process)
+    # ------------------------------------------------------------------ #
+
+    def set_config(self, **fields: Any) -> Future:
+        """
+        Change SpectrometerConfig fields, e.g. set_config(exposure_ms=20).
+
+        The returned Future resolves (through frames()) once the
+        acquisition accepted the change, or raises ValueError with the
+        reason it was rejected. A device that then fails to apply an
+        accepted change reports it on stderr and keeps the previous one.
+        """
+        return self._request({"cmd": "set_config", "config": fields})
+
+    def set_roi(self, min_nm: float, max_nm: float) -> Future:
+        """
+        Restrict acquisition to [min_nm, max_nm]; 0, 0 = full detector.
+        Returns a Future like set_config().
+        """
+        return self._request({"cmd": "set_roi", "min_nm": min_nm, "max_nm": max_nm})
+
+    def pause(self) -> None:
+        self._send({"cmd": "pause"})
+
+    def resume(self) -> None:
+        self._send({"cmd": "resume"})
+
+    def request_dark(self, count: int = 10, device_index: int = 0) -> None:
+        """
+        Ask for an averaged dark frame of `count` acquisitions. The result
+        arrives through the frames() iterator; use wait_for_dark() to get it.
+        """
+        self._request_capture("dark", count, device_index)
+
+    def request_reference(self, count: int = 10, device_index: int = 0) -> None:
+        """Same as request_dark(), for a reference (flat-field) frame."""
+        self._request_capture("reference", count, device_index)
+
+    def wait_for_dark(
+        self,
+        timeout: Optional[float] = None,
+        device_index: int = 0,
+    ) -> Optional[AveragedFrame]:
+        """Latest dark frame, or None if none arrived within `timeout`."""
+        return self._wait_for_capture(("dark", device_index), timeout)
+
+    def wait_for_reference(
+        self,
+        timeout: Optional[float] = None,
+        device_index: int = 0,
+    ) -> Optional[AveragedFrame]:
+        """Latest reference frame, or None if none arrived within `timeout`."""
+        return self._wait_for_capture(("reference", device_index), timeout)
+
+    def _capture_event(self, key: Tuple[str, int]) -> threading.Event:
+        with self._capture_lock:
+            return self._capture_events.setdefault(key, threading.Event())
+
+    def _request_capture(self, kind: str, count: int, device_index: int) -> None:
+        self._capture_event((kind, device_index)).clear()
+        self._send({"cmd": kind, "count": count, "device_index": device_index})
+
+    def _wait_for_capture(
+        self,
+        key: Tuple[str, int],
+        timeout: Optional[float],
+    ) -> Optional[AveragedFrame]:
+        if not self._capture_event(key).wait(timeout):
+            return None
+        return self._captures.get(key)
+
+    def _request(self, command: Dict[str, Any]) -> Future:
+        """Send `command` with a new id; the reply resolves the Future."""
+        future: Future = Future()
+        with self._send_lock:
+            self._next_id += 1
+            command_id = self._next_id
+            self._pending[command_id] = future
+        try:
+            self._send({**command, "id": command_id})
+        except BaseException:
+            with self._send_lock:
+                self._pending.pop(command_id, None)
+            raise
+        return future
+
+    def _send(self, command: Dict[str, Any]) -> None:
+        proc = self._proc
+        if proc is None or proc.stdin is None:
+            raise RuntimeError("Acquisition process is not running. Call start() first.")
+
+        with self._send_lock:
+            proc.stdin.write(json.dumps(command) + "\n")
+            proc.stdin.flush()
+
     def stop(self) -> None:
         """
-        Terminate the acquisition process if it is still running.
+        Ask the acquisition process to shut down; terminate it if it is
+        still running afterwards.
         """
         proc = self._proc
-        self._proc = None
 
         if proc is None:
             return
 
+        if proc.poll() is None:
+            try:
+                self._send({"cmd": "shutdown"})
+                proc.wait(timeout=2)
+            except (OSError, subprocess.TimeoutExpired):
+                pass
+        self._proc = None
+
+        with self._send_lock:
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            future.set_exception(RuntimeError("Acquisition process stopped."))
+
         if proc.poll() is None:
             proc.terminate()
             try:
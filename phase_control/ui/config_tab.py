@@ -28,8 +28,9 @@ class ConfigTab:
     def __init__(self, parent: ttk.Notebook, config: AnalysisConfig) -> None:
         self.frame = ttk.Frame(parent)
 
-        # Shared config instance
+        # Shared config instance; config version shown in the fit fields
         self._config = config
+        self._shown_version = -1
 
         # Tk variables for FitParameter fields
         self._carrier_var = tk.StringVar()
@@ -165,19 +166,34 @@ class ConfigTab:
     # Public API – FitParameter fields
     # ------------------------------------------------------------------ #
 
-    def refresh_from_config(self) -> None:
+    def refresh_from_config(self, force: bool = False) -> None:
         """
         Update the FitParameter UI fields from the shared config.
-        Called whenever the analysis updates the fit (e.g. after a step).
+        Called whenever the analysis updates the fit (e.g. after a step);
+        only fields changed since the last refresh are reformatted, all
+        of them with force=True (discarding edits in the UI).
         """
         cfg = self._config
-
-        self._carrier_var.set(f"{cfg.carrier_wavelength.value(Prefix.NANO):.6f}")
-        self._starting_var.set(f"{cfg.starting_wavelength.value(Prefix.NANO):.6f}")
-        self._bandwidth_var.set(f"{cfg.bandwidth.value(Prefix.NANO):.6f}")
-        self._baseline_var.set(f"{cfg.baseline:.6f}")
-        self._phase_var.set(f"{cfg.phase.Rad:.6f}")
-        self._acceleration_var.set(f"{cfg.acceleration:.6f}")
+        if force:
+            self._shown_version = -1
+        version = cfg.version
+        if version == self._shown_version:
+            return
+        changed = cfg.changed_since(self._shown_version)
+        self._shown_version = version
+
+        if "carrier_wavelength" in changed:
+            self._carrier_var.set(f"{cfg.carrier_wavelength.value(Prefix.NANO):.6f}")
+        if "starting_wavelength" in changed:
+            self._starting_var.set(f"{cfg.starting_wavelength.value(Prefix.NANO):.6f}")
+        if "bandwidth" in changed:
+            self._bandwidth_var.set(f"{cfg.bandwidth.value(Prefix.NANO):.6f}")
+        if "baseline" in changed:
+            self._baseline_var.set(f"{cfg.baseline:.6f}")
+        if "phase" in changed:
+            self._phase_var.set(f"{cfg.phase.Rad:.6f}")
+        if "acceleration" in changed:
+            self._acceleration_var.set(f"{cfg.acceleration:.6f}")
 
     def apply_fit_parameters(self) -> None:
         """
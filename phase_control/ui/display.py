@@ -0,0 +1,136 @@
+# phase_control/ui/display.py
+"""
+Display side of the decoupled analysis/UI pipeline.
+
+The AnalysisWorker publishes every result into a LatestResult slot; the
+MainWindow takes the newest one at most `fps` times per second and
+renders it. Results that are replaced before they were rendered are
+counted as skipped renders, so the analysis rate never depends on how
+fast Tk can paint.
+
+decimate_minmax() reduces a trace to one (min, max) pair per horizontal
+pixel, so peaks and fringes survive while the number of drawn points is
+bounded by the canvas width.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from phase_control.analysis.run_analysis import AnalysisPlotResult
+
+DEFAULT_FPS = 30.0
+
+# smoothing of the measured display frame rate
+FPS_SMOOTHING = 0.1
+
+
+@dataclass(frozen=True)
+class DisplayStats:
+    """Counters of one device's slot; skipped = never rendered (replaced)."""
+    published: int
+    rendered: int
+    skipped: int
+    fps: float
+    last_render_ms: float
+
+
+class LatestResult:
+    """
+    Thread-safe single-slot mailbox per device: put() overwrites,
+    take() empties. Safe to call put() from the analysis thread and
+    take() from the Tk thread.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._results: dict[int, AnalysisPlotResult] = {}
+        self._published: dict[int, int] = {}
+        self._rendered: dict[int, int] = {}
+        self._skipped: dict[int, int] = {}
+        self._fps: dict[int, float] = {}
+        self._last_take: dict[int, float] = {}
+        self._render_ms: dict[int, float] = {}
+
+    def put(self, device: int, result: AnalysisPlotResult) -> None:
+        with self._lock:
+            if device in self._results:
+                self._skipped[device] = self._skipped.get(device, 0) + 1
+            self._results[device] = result
+            self._published[device] = self._published.get(device, 0) + 1
+
+    def take(self, device: int) -> Optional[AnalysisPlotResult]:
+        """Newest unrendered result of `device`, or None."""
+        with self._lock:
+            result = self._results.pop(device, None)
+            if result is None:
+                return None
+
+            self._rendered[device] = self._rendered.get(device, 0) + 1
+            now = time.perf_counter()
+            last = self._last_take.get(device)
+            self._last_take[device] = now
+            if last is not None and now > last:
+                fps = self._fps.get(device)
+                rate = 1.0 / (now - last)
+                self._fps[device] = rate if fps is None else fps + FPS_SMOOTHING * (rate - fps)
+            return result
+
+    def record_render(self, device: int, render_ms: float) -> None:
+        with self._lock:
+            self._render_ms[device] = render_ms
+
+    def stats(self, device: int) -> DisplayStats:
+        with self._lock:
+            return DisplayStats(
+                published=self._published.get(device, 0),
+                rendered=self._rendered.get(device, 0),
+                skipped=self._skipped.get(device, 0),
+                fps=self._fps.get(device, 0.0),
+                last_render_ms=self._render_ms.get(device, 0.0),
+            )
+
+    def clear(self) -> None:
+        """Drop pending results and reset all counters."""
+        with self._lock:
+            self._results.clear()
+            self._published.clear()
+            self._rendered.clear()
+            self._skipped.clear()
+            self._fps.clear()
+            self._last_take.clear()
+            self._render_ms.clear()
+
+
+def decimate_minmax(
+    x: np.ndarray,
+    y: np.ndarray,
+    buckets: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Reduce (x, y) to the minimum and maximum of `buckets` equally sized
+    index ranges, in their original order. Traces with at most
+    2 * buckets points are returned unchanged.
+    """
+    n = len(y)
+    if buckets <= 0 or n <= 2 * buckets:
+        return x, y
+
+    size = n // buckets
+    whole = buckets * size
+    blocks = np.asarray(y[:whole]).reshape(buckets, size)
+    offsets = np.arange(0, whole, size)
+    lo = blocks.argmin(axis=1) + offsets
+    hi = blocks.argmax(axis=1) + offsets
+
+    index = np.sort(np.stack((lo, hi), axis=1), axis=1).ravel()
+    if whole < n:
+        tail = np.asarray(y[whole:])
+        tail_index = np.sort([tail.argmin() + whole, tail.argmax() + whole])
+        index = np.concatenate((index, tail_index))
+    return np.asarray(x)[index], np.asarray(y)[index]
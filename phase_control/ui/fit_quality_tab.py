@@ -0,0 +1,148 @@
+# phase_control/ui/fit_quality_tab.py
+from __future__ import annotations
+
+import time
+from tkinter import ttk
+from typing import Optional
+
+import numpy as np
+from matplotlib.axes import Axes
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.figure import Figure
+
+from phase_control.analysis.fit_quality import FitQualityLog, FitQualityStats
+
+# histograms are full redraws: at most once per interval
+UPDATE_INTERVAL_S = 1.0
+HISTOGRAM_BINS = 40
+
+
+class FitQualityTab:
+    """
+    Fit-quality diagnostics of the selected engine (FitQualityLog):
+
+    - rates and counts: fits/s, accepted phase updates/s, acceptance
+      ratio, rejected and failed fits, fit time and nfev
+    - histograms of the per-fit residual (with the averaged residuals of
+      accepted / rejected decisions and the residuals_threshold), the fit
+      time and the number of function evaluations
+
+    Meant for tuning residuals_threshold and avg_spectra. Updates are
+    throttled to UPDATE_INTERVAL_S.
+    """
+
+    _STATS = (
+        ("fit_rate_hz", "Fits [1/s]", "{:.2f}"),
+        ("accept_rate_hz", "Accepted updates [1/s]", "{:.2f}"),
+        ("accept_ratio", "Acceptance ratio", "{:.1%}"),
+        ("accepted", "Accepted", "{}"),
+        ("rejected", "Rejected", "{}"),
+        ("failed_fits", "Failed fits", "{}"),
+        ("fit_ms_p50", "Fit time p50 [ms]", "{:.2f}"),
+        ("fit_ms_p95", "Fit time p95 [ms]", "{:.2f}"),
+        ("nfev_mean", "Function evaluations (mean)", "{:.1f}"),
+        ("residual_p50", "Residual p50", "{:.4g}"),
+        ("residual_p95", "Residual p95", "{:.4g}"),
+    )
+
+    def __init__(self, parent: ttk.Notebook) -> None:
+        self.frame = ttk.Frame(parent)
+        self._stat_labels: dict[str, ttk.Label] = {}
+        self._last_update = 0.0
+
+        self._build_ui()
+
+    # ------------------------------------------------------------------ #
+    # UI
+    # ------------------------------------------------------------------ #
+
+    def _build_ui(self) -> None:
+        pad = {"padx": 8, "pady": 2}
+        frame = self.frame
+        frame.columnconfigure(1, weight=1)
+        frame.rowconfigure(0, weight=1)
+
+        stats_frame = ttk.LabelFrame(frame, text="Fit quality")
+        stats_frame.grid(row=0, column=0, sticky="nsw", padx=8, pady=4)
+        for row, (key, text, _fmt) in enumerate(self._STATS):
+            ttk.Label(stats_frame, text=f"{text}:").grid(row=row, column=0, sticky="w", **pad)
+            label = ttk.Label(stats_frame, text="-", width=10, anchor="e")
+            label.grid(row=row, column=1, sticky="e", **pad)
+            self._stat_labels[key] = label
+
+        plot_frame = ttk.Frame(frame)
+        plot_frame.grid(row=0, column=1, sticky="nsew")
+        plot_frame.columnconfigure(0, weight=1)
+        plot_frame.rowconfigure(0, weight=1)
+
+        self._figure = Figure(figsize=(6, 5), dpi=100)
+        self._ax_residual, self._ax_time, self._ax_nfev = self._figure.subplots(3, 1)
+        self._figure.tight_layout()
+
+        self._canvas = FigureCanvasTkAgg(self._figure, master=plot_frame)
+        self._canvas.get_tk_widget().grid(row=0, column=0, sticky="nsew")
+        self._canvas.draw()
+
+    # ------------------------------------------------------------------ #
+    # Public API
+    # ------------------------------------------------------------------ #
+
+    def update_fit_quality(self, log: FitQualityLog, threshold: float) -> None:
+        """Show `log`; no-op if the last update is less than UPDATE_INTERVAL_S ago."""
+        now = time.monotonic()
+        if now - self._last_update < UPDATE_INTERVAL_S:
+            return
+        self._last_update = now
+
+        self._show_stats(log.summary())
+
+        arrays = log.arrays()
+        accepted = arrays["accepted"]
+        decision_residual = arrays["decision_residual"]
+
+        ax = self._ax_residual
+        ax.cla()
+        edges = _plot_histogram(ax, arrays["residual"], "per fit")
+        if edges is not None:
+            for mask, label in ((accepted, "accepted (avg.)"), (~accepted, "rejected (avg.)")):
+                values = decision_residual[mask]
+                if len(values):
+                    counts, _ = np.histogram(np.clip(values, edges[0], edges[-1]), bins=edges)
+                    ax.stairs(counts, edges, label=label)
+        ax.axvline(threshold, color="k", linestyle="--", label="threshold")
+        ax.set_xlabel("Residual")
+        ax.legend(fontsize="small")
+
+        self._ax_time.cla()
+        _plot_histogram(self._ax_time, arrays["fit_ms"], None)
+        self._ax_time.set_xlabel("Fit time [ms]")
+
+        self._ax_nfev.cla()
+        _plot_histogram(self._ax_nfev, arrays["nfev"], None)
+        self._ax_nfev.set_xlabel("Function evaluations")
+
+        self._figure.tight_layout()
+        self._canvas.draw_idle()
+
+    def _show_stats(self, stats: FitQualityStats) -> None:
+        for key, _text, fmt in self._STATS:
+            self._stat_labels[key].configure(text=fmt.format(getattr(stats, key)))
+
+    def clear(self) -> None:
+        self._last_update = 0.0
+        for label in self._stat_labels.values():
+            label.configure(text="-")
+        for ax in (self._ax_residual, self._ax_time, self._ax_nfev):
+            ax.cla()
+        self._canvas.draw_idle()
+
+
+def _plot_histogram(ax: Axes, values: np.ndarray, label: Optional[str]) -> Optional[np.ndarray]:
+    """Histogram of the finite values; returns the bin edges (None if empty)."""
+    values = values[np.isfinite(values)]
+    if len(values) == 0:
+        return None
+    counts, edges = np.histogram(values, bins=HISTOGRAM_BINS)
+    ax.stairs(counts, edges, fill=True, alpha=0.5, label=label)
+    ax.set_ylabel("Count")
+    return edges
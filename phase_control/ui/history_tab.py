@@ -0,0 +1,161 @@
+# phase_control/ui/history_tab.py
+from __future__ import annotations
+
+import time
+import tkinter as tk
+from tkinter import ttk
+
+import numpy as np
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.figure import Figure
+
+from phase_control.analysis.history import HISTORY_FIELDS, PhaseHistory
+from .display import decimate_minmax
+from .plot_tab import AUTOSCALE_MARGIN, AUTOSCALE_SHRINK
+
+WINDOW_CHOICES_S = ("10", "60", "300", "1800", "3600")
+DEFAULT_WINDOW_S = "60"
+
+_AXES_LABELS = {
+    "phase_rad": "Phase [rad]",
+    "correction_deg": "Correction [deg]",
+    "residual": "Fit residual",
+}
+
+
+class HistoryTab:
+    """
+    Strip chart of measured phase, applied correction and fit residual.
+
+    The x axis is fixed to "seconds before the newest sample"
+    ([-window, 0]), so the axes, ticks and labels are rendered once and
+    cached as a background; an update copies the visible window out of
+    the engine's PhaseHistory (its per-second min/max bins for windows
+    longer than the sample ring holds), decimates it to the axes width
+    and blits the three lines. The y limits are
+    recomputed (one full redraw) only when the data leaves them or
+    shrinks well inside them.
+    """
+
+    def __init__(self, parent: ttk.Notebook) -> None:
+        self.frame = ttk.Frame(parent)
+        self._background = None
+        self.last_render_ms: float = 0.0
+
+        self._window_var = tk.StringVar(value=DEFAULT_WINDOW_S)
+
+        self._build_ui()
+
+    # ------------------------------------------------------------------ #
+    # UI
+    # ------------------------------------------------------------------ #
+
+    def _build_ui(self) -> None:
+        pad = {"padx": 8, "pady": 4}
+        frame = self.frame
+        frame.columnconfigure(0, weight=1)
+        frame.rowconfigure(1, weight=1)
+
+        options_frame = ttk.LabelFrame(frame, text="History options")
+        options_frame.grid(row=0, column=0, sticky="ew", **pad)
+
+        ttk.Label(options_frame, text="Window [s]:").grid(row=0, column=0, sticky="w", **pad)
+        selector = ttk.Combobox(
+            options_frame,
+            textvariable=self._window_var,
+            values=WINDOW_CHOICES_S,
+            width=8,
+        )
+        selector.grid(row=0, column=1, sticky="w", **pad)
+        selector.bind("<<ComboboxSelected>>", self._on_window_changed)
+        selector.bind("<Return>", self._on_window_changed)
+
+        plot_frame = ttk.Frame(frame)
+        plot_frame.grid(row=1, column=0, sticky="nsew")
+        plot_frame.columnconfigure(0, weight=1)
+        plot_frame.rowconfigure(0, weight=1)
+
+        self._figure = Figure(figsize=(6, 5), dpi=100)
+        axes = self._figure.subplots(len(HISTORY_FIELDS), 1, sharex=True)
+        self._axes = list(axes)
+        self._lines = []
+        for ax, name in zip(self._axes, HISTORY_FIELDS):
+            (line,) = ax.plot([], [], animated=True)
+            ax.set_ylabel(_AXES_LABELS[name])
+            ax.grid(True)
+            self._lines.append(line)
+        self._axes[-1].set_xlabel("Time [s]")
+        self._axes[-1].set_xlim(-self._window_s, 0.0)
+
+        self._canvas = FigureCanvasTkAgg(self._figure, master=plot_frame)
+        self._canvas.get_tk_widget().grid(row=0, column=0, sticky="nsew")
+        self._canvas.mpl_connect("draw_event", self._on_draw)
+        self._canvas.draw()
+
+    @property
+    def _window_s(self) -> float:
+        try:
+            return max(1.0, float(self._window_var.get()))
+        except ValueError:
+            return float(DEFAULT_WINDOW_S)
+
+    def _on_window_changed(self, _event: object = None) -> None:
+        self._axes[-1].set_xlim(-self._window_s, 0.0)
+        self._canvas.draw_idle()
+
+    # ------------------------------------------------------------------ #
+    # Blitting
+    # ------------------------------------------------------------------ #
+
+    def _on_draw(self, _event: object) -> None:
+        self._background = self._canvas.copy_from_bbox(self._figure.bbox)
+        self._draw_lines()
+
+    def _draw_lines(self) -> None:
+        for ax, line in zip(self._axes, self._lines):
+            ax.draw_artist(line)
+
+    def _limits_changed(self) -> bool:
+        changed = False
+        for ax, line in zip(self._axes, self._lines):
+            y = np.asarray(line.get_ydata(), dtype=np.float64)
+            y = y[np.isfinite(y)]
+            if len(y) == 0:
+                continue
+            lo, hi = y.min(), y.max()
+            cur_lo, cur_hi = ax.get_ylim()
+            span = hi - lo
+            if lo < cur_lo or hi > cur_hi or span < AUTOSCALE_SHRINK * (cur_hi - cur_lo):
+                pad = AUTOSCALE_MARGIN * span if span > 0 else 0.5
+                ax.set_ylim(lo - pad, hi + pad)
+                changed = True
+        return changed
+
+    # ------------------------------------------------------------------ #
+    # Public API
+    # ------------------------------------------------------------------ #
+
+    def update_history(self, history: PhaseHistory) -> None:
+        """Show the last window of `history`, newest sample at t = 0."""
+        t_ns, values = history.window(self._window_s)
+        if len(t_ns) == 0:
+            return
+
+        t0 = time.perf_counter()
+        t_s = (t_ns - t_ns[-1]) * 1e-9
+        buckets = int(self._axes[0].bbox.width)
+        for line, y in zip(self._lines, values):
+            line.set_data(*decimate_minmax(t_s, y, buckets))
+
+        if self._limits_changed() or self._background is None:
+            self._canvas.draw()  # new background via _on_draw()
+        else:
+            self._canvas.restore_region(self._background)
+            self._draw_lines()
+            self._canvas.blit(self._figure.bbox)
+        self.last_render_ms = (time.perf_counter() - t0) * 1e3
+
+    def clear(self) -> None:
+        for line in self._lines:
+            line.set_data([], [])
+        self._canvas.draw_idle()
@@ -2,33 +2,63 @@
 from __future__ import annotations
 
 import threading
+import time
 import tkinter as tk
 from tkinter import ttk
+from typing import Callable, Mapping, Optional
 
-from phase_control.analysis.config import AnalysisConfig
 from phase_control.analysis.run_analysis import AnalysisEngine, AnalysisPlotResult
+from phase_control.analysis.controller import LockController
 from .config_tab import ConfigTab
+from .display import DEFAULT_FPS, LatestResult
+from .fit_quality_tab import FitQualityTab
+from .history_tab import HistoryTab
+from .waterfall_tab import WaterfallBuffer, WaterfallTab
 from .plot_tab import PlotTab
+from .status_tab import StatusTab
+
+# how often a Run/Reset in the background is checked for completion
+BUSY_POLL_MS = 50
 
 
 class MainWindow:
     """
     Main x64 UI:
 
-    - Top-level "Run" and "Reset" buttons.
+    - Top-level "Run" and "Reset" buttons, plus "Capture dark" /
+      "Capture reference" if capture callbacks are given.
+    - With several spectrometers (one AnalysisEngine each), a device
+      selector: all engines run, the tabs show the selected device.
     - Tab "Plotting" with embedded plot.
+    - Tab "Phase history" with a strip chart of phase, correction and
+      fit residual.
+    - Tab "Waterfall" with the last cut spectra as an image.
+    - Tab "Fit quality" with fit rates, acceptance and histograms.
     - Tab "Config parameters" with AnalysisConfig fields.
+    - Tab "Status" with per-stage timings of the analysis step and the
+      display counters.
+
+    The engines run in the analysis thread of a LockController (shared
+    with the headless service) as fast as frames arrive; each result goes
+    into a LatestResult slot. A Tk .after loop renders
+    the newest result of the selected device at most `fps` times per
+    second, results replaced in between are counted as skipped.
+
+    Run and Reset wait for an analysis step that is still in progress (a
+    rotate can take seconds); they do that in a background thread, polled
+    with .after, while both buttons and the FitParameter entries are
+    disabled, so the window stays responsive.
 
     Behaviour:
       - Run:
-          * stops any running loop
-          * applies FitParameter fields from UI -> config
-          * resets the AnalysisEngine
-          * starts Tk .after loop
+          * stops any running loop and the worker
+          * applies FitParameter fields from UI -> config (selected device)
+          * resets all AnalysisEngines
+          * starts the worker and the Tk .after render loop
           * disables FitParameter entries and Run button, enables Reset.
       - Reset:
-          * stops loop
-          * resets AnalysisEngine
+          * stops loop and worker
+          * resets all AnalysisEngines
           * clears plot
           * refreshes FitParameter fields from config
           * re-enables FitParameter entries and Run button.
@@ -36,13 +66,25 @@ class MainWindow:
 
     def __init__(
         self,
-        config: AnalysisConfig,
-        engine: AnalysisEngine,
+        engines: Mapping[int, AnalysisEngine],
         stop_event: threading.Event,
+        on_capture_dark: Optional[Callable[[int], object]] = None,
+        on_capture_reference: Optional[Callable[[int], object]] = None,
+        fps: float = DEFAULT_FPS,
     ) -> None:
-        self._config = config
-        self._engine = engine
+        if not engines:
+            raise ValueError("MainWindow needs at least one AnalysisEngine.")
+
+        # One engine per spectrometer (device_index -> engine)
+        self._engines = dict(engines)
+        self._device = next(iter(self._engines))
         self._stop_event = stop_event
+        self._frame_interval_ms = max(1, int(round(1000.0 / fps)))
+
+        # Analysis thread -> newest result per device -> render loop
+        self._results = LatestResult()
+        self._waterfalls = {device: WaterfallBuffer() for device in self._engines}
+        self._controller = LockController(self._engines, on_result=self._publish)
 
         self._root = tk.Tk()
         self._root.title("Phase control – Live analysis")
@@ -66,22 +108,88 @@ class MainWindow:
         )
         self._reset_button.pack(side="left", padx=4, pady=4)
 
+        # Device selector (only with several spectrometers)
+        self._device_var = tk.StringVar(value=str(self._device))
+        if len(self._engines) > 1:
+            ttk.Label(control_frame, text="Spectrometer:").pack(side="left", padx=(12, 2))
+            selector = ttk.Combobox(
+                control_frame,
+                textvariable=self._device_var,
+                values=[str(i) for i in self._engines],
+                state="readonly",
+                width=4,
+            )
+            selector.pack(side="left", padx=2, pady=4)
+            selector.bind("<<ComboboxSelected>>", self._on_device_selected)
+
+        # Dark / reference captures (take a few seconds -> worker thread)
+        for text, action in (
+            ("Capture dark", on_capture_dark),
+            ("Capture reference", on_capture_reference),
+        ):
+            if action is not None:
+                ttk.Button(
+                    control_frame,
+                    text=text,
+                    command=lambda a=action, t=text: self._run_capture(t, a, self._device),
+                ).pack(side="left", padx=4, pady=4)
+
         # Notebook with tabs
         self._notebook = ttk.Notebook(self._root)
         self._notebook.pack(fill="both", expand=True)
 
-        self._config_tab = ConfigTab(self._notebook, config=self._config)
+        self._config_tab = ConfigTab(self._notebook, config=self._engine.config)
         self._plot_tab = PlotTab(self._notebook)
+        self._history_tab = HistoryTab(self._notebook)
+        self._waterfall_tab = WaterfallTab(self._notebook, self._waterfalls[self._device])
+        self._fit_quality_tab = FitQualityTab(self._notebook)
+        self._status_tab = StatusTab(self._notebook)
 
         self._notebook.add(self._plot_tab.frame, text="Plotting")
+        self._notebook.add(self._history_tab.frame, text="Phase history")
+        self._notebook.add(self._waterfall_tab.frame, text="Waterfall")
+        self._notebook.add(self._fit_quality_tab.frame, text="Fit quality")
         self._notebook.add(self._config_tab.frame, text="Config parameters")
+        self._notebook.add(self._status_tab.frame, text="Status")
 
-        # Analysis loop state
+        # Render loop state
         self._running: bool = False
         self._after_id: str | None = None
+        # pending .after poll of a Run/Reset in the background
+        self._busy_after_id: str | None = None
 
         self._root.protocol("WM_DELETE_WINDOW", self._on_close)
 
+    # ------------------------------------------------------------------ #
+    # Devices
+    # ------------------------------------------------------------------ #
+
+    @property
+    def _engine(self) -> AnalysisEngine:
+        """Engine of the selected spectrometer."""
+        return self._engines[self._device]
+
+    def _on_device_selected(self, _event: object = None) -> None:
+        device = int(self._device_var.get())
+        if device == self._device:
+            return
+        self._device = device
+
+        # Rebind the config tab to the selected engine's config
+        old_tab = self._config_tab
+        self._config_tab = ConfigTab(self._notebook, config=self._engine.config)
+        self._notebook.insert(old_tab.frame, self._config_tab.frame, text="Config parameters")
+        self._notebook.forget(old_tab.frame)
+        old_tab.frame.destroy()
+        self._config_tab.set_running(self._running or self._busy_after_id is not None)
+
+        self._plot_tab.clear()
+        self._history_tab.clear()
+        self._waterfall_tab.set_buffer(self._waterfalls[device])
+        self._fit_quality_tab.clear()
+        self._status_tab.clear()
+        self._results.take(device)  # render from the next result on
+
     # ------------------------------------------------------------------ #
     # Analysis control
     # ------------------------------------------------------------------ #
@@ -93,43 +201,106 @@ class MainWindow:
         self._run_button.configure(state="disabled" if running else "normal")
         self._reset_button.configure(state="normal" if running else "disabled")
 
+    def _set_busy(self) -> None:
+        """Run/Reset in progress: nothing can be pressed or edited."""
+        self._config_tab.set_running(True)
+        self._run_button.configure(state="disabled")
+        self._reset_button.configure(state="disabled")
+
+    def _run_in_background(
+        self,
+        name: str,
+        action: Callable[[], None],
+        on_done: Callable[[Optional[BaseException]], None],
+    ) -> None:
+        """
+        Run `action` in a worker thread and call on_done(error) in the Tk
+        thread once it has finished (error None on success).
+        """
+        errors: list[BaseException] = []
+
+        def worker() -> None:
+            try:
+                action()
+            except BaseException as exc:
+                errors.append(exc)
+
+        thread = threading.Thread(target=worker, name=name, daemon=True)
+        thread.start()
+
+        def poll() -> None:
+            if thread.is_alive():
+                self._busy_after_id = self._root.after(BUSY_POLL_MS, poll)
+                return
+            self._busy_after_id = None
+            on_done(errors[0] if errors else None)
+
+        self._set_busy()
+        poll()
+
     def _on_run_clicked(self) -> None:
         """
         Called when the Run button is pressed.
 
         - stop any running loop
         - push FitParameter UI values -> shared config
-        - reset engine
-        - start Tk .after loop
+        - in the background: reset engine, start the analysis worker
+        - then start the Tk .after render loop
         """
         self._stop_loop_only()
 
         # Update FitParameter values from UI into config
         self._config_tab.apply_fit_parameters()
-        # Engine reset: new PhaseTracker etc. using current config
-        self._engine.reset()
+        self._results.clear()
+
+        def done(error: Optional[BaseException]) -> None:
+            if error is not None:
+                print(f"Cannot start the analysis: {error}")
+                self._set_running(False)
+                return
+            self._set_running(True)
+            self._schedule_next_render(delay_ms=0)
 
-        self._set_running(True)
-        self._schedule_next_step(delay_ms=0)
+        # Engine reset (new PhaseTracker etc. using current config), then
+        # the analysis thread
+        self._run_in_background("AnalysisStart", self._controller.start, done)
 
     def _on_reset_clicked(self) -> None:
         """
         Stop the analysis and reset everything:
 
-        - stop loop
-        - reset engine (internal state)
-        - clear plot
-        - refresh FitParameter fields from current config
-        - re-enable editing of FitParameter fields
+        - stop loop and analysis worker
+        - in the background: reset engine (internal state)
+        - then clear plot, refresh FitParameter fields from current config
+          and re-enable editing of FitParameter fields
         """
         self._stop_loop_only()
-        self._engine.reset()
+        self._run_in_background("AnalysisReset", self._controller.reset, self._on_reset_done)
+
+    def _on_reset_done(self, error: Optional[BaseException]) -> None:
+        if error is not None:
+            # only Reset can be pressed again
+            print(f"Cannot reset the analysis: {error}")
+            self._reset_button.configure(state="normal")
+            return
+        self._results.clear()
+        for waterfall in self._waterfalls.values():
+            waterfall.clear()
         self._plot_tab.clear()
-        self._config_tab.refresh_from_config()
+        self._history_tab.clear()
+        self._waterfall_tab.clear()
+        self._fit_quality_tab.clear()
+        self._status_tab.clear()
+        self._config_tab.refresh_from_config(force=True)
         self._set_running(False)
 
     def _stop_loop_only(self) -> None:
-        """Stop the Tk .after loop without touching config/engine."""
+        """
+        Stop the worker and the Tk .after loop without touching
+        config/engine. Does not wait for a step in progress (start() and
+        reset() do).
+        """
+        self._controller.stop(timeout=0)
         if not self._running and self._after_id is None:
             return
         if self._after_id is not None:
@@ -140,36 +311,77 @@ class MainWindow:
         self._after_id = None
         self._running = False  # UI state is updated by _set_running()
 
-    def _schedule_next_step(self, delay_ms: int = 20) -> None:
+    def _schedule_next_render(self, delay_ms: int) -> None:
         if not self._running:
             return
-        self._after_id = self._root.after(delay_ms, self._step_once)
+        self._after_id = self._root.after(delay_ms, self._render_once)
 
-    def _step_once(self) -> None:
+    def _render_once(self) -> None:
         if not self._running:
             return
+        t0 = time.perf_counter()
 
-        result = self._engine.step()
-        if result is None:
-            # no data yet -> try again a bit later
-            self._schedule_next_step(delay_ms=50)
+        if not self._controller.is_running:
+            # analysis thread ended with an exception (printed there)
+            self._stop_loop_only()
+            self._set_running(False)
             return
 
-        # Update plot
-        self._plot_tab.update_plot(result)
-
-        # Config may have been updated by PhaseTracker (same instance),
-        # so mirror that back into the FitParameter fields in the UI.
-        self._config_tab.refresh_from_config()
+        result = self._results.take(self._device)
+        if result is not None:
+            # Update plot and stage timings
+            self._plot_tab.update_plot(result)
+            render_ms = self._plot_tab.last_render_ms
+
+            # history, waterfall and fit-quality buffers fill in the analysis thread;
+            # they are only drawn while their tab is shown
+            selected = self._notebook.select()
+            if selected == str(self._history_tab.frame):
+                self._history_tab.update_history(self._engine.history)
+                render_ms += self._history_tab.last_render_ms
+            elif selected == str(self._waterfall_tab.frame):
+                self._waterfall_tab.update_waterfall()
+                render_ms += self._waterfall_tab.last_render_ms
+            elif selected == str(self._fit_quality_tab.frame):
+                self._fit_quality_tab.update_fit_quality(
+                    self._engine.fit_quality, self._engine.config.residuals_threshold
+                )
+            self._results.record_render(self._device, render_ms)
+            self._status_tab.update_timings(result.timings)
+
+            # Config may have been updated by PhaseTracker (same instance),
+            # so mirror that back into the FitParameter fields in the UI.
+            self._config_tab.refresh_from_config()
+
+        self._status_tab.update_display(self._results.stats(self._device))
+
+        # Next frame, keeping the cap independent of the render cost
+        elapsed_ms = int((time.perf_counter() - t0) * 1e3)
+        self._schedule_next_render(max(1, self._frame_interval_ms - elapsed_ms))
+
+    def _publish(self, device: int, result: AnalysisPlotResult) -> None:
+        """Analysis thread: keep every spectrum for the waterfall, the newest for rendering."""
+        self._waterfalls[device].push(result)
+        self._results.put(device, result)
+
+    def _run_capture(self, name: str, action: Callable[[int], object], device: int) -> None:
+        def worker() -> None:
+            try:
+                key = action(device)
+                print(f"{name}: stored for {key}")
+            except Exception as exc:
+                print(f"{name} failed: {exc}")
 
-        # Next step
-        self._schedule_next_step(delay_ms=20)
+        threading.Thread(target=worker, name="CalibrationCapture", daemon=True).start()
 
     # ------------------------------------------------------------------ #
     # Lifecycle
     # ------------------------------------------------------------------ #
 
     def _on_close(self) -> None:
+        if self._busy_after_id is not None:
+            self._root.after_cancel(self._busy_after_id)
+            self._busy_after_id = None
         self._stop_loop_only()
         self._set_running(False)
         self._stop_event.set()
@@ -180,9 +392,17 @@ class MainWindow:
 
 
 def run_main_window(
-    config: AnalysisConfig,
-    engine: AnalysisEngine,
+    engines: Mapping[int, AnalysisEngine],
     stop_event: threading.Event,
+    on_capture_dark: Optional[Callable[[int], object]] = None,
+    on_capture_reference: Optional[Callable[[int], object]] = None,
+    fps: float = DEFAULT_FPS,
 ) -> None:
-    ui = MainWindow(config=config, engine=engine, stop_event=stop_event)
+    ui = MainWindow(
+        engines=engines,
+        stop_event=stop_event,
+        on_capture_dark=on_capture_dark,
+        on_capture_reference=on_capture_reference,
+        fps=fps,
+    )
     ui.run()
@@ -1,13 +1,23 @@
 # phase_control/ui/plot_tab.py
 from __future__ import annotations
 
+import time
 import tkinter as tk
 from tkinter import ttk
 
+import numpy as np
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
 
 from phase_control.analysis.run_analysis import AnalysisPlotResult
+from .display import decimate_minmax
+
+# Blit mode: padding added around the data when the limits are recomputed,
+# as a fraction of the data span
+AUTOSCALE_MARGIN = 0.1
+# ... and the limits are also recomputed when the data span shrinks below
+# this fraction of the current limits
+AUTOSCALE_SHRINK = 0.5
 
 
 class PlotTab:
@@ -18,10 +28,33 @@ class PlotTab:
     It only exposes:
       - update_plot(result) to draw new data
       - clear() to reset the plot
+
+    With blit=True (default) the axes, ticks, grid and legend are rendered
+    once and cached as a background. The fit and zero-phase lines change
+    only when the tracked phase or the config does; they are drawn into a
+    second cached background whenever their data changes, so a typical
+    update restores that background and redraws only the current
+    spectrum (on top of the fit lines). Lines are redrawn only if their data changed; an update
+    without changes draws nothing. The limits are recomputed (one full
+    redraw) only when the data leaves them or shrinks well inside them.
+    last_render_ms holds the cost of the last update.
+
+    With decimate=True, traces with more points than twice the axes width
+    in pixels are reduced to a min/max pair per pixel column.
     """
 
-    def __init__(self, parent: ttk.Notebook) -> None:
+    def __init__(
+        self,
+        parent: ttk.Notebook,
+        blit: bool = True,
+        decimate: bool = True,
+    ) -> None:
         self.frame = ttk.Frame(parent)
+        self._blit = blit
+        self._decimate = decimate
+        self._background = None          # axes only
+        self._static_background = None   # axes + fit and zero-phase lines
+        self.last_render_ms: float = 0.0
 
         # Tk state
         self._show_current_var = tk.BooleanVar(value=True)
@@ -84,10 +117,23 @@ class PlotTab:
         self._ax.grid(True)
         self._ax.legend()
 
+        self._lines = (self._line_current, self._line_fit, self._line_zero)
+        # lines whose data rarely changes, kept in the static background
+        self._static_lines = (self._line_fit, self._line_zero)
+        # data extent (x_lo, x_hi, y_lo, y_hi) per line, updated with its data
+        self._extents: dict[object, tuple[float, float, float, float]] = {}
+        if self._blit:
+            # animated artists are skipped by full draws and drawn by _blit_lines()
+            for line in self._lines:
+                line.set_animated(True)
+
         self._canvas = FigureCanvasTkAgg(self._figure, master=plot_frame)
         self._canvas_widget = self._canvas.get_tk_widget()
         self._canvas_widget.grid(row=0, column=0, sticky="nsew")
 
+        if self._blit:
+            self._canvas.mpl_connect("draw_event", self._on_draw)
+
         self._update_visibility()
         self._canvas.draw()
 
@@ -97,30 +143,124 @@ class PlotTab:
         self._line_zero.set_visible(self._show_zero_var.get())
         self._canvas.draw_idle()
 
+    # ------------------------------------------------------------------ #
+    # Blitting
+    # ------------------------------------------------------------------ #
+
+    def _on_draw(self, _event: object) -> None:
+        """After every full draw (resize, limits, visibility): cache the backgrounds."""
+        self._background = self._canvas.copy_from_bbox(self._ax.bbox)
+        self._cache_static_lines()
+        self._draw_line(self._line_current)
+
+    def _draw_line(self, line) -> None:
+        if line.get_visible():
+            self._ax.draw_artist(line)
+
+    def _cache_static_lines(self) -> None:
+        """Draw the static lines onto the axes background and cache the result."""
+        self._canvas.restore_region(self._background)
+        for line in self._static_lines:
+            self._draw_line(line)
+        self._static_background = self._canvas.copy_from_bbox(self._ax.bbox)
+
+    def _blit_lines(self, static_changed: bool) -> None:
+        if self._background is None:
+            self._canvas.draw_idle()
+            return
+        if static_changed or self._static_background is None:
+            self._cache_static_lines()
+        else:
+            self._canvas.restore_region(self._static_background)
+        self._draw_line(self._line_current)
+        self._canvas.blit(self._ax.bbox)
+
+    def _set_data(self, line, x: np.ndarray, y: np.ndarray) -> bool:
+        """Set the (decimated) data of `line`; False if it is unchanged."""
+        x, y = self._reduce(x, y)
+        old_x, old_y = line.get_data()
+        if np.array_equal(old_x, x) and np.array_equal(old_y, y):
+            return False
+        line.set_data(x, y)
+        if len(x):
+            self._extents[line] = (np.min(x), np.max(x), np.nanmin(y), np.nanmax(y))
+        else:
+            self._extents.pop(line, None)
+        return True
+
+    def _limits_changed(self) -> bool:
+        """
+        Recompute the axis limits if the visible data left them or
+        occupies only a small part of them. Returns True if they changed.
+        """
+        x_lo = y_lo = np.inf
+        x_hi = y_hi = -np.inf
+        for line in self._lines:
+            extent = self._extents.get(line)
+            if extent is None or not line.get_visible():
+                continue
+            x_lo, x_hi = min(x_lo, extent[0]), max(x_hi, extent[1])
+            y_lo, y_hi = min(y_lo, extent[2]), max(y_hi, extent[3])
+
+        if not np.isfinite([x_lo, x_hi, y_lo, y_hi]).all():
+            return False
+
+        changed = False
+        for (lo, hi), get_lim, set_lim in (
+            ((x_lo, x_hi), self._ax.get_xlim, self._ax.set_xlim),
+            ((y_lo, y_hi), self._ax.get_ylim, self._ax.set_ylim),
+        ):
+            cur_lo, cur_hi = get_lim()
+            span = hi - lo
+            outside = lo < cur_lo or hi > cur_hi
+            too_small = span < AUTOSCALE_SHRINK * (cur_hi - cur_lo)
+            if outside or too_small:
+                pad = AUTOSCALE_MARGIN * span if span > 0 else 0.5
+                set_lim(lo - pad, hi + pad)
+                changed = True
+        return changed
+
+    def _reduce(self, x: np.ndarray, y: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Min/max decimation to the axes width in pixels."""
+        if not self._decimate:
+            return x, y
+        return decimate_minmax(x, y, int(self._ax.bbox.width))
+
     # ------------------------------------------------------------------ #
     # Public API
     # ------------------------------------------------------------------ #
 
     def update_plot(self, result: AnalysisPlotResult) -> None:
         """Update the lines according to the given AnalysisPlotResult."""
+        t0 = time.perf_counter()
         x = result.x
 
+        current_changed = static_changed = False
         if self._show_current_var.get():
-            self._line_current.set_data(x, result.y_current)
+            current_changed = self._set_data(self._line_current, x, result.y_current)
         if self._show_fit_var.get() and result.y_fit is not None:
-            self._line_fit.set_data(x, result.y_fit)
+            static_changed |= self._set_data(self._line_fit, x, result.y_fit)
         if self._show_zero_var.get() and result.y_zero_phase is not None:
-            self._line_zero.set_data(x, result.y_zero_phase)
+            static_changed |= self._set_data(self._line_zero, x, result.y_zero_phase)
 
-        self._ax.relim()
-        self._ax.autoscale_view()
-        self._canvas.draw_idle()
+        if not self._blit:
+            self._ax.relim()
+            self._ax.autoscale_view()
+            self._canvas.draw_idle()
+        elif not (current_changed or static_changed):
+            pass
+        elif self._limits_changed():
+            self._canvas.draw()  # new backgrounds via _on_draw()
+        else:
+            self._blit_lines(static_changed)
+        self.last_render_ms = (time.perf_counter() - t0) * 1e3
 
     def clear(self) -> None:
         """Clear all plotted data."""
         self._line_current.set_data([], [])
         self._line_fit.set_data([], [])
         self._line_zero.set_data([], [])
+        self._extents.clear()
         self._ax.relim()
         self._ax.autoscale_view()
         self._canvas.draw_idle()
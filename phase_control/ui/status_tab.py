@@ -0,0 +1,102 @@
+# phase_control/ui/status_tab.py
+from __future__ import annotations
+
+from tkinter import ttk
+from typing import Optional
+
+from phase_control.analysis.timing import StageStats
+from .display import DisplayStats
+
+
+class StatusTab:
+    """
+    Status tab showing where the time of each analysis step goes.
+
+    One row per AnalysisEngine stage (buffer, cut, tracker, model,
+    correction, rotate, total) with last / mean / p50 / p95 / max in ms.
+    Rows are created once and only their values are updated.
+
+    Below, the display counters: results published by the analysis,
+    rendered, skipped (replaced before the next render), the display
+    frame rate and the cost of the last render.
+    """
+
+    _COLUMNS = ("last", "mean", "p50", "p95", "max", "count")
+
+    def __init__(self, parent: ttk.Notebook) -> None:
+        self.frame = ttk.Frame(parent)
+        self._rows: dict[str, str] = {}
+
+        self._build_ui()
+
+    # ------------------------------------------------------------------ #
+    # UI
+    # ------------------------------------------------------------------ #
+
+    def _build_ui(self) -> None:
+        pad = {"padx": 8, "pady": 4}
+        frame = self.frame
+        frame.columnconfigure(0, weight=1)
+        frame.rowconfigure(0, weight=1)
+
+        timing_frame = ttk.LabelFrame(frame, text="Stage timings [ms]")
+        timing_frame.grid(row=0, column=0, sticky="nsew", **pad)
+        timing_frame.columnconfigure(0, weight=1)
+        timing_frame.rowconfigure(0, weight=1)
+
+        self._tree = ttk.Treeview(
+            timing_frame,
+            columns=self._COLUMNS,
+            show="tree headings",
+            height=8,
+        )
+        self._tree.heading("#0", text="Stage")
+        self._tree.column("#0", width=120, anchor="w")
+        for col in self._COLUMNS:
+            self._tree.heading(col, text=col)
+            self._tree.column(col, width=80, anchor="e")
+        self._tree.grid(row=0, column=0, sticky="nsew", **pad)
+
+        display_frame = ttk.LabelFrame(frame, text="Display")
+        display_frame.grid(row=1, column=0, sticky="ew", **pad)
+        self._display_label = ttk.Label(display_frame, text="-")
+        self._display_label.grid(row=0, column=0, sticky="w", **pad)
+
+    # ------------------------------------------------------------------ #
+    # Public API
+    # ------------------------------------------------------------------ #
+
+    def update_timings(self, timings: Optional[dict[str, StageStats]]) -> None:
+        """Show the given stage stats (None = timing disabled, nothing to do)."""
+        if not timings:
+            return
+
+        for stage, stats in timings.items():
+            values = (
+                f"{stats.last_ms:.3f}",
+                f"{stats.mean_ms:.3f}",
+                f"{stats.p50_ms:.3f}",
+                f"{stats.p95_ms:.3f}",
+                f"{stats.max_ms:.3f}",
+                str(stats.count),
+            )
+            row = self._rows.get(stage)
+            if row is None:
+                self._rows[stage] = self._tree.insert("", "end", text=stage, values=values)
+            else:
+                self._tree.item(row, values=values)
+
+    def update_display(self, stats: DisplayStats) -> None:
+        self._display_label.configure(
+            text=(
+                f"published {stats.published}   rendered {stats.rendered}   "
+                f"skipped {stats.skipped}   {stats.fps:.1f} fps   "
+                f"render {stats.last_render_ms:.2f} ms"
+            )
+        )
+
+    def clear(self) -> None:
+        self._display_label.configure(text="-")
+        for row in self._rows.values():
+            self._tree.delete(row)
+        self._rows.clear()
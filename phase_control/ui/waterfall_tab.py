@@ -0,0 +1,226 @@
+# phase_control/ui/waterfall_tab.py
+from __future__ import annotations
+
+import threading
+import time
+import tkinter as tk
+from tkinter import ttk
+from typing import Optional
+
+import numpy as np
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.figure import Figure
+
+from phase_control.analysis.run_analysis import AnalysisPlotResult
+
+DEFAULT_ROWS = 256
+
+
+class WaterfallBuffer:
+    """
+    Last `rows` cut spectra as a preallocated (2 * rows, width) float32
+    array. Each spectrum overwrites row i and its copy i + rows, so the
+    newest `rows` spectra are always the contiguous block
+    [next, next + rows), oldest first; rows not written yet are NaN.
+
+    push() runs in the analysis thread (every result, not only the
+    rendered ones), snapshot() in the Tk thread. A spectrum with a
+    different pixel axis (ROI or wavelength range changed) restarts the
+    buffer.
+
+    The running min/max of the pushed rows is kept for the colour limits.
+    """
+
+    def __init__(self, rows: int = DEFAULT_ROWS) -> None:
+        self.rows = rows
+        self._lock = threading.Lock()
+        self._data: Optional[np.ndarray] = None
+        self._x: Optional[np.ndarray] = None
+        self._next = 0
+        self.version = 0       # incremented on every push
+        self.axis_version = 0  # incremented when the pixel axis changes
+        self.low = np.inf
+        self.high = -np.inf
+
+    def push(self, result: AnalysisPlotResult) -> None:
+        x = np.asarray(result.x)
+        y = np.asarray(result.y_current, dtype=np.float32)
+        with self._lock:
+            if self._data is None or self._data.shape[1] != len(y) or not np.array_equal(self._x, x):
+                self._data = np.full((2 * self.rows, len(y)), np.nan, dtype=np.float32)
+                self._x = x.copy()
+                self._next = 0
+                self.low, self.high = np.inf, -np.inf
+                self.axis_version += 1
+
+            i = self._next
+            self._data[i] = self._data[i + self.rows] = y
+            self._next = (i + 1) % self.rows
+            self.version += 1
+
+            if len(y):
+                self.low = min(self.low, float(np.nanmin(y)))
+                self.high = max(self.high, float(np.nanmax(y)))
+
+    def snapshot(self) -> Optional[tuple[np.ndarray, np.ndarray]]:
+        """(x, rows x width image, oldest row first) or None if empty."""
+        with self._lock:
+            if self._data is None or self._x is None:
+                return None
+            return self._x, self._data[self._next:self._next + self.rows].copy()
+
+    def reset_limits(self, image: np.ndarray) -> None:
+        """Recompute the running min/max from the rows currently shown."""
+        with self._lock:
+            if np.isfinite(image).any():
+                self.low = float(np.nanmin(image))
+                self.high = float(np.nanmax(image))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data = None
+            self._x = None
+            self._next = 0
+            self.low, self.high = np.inf, -np.inf
+            self.axis_version += 1
+
+
+class WaterfallTab:
+    """
+    Waterfall (spectra x wavelength image) of the last N cut spectra,
+    newest on top.
+
+    The image is created once; an update only passes the rolled view of
+    the WaterfallBuffer to AxesImage.set_data() and blits the axes over
+    a cached background. The colour limits are widened as soon as a
+    spectrum leaves them and narrowed only once per full turnover of
+    the buffer, so the usual frame costs no extra min/max over the image.
+    """
+
+    def __init__(self, parent: ttk.Notebook, buffer: WaterfallBuffer) -> None:
+        self.frame = ttk.Frame(parent)
+        self._buffer = buffer
+        self._background = None
+        self._shown_version = -1
+        self._shown_axis = -1
+        self._rows_since_limits = 0
+        self.last_render_ms: float = 0.0
+
+        self._auto_limits_var = tk.BooleanVar(value=True)
+
+        self._build_ui()
+
+    # ------------------------------------------------------------------ #
+    # UI
+    # ------------------------------------------------------------------ #
+
+    def _build_ui(self) -> None:
+        pad = {"padx": 8, "pady": 4}
+        frame = self.frame
+        frame.columnconfigure(0, weight=1)
+        frame.rowconfigure(1, weight=1)
+
+        options_frame = ttk.LabelFrame(frame, text="Waterfall options")
+        options_frame.grid(row=0, column=0, sticky="ew", **pad)
+        ttk.Checkbutton(
+            options_frame,
+            text="Automatic colour limits",
+            variable=self._auto_limits_var,
+        ).grid(row=0, column=0, sticky="w", **pad)
+
+        plot_frame = ttk.Frame(frame)
+        plot_frame.grid(row=1, column=0, sticky="nsew")
+        plot_frame.columnconfigure(0, weight=1)
+        plot_frame.rowconfigure(0, weight=1)
+
+        rows = self._buffer.rows
+        self._figure = Figure(figsize=(6, 4), dpi=100)
+        self._ax = self._figure.add_subplot(111)
+        self._image = self._ax.imshow(
+            np.full((rows, 2), np.nan, dtype=np.float32),
+            aspect="auto",
+            origin="lower",
+            interpolation="nearest",
+            extent=(0.0, 1.0, -rows, 0),
+            animated=True,
+        )
+        self._ax.set_xlabel("Wavelength [nm]")
+        self._ax.set_ylabel("Spectra before newest")
+
+        self._canvas = FigureCanvasTkAgg(self._figure, master=plot_frame)
+        self._canvas.get_tk_widget().grid(row=0, column=0, sticky="nsew")
+        self._canvas.mpl_connect("draw_event", self._on_draw)
+        self._canvas.draw()
+
+    # ------------------------------------------------------------------ #
+    # Blitting
+    # ------------------------------------------------------------------ #
+
+    def _on_draw(self, _event: object) -> None:
+        self._background = self._canvas.copy_from_bbox(self._ax.bbox)
+        self._ax.draw_artist(self._image)
+
+    def _update_limits(self, image: np.ndarray, new_rows: int) -> None:
+        """Lazy colour limits: widen immediately, narrow once per turnover."""
+        if not self._auto_limits_var.get():
+            return
+
+        self._rows_since_limits += new_rows
+        if self._rows_since_limits >= self._buffer.rows:
+            self._rows_since_limits = 0
+            self._buffer.reset_limits(image)
+
+        low, high = self._buffer.low, self._buffer.high
+        if not (np.isfinite(low) and np.isfinite(high)):
+            return
+        if high <= low:
+            high = low + 1.0
+        if (low, high) != self._image.get_clim():
+            self._image.set_clim(low, high)
+
+    # ------------------------------------------------------------------ #
+    # Public API
+    # ------------------------------------------------------------------ #
+
+    def update_waterfall(self) -> None:
+        """Show the buffer if new spectra arrived since the last call."""
+        version = self._buffer.version
+        if version == self._shown_version:
+            return
+        snapshot = self._buffer.snapshot()
+        if snapshot is None:
+            return
+        x, image = snapshot
+
+        t0 = time.perf_counter()
+        new_rows = version - self._shown_version if self._shown_version >= 0 else len(image)
+        self._shown_version = version
+
+        self._image.set_data(image)
+        self._update_limits(image, new_rows)
+
+        axis = self._buffer.axis_version
+        if axis != self._shown_axis or self._background is None:
+            self._shown_axis = axis
+            if len(x):
+                self._image.set_extent((float(x[0]), float(x[-1]), -len(image), 0))
+                self._ax.set_xlim(float(x[0]), float(x[-1]))
+            self._canvas.draw()  # new background via _on_draw()
+        else:
+            self._canvas.restore_region(self._background)
+            self._ax.draw_artist(self._image)
+            self._canvas.blit(self._ax.bbox)
+        self.last_render_ms = (time.perf_counter() - t0) * 1e3
+
+    def set_buffer(self, buffer: WaterfallBuffer) -> None:
+        """Show another device's buffer."""
+        self._buffer = buffer
+        self.clear()
+
+    def clear(self) -> None:
+        """Blank the image; the next update shows the buffer from scratch."""
+        self._shown_version = -1
+        self._shown_axis = -1
+        self._rows_since_limits = 0
+        self._image.set_data(np.full((self._buffer.rows, 2), np.nan, dtype=np.float32))
+        self._canvas.draw_idle()